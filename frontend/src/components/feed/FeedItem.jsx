@@ -24,8 +24,26 @@ export default function FeedItem({ item, onLike }) {
 
       {item.post_type === "image" ? (
         <div className="space-y-3">
-          <div className="rounded-xl overflow-hidden border border-gray-100 bg-gray-50">
-            <img src={item.image} alt="Post" className="w-full object-cover" />
+          <div
+            className="rounded-xl overflow-hidden border border-gray-100 bg-gray-50 bg-cover bg-center"
+            style={item.image_placeholder ? { backgroundImage: `url(${item.image_placeholder})` } : undefined}
+          >
+            {item.image_srcset ? (
+              <picture>
+                <source type="image/webp" srcSet={item.image_srcset.webp} sizes="(max-width: 640px) 100vw, 640px" />
+                <img
+                  src={item.image_srcset.candidates[item.image_srcset.candidates.length - 1].jpeg}
+                  srcSet={item.image_srcset.jpeg}
+                  sizes="(max-width: 640px) 100vw, 640px"
+                  width={item.image_srcset.width}
+                  height={item.image_srcset.height}
+                  alt="Post"
+                  className="w-full h-auto object-cover"
+                />
+              </picture>
+            ) : (
+              <img src={item.image} alt="Post" className="w-full object-cover" />
+            )}
           </div>
           {item.caption && <div className="text-sm text-gray-700">{item.caption}</div>}
         </div>
@@ -42,7 +42,7 @@ export default function Profile() {
         setPosts(res.data ?? []);
       } else {
         const res = await profileService.getProjects(username);
-        setProjects(res.data ?? []);
+        setProjects(res.data?.results ?? []);
       }
     } finally {
       setTabLoading(false);
@@ -93,6 +93,24 @@ DATABASES = {
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# LocMemCache evicts least-recently-used entries once MAX_ENTRIES is reached.
+# Point these at Redis/Memcached in production so workers share entries.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'search': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'search',
+        'TIMEOUT': 30,
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -132,6 +150,22 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# How /media/ is served (social/media_serving.py): None streams from Django;
+# 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache) hands the file to the
+# front proxy. For nginx, MEDIA_ACCEL_REDIRECT_PREFIX must be an `internal`
+# location aliased to MEDIA_ROOT.
+MEDIA_OFFLOAD = os.environ.get('MEDIA_OFFLOAD') or None
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+
+# Image derivatives are generated by `python manage.py process_image_jobs`.
+# Set IMAGE_JOBS_EAGER=True to generate them inside the upload request instead
+# (no worker needed, but uploads get slower).
+IMAGE_JOBS_EAGER = os.environ.get('IMAGE_JOBS_EAGER', 'False').lower() in ('true', '1', 'yes')
+
+# Part files of resumable uploads (social/uploads.py). Kept outside MEDIA_ROOT
+# so unfinished uploads are never served.
+CHUNKED_UPLOAD_DIR = BASE_DIR / 'upload_sessions'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
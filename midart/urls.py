@@ -15,18 +15,17 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.contrib.auth import views as auth_views
 from django.conf import settings
-from django.conf.urls.static import static
+from social.media_serving import serve_media
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('social.api_urls')),  # REST API endpoints
     path('', include('social.urls')),
     path('login/', auth_views.LoginView.as_view(template_name='social/login.html'), name='login'),
     path('logout/', auth_views.LogoutView.as_view(), name='logout'),
+    # Media in every environment: ranges, ETags, caching, optional proxy offload
+    re_path(r'^%s(?P<path>.+)$' % settings.MEDIA_URL.lstrip('/'), serve_media, name='media'),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-
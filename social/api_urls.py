@@ -26,9 +26,25 @@ urlpatterns = [
     path('messages/inbox/', api_views.InboxView.as_view(), name='api_inbox'),
     path('messages/outbox/', api_views.OutboxView.as_view(), name='api_outbox'),
     path('messages/send/', api_views.SendMessageView.as_view(), name='api_send_message'),
+    path('messages/conversations/<int:pk>/', api_views.ConversationMessagesView.as_view(), name='api_conversation'),
 
     # Search
     path('search/', api_views.SearchView.as_view(), name='api_search'),
+    path('search/stats/', api_views.SearchStatsView.as_view(), name='api_search_stats'),
+    path('autocomplete/users/', api_views.UserAutocompleteView.as_view(), name='api_autocomplete_users'),
+
+    # Tags
+    path('tags/trending/', api_views.TrendingTagsView.as_view(), name='api_trending_tags'),
+    path('tags/<str:name>/posts/', api_views.TagPostsView.as_view(), name='api_tag_posts'),
+
+    # Project discovery (before the router so it isn't read as a project id)
+    path('projects/discover/', api_views.ProjectDiscoverView.as_view(), name='api_project_discover'),
+    path('projects/leaderboard/', api_views.FundingLeaderboardView.as_view(), name='api_funding_leaderboard'),
+
+    # Resumable photo uploads
+    path('uploads/', api_views.UploadSessionCreateView.as_view(), name='api_upload_create'),
+    path('uploads/<uuid:pk>/', api_views.UploadSessionView.as_view(), name='api_upload'),
+    path('uploads/<uuid:pk>/finalize/', api_views.UploadSessionFinalizeView.as_view(), name='api_upload_finalize'),
 
     # Router URLs
     path('', include(router.urls)),
@@ -2,36 +2,50 @@
 from rest_framework import viewsets, status, generics
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly, AllowAny
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly, AllowAny, IsAdminUser
 from rest_framework.views import APIView
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.pagination import CursorPagination
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.contenttypes.models import ContentType
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, Min, Max
+from django.utils import timezone
+from datetime import datetime
+from decimal import Decimal
 from itertools import chain
 from operator import attrgetter
 
 from .models import (
     Profile, Post, VerbalPost, Comment, Like, Project,
     Message, Follow, ProjectPhoto, ProjectCalendarEntry,
-    ProjectFunding, ProjectBudgetItem, ProjectSupporter
+    ProjectFunding, ProjectBudgetItem, ProjectSupporter, SearchDocument,
+    Tag, PostTag, TrendingTag, ProjectMembership, UploadSession,
+    Conversation, ConversationParticipant
+)
+from . import (
+    autocomplete, discovery, funding_stats, images, project_calendar, search, search_cache, tags, uploads,
 )
 from .serializers import (
-    UserSerializer, ProfileSerializer, ProfileUpdateSerializer,
+    UserSerializer, AutocompleteUserSerializer, ProfileSerializer, ProfileUpdateSerializer,
     PostSerializer, PostCreateSerializer,
     VerbalPostSerializer, VerbalPostCreateSerializer,
     CommentSerializer, CommentCreateSerializer,
     ProjectListSerializer, ProjectDetailSerializer, ProjectCreateSerializer,
-    ProjectPhotoSerializer, ProjectCalendarEntrySerializer,
+    ProjectPhotoSerializer, ProjectCalendarEntrySerializer, CalendarBulkSerializer, UploadSessionCreateSerializer,
     ProjectFundingSerializer, ProjectBudgetItemSerializer,
-    ProjectSupporterSerializer, ProjectSupportCreateSerializer,
-    FollowSerializer, MessageSerializer, MessageCreateSerializer,
-    FeedItemSerializer
+    ProjectSupporterSerializer, ProjectSupportCreateSerializer, FundingDailyPointSerializer,
+    FollowSerializer, MessageSerializer, MessageCreateSerializer, ConversationSerializer,
+    FeedItemSerializer, TagSerializer, TrendingTagSerializer
 )
 
 
+# Shard sums of each listed project's funding, for serializers.funding_summary
+LIST_SHARD_TOTALS = ProjectFunding.shard_total_annotations('funding__id', prefix='funding_')
+
+
 # ========== AUTH VIEWS ==========
 
 class RegisterView(APIView):
@@ -87,6 +101,11 @@ class CurrentUserView(APIView):
 
 # ========== PROFILE VIEWS ==========
 
+class ProfileProjectsPagination(CursorPagination):
+    page_size = 20
+    ordering = '-project_id'
+
+
 class ProfileViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Profile.objects.all()
     serializer_class = ProfileSerializer
@@ -139,12 +158,22 @@ class ProfileViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=['get'])
     def projects(self, request, username=None):
         profile = self.get_object()
-        # Use select_related and prefetch_related to prevent N+1 queries
-        projects = Project.objects.filter(
-            Q(creator=profile.user) | Q(collaborators=profile.user)
-        ).select_related('creator').prefetch_related('collaborators', 'manifestations').distinct()
-        serializer = ProjectListSerializer(projects, many=True, context={"request": request})
-        return Response(serializer.data)
+        # Materialized membership: one indexed range scan on (user, project),
+        # newest project first, instead of creator OR collaborators + DISTINCT
+        memberships = ProjectMembership.objects.filter(user=profile.user).select_related(
+            'project', 'project__creator', 'project__funding'
+        ).annotate(**ProjectFunding.shard_total_annotations('project__funding__id', prefix='funding_'))
+        paginator = ProfileProjectsPagination()
+        page = paginator.paginate_queryset(memberships, request, view=self)
+        for membership in page:
+            membership.project.funding_shard_raised = membership.funding_shard_raised
+            membership.project.funding_shard_supporters = membership.funding_shard_supporters
+        data = ProjectListSerializer(
+            [m.project for m in page], many=True, context={"request": request}
+        ).data
+        for item, membership in zip(data, page):
+            item['role'] = membership.role
+        return paginator.get_paginated_response(data)
 
     @action(detail=True, methods=['get'])
     def followers(self, request, username=None):
@@ -327,16 +356,34 @@ class VerbalPostViewSet(viewsets.ModelViewSet):
 
 # ========== PROJECT VIEWS ==========
 
+def _parse_date(value, default):
+    if not value:
+        return default
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
 class ProjectViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def get_queryset(self):
-        # Use select_related and prefetch_related to prevent N+1 queries
-        return Project.objects.all().select_related(
-            'creator'
-        ).prefetch_related(
-            'collaborators', 'photos', 'calendar_entries', 'manifestations'
-        )
+        # Shape the queryset to what each action serializes: funding is
+        # OneToOne so it joins in, and the list never touches the m2m /
+        # photo / calendar relations so it shouldn't prefetch them.
+        queryset = Project.objects.select_related('creator', 'funding')
+        if self.action == 'retrieve':
+            return queryset.prefetch_related(
+                'collaborators', 'manifestations', 'photos'
+            ).annotate(
+                calendar_entry_count=Count('calendar_entries'),
+                calendar_first_date=Min('calendar_entries__date'),
+                calendar_last_date=Max('calendar_entries__date'),
+            )
+        if self.action == 'funding':
+            return queryset.prefetch_related('funding__budget_items')
+        if self.action == 'list':
+            # Newest first, with a stable order for the page boundaries
+            return queryset.annotate(**LIST_SHARD_TOTALS).order_by('-id')
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -360,6 +407,48 @@ class ProjectViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
+    MAX_PHOTOS_PER_UPLOAD = 50
+
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    def upload_photos(self, request, pk=None):
+        """
+        Many photos in one multipart request: repeated `images` files with
+        `captions` in the same order. All-or-nothing: nothing is stored
+        unless every file is a valid image.
+        """
+        project = self.get_object()
+        if request.user != project.creator:
+            return Response({'error': 'Not allowed'}, status=403)
+
+        files = request.FILES.getlist('images')
+        captions = request.data.getlist('captions') if hasattr(request.data, 'getlist') else []
+        if not files:
+            return Response({'error': 'No images uploaded'}, status=400)
+        if len(files) > self.MAX_PHOTOS_PER_UPLOAD:
+            return Response({'error': f'At most {self.MAX_PHOTOS_PER_UPLOAD} photos per request'}, status=400)
+        if len(captions) > len(files):
+            return Response({'error': 'More captions than images'}, status=400)
+
+        photos, errors = [], {}
+        for index, image in enumerate(files):
+            caption = captions[index] if index < len(captions) else ''
+            serializer = ProjectPhotoSerializer(data={'image': image, 'caption': caption})
+            if serializer.is_valid():
+                photos.append(ProjectPhoto(project=project, **serializer.validated_data))
+            else:
+                errors[index] = serializer.errors
+        if errors:
+            return Response({'errors': errors}, status=400)
+
+        with transaction.atomic():
+            # One INSERT; each file is still streamed into storage by the field's pre_save
+            photos = ProjectPhoto.objects.bulk_create(photos)
+        # bulk_create sends no post_save, so placeholders and jobs are queued here in bulk
+        images.enqueue_many(photos, 'image')
+        return Response(
+            ProjectPhotoSerializer(photos, many=True, context={'request': request}).data, status=201
+        )
+
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def calendar_entry(self, request, pk=None):
         project = self.get_object()
@@ -379,6 +468,67 @@ class ProjectViewSet(viewsets.ModelViewSet):
             ProjectCalendarEntry.objects.filter(project=project, date=date).delete()
             return Response({'status': 'deleted'})
 
+    @action(detail=True, methods=['post'], url_path='calendar/bulk', permission_classes=[IsAuthenticated])
+    def calendar_bulk(self, request, pk=None):
+        """Upsert / clear many days at once: {"entries": [{"date", "content"}, ...]}"""
+        project = self.get_object()
+        if request.user != project.creator:
+            return Response({'error': 'Not allowed'}, status=403)
+
+        serializer = CalendarBulkSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+
+        saved, deleted = project_calendar.bulk_upsert(project, serializer.validated_data['entries'])
+        return Response({'saved': saved, 'deleted': deleted})
+
+    @action(detail=True, methods=['get'])
+    def calendar(self, request, pk=None):
+        """Calendar entries in [from, to] (YYYY-MM-DD); defaults to the current month"""
+        project = self.get_object()
+
+        today = timezone.localdate()
+        default_from, default_to = project_calendar.month_bounds(today.year, today.month)
+        try:
+            start = _parse_date(request.query_params.get('from'), default_from)
+            end = _parse_date(request.query_params.get('to'), default_to)
+        except ValueError:
+            return Response({'error': 'from and to must be YYYY-MM-DD dates'}, status=400)
+
+        if end < start:
+            return Response({'error': '"to" must not be before "from"'}, status=400)
+        if (end - start).days >= project_calendar.MAX_RANGE_DAYS:
+            return Response(
+                {'error': f'Range is limited to {project_calendar.MAX_RANGE_DAYS} days'}, status=400
+            )
+
+        return Response({
+            'from': start,
+            'to': end,
+            'entries': project_calendar.entries_between(project.pk, start, end),
+        })
+
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        """Precomputed progress-bar markers: ?resolution=<slots> (e.g. bar width in px)"""
+        project = self.get_object()
+        try:
+            resolution = int(request.query_params.get('resolution', project_calendar.DEFAULT_RESOLUTION))
+            if not 1 <= resolution <= project_calendar.MAX_RESOLUTION:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {'error': f'resolution must be an integer between 1 and {project_calendar.MAX_RESOLUTION}'},
+                status=400,
+            )
+
+        return Response({
+            'start_date': project.start_date,
+            'end_date': project.end_date,
+            'resolution': resolution,
+            'markers': project_calendar.timeline_markers(project, resolution),
+        })
+
     @action(detail=True, methods=['get'])
     def funding(self, request, pk=None):
         project = self.get_object()
@@ -386,6 +536,45 @@ class ProjectViewSet(viewsets.ModelViewSet):
             return Response(ProjectFundingSerializer(project.funding).data)
         return Response({'enabled': False})
 
+    @action(detail=True, methods=['get'], url_path='funding/daily')
+    def funding_daily(self, request, pk=None):
+        """Raised / supporters per day in [from, to]: ?interval=day|week|month"""
+        project = self.get_object()
+        if not hasattr(project, 'funding'):
+            return Response({'error': 'Funding not enabled for this project'}, status=400)
+
+        interval = request.query_params.get('interval', 'day')
+        if interval not in funding_stats.INTERVALS:
+            return Response({'error': f'interval must be one of {list(funding_stats.INTERVALS)}'}, status=400)
+        try:
+            start = _parse_date(request.query_params.get('from'), None)
+            end = _parse_date(request.query_params.get('to'), None)
+        except ValueError:
+            return Response({'error': 'from and to must be YYYY-MM-DD dates'}, status=400)
+        if start and end and end < start:
+            return Response({'error': '"to" must not be before "from"'}, status=400)
+
+        return Response({
+            'from': start,
+            'to': end,
+            'interval': interval,
+            'points': FundingDailyPointSerializer(
+                funding_stats.daily_series(project.funding, start, end, interval), many=True
+            ).data,
+        })
+
+    @action(detail=True, methods=['get'])
+    def supporters(self, request, pk=None):
+        """All supporters, newest first, cursor-paginated"""
+        project = self.get_object()
+        if not hasattr(project, 'funding'):
+            return Response({'error': 'Funding not enabled for this project'}, status=400)
+
+        supporters = project.funding.supporters.select_related('user')
+        paginator = ProjectSupportersPagination()
+        page = paginator.paginate_queryset(supporters, request, view=self)
+        return paginator.get_paginated_response(ProjectSupporterSerializer(page, many=True).data)
+
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def support(self, request, pk=None):
         project = self.get_object()
@@ -421,14 +610,226 @@ class ProjectViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=400)
 
 
+class ProjectSupportersPagination(CursorPagination):
+    page_size = 20
+    ordering = ('-created_at', '-id')
+
+
+class ProjectDiscoverPagination(CursorPagination):
+    page_size = 20
+    ordering = '-id'
+
+
+class ProjectDiscoverView(generics.ListAPIView):
+    """
+    Browse projects with facet counts.
+    Filters: status, budget_type, project_type, manifestation (ids),
+    from / to (YYYY-MM-DD, overlapping the project's dates).
+    """
+    serializer_class = ProjectListSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = ProjectDiscoverPagination
+
+    def get_queryset(self):
+        return discovery.apply_filters(
+            Project.objects.select_related('creator', 'funding').annotate(**LIST_SHARD_TOTALS), self.filters
+        )
+
+    def list(self, request, *args, **kwargs):
+        try:
+            self.filters = discovery.parse_filters(request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=400)
+
+        response = super().list(request, *args, **kwargs)
+        response.data['facets'] = discovery.facet_counts(self.filters)
+        return response
+
+
+class FundingLeaderboardView(APIView):
+    """
+    Funding leaderboards: ?board=top_funded|closest_to_goal|most_supporters&limit=<n>
+    Each board is a scan of one descending index on ProjectFunding.
+
+    Sharded campaigns keep part of their totals in shard rows until
+    compaction, so their indexed columns lag behind. They are few (only hot
+    campaigns are sharded), so they are ranked separately by their true
+    totals and merged with the index scan over the unsharded ones.
+    """
+    permission_classes = [AllowAny]
+
+    BOARDS = {
+        'top_funded': ('raised', {'raised__gt': 0}),
+        'closest_to_goal': ('percent_funded', {'goal__gt': 0, 'percent_funded__lt': 100}),
+        'most_supporters': ('supporter_count', {'supporter_count__gt': 0}),
+    }
+    DEFAULT_LIMIT = 10
+    MAX_LIMIT = 50
+
+    @staticmethod
+    def _totals(funding):
+        raised = funding.total_raised
+        return {
+            'raised': raised,
+            'supporter_count': funding.total_supporters,
+            'percent_funded': round(raised * 100 / funding.goal, 2) if funding.goal > 0 else Decimal('0'),
+            'goal': funding.goal,
+        }
+
+    @staticmethod
+    def _matches(totals, filters):
+        for lookup, value in filters.items():
+            field, op = lookup.rsplit('__', 1)
+            if not (totals[field] > value if op == 'gt' else totals[field] < value):
+                return False
+        return True
+
+    def get(self, request):
+        board = request.query_params.get('board', 'top_funded')
+        if board not in self.BOARDS:
+            return Response({'error': f'board must be one of {sorted(self.BOARDS)}'}, status=400)
+        try:
+            limit = int(request.query_params.get('limit', self.DEFAULT_LIMIT))
+            if not 1 <= limit <= self.MAX_LIMIT:
+                raise ValueError
+        except ValueError:
+            return Response({'error': f'limit must be an integer between 1 and {self.MAX_LIMIT}'}, status=400)
+
+        field, filters = self.BOARDS[board]
+        fundings = ProjectFunding.objects.select_related('project', 'project__creator')
+        ranked = [
+            (self._totals(funding)[field], funding)
+            for funding in fundings.filter(counter_shards=0, **filters).order_by(f'-{field}', 'id')[:limit]
+        ]
+        for funding in fundings.filter(counter_shards__gt=0).annotate(**ProjectFunding.shard_total_annotations()):
+            totals = self._totals(funding)
+            if self._matches(totals, filters):
+                ranked.append((totals[field], funding))
+        ranked.sort(key=lambda entry: (-entry[0], entry[1].pk))
+
+        projects = [funding.project for _, funding in ranked[:limit]]
+        return Response({
+            'board': board,
+            'results': ProjectListSerializer(projects, many=True, context={'request': request}).data,
+        })
+
+
+# ========== RESUMABLE UPLOAD VIEWS ==========
+
+def _upload_session_data(session):
+    return {
+        'id': str(session.pk),
+        'status': session.status,
+        'size': session.size,
+        'offset': session.received,
+        'chunk_size': uploads.MAX_CHUNK_SIZE,
+        'photo': session.photo_id,
+    }
+
+
+class UploadSessionCreateView(APIView):
+    """Start a resumable upload of a project photo: {project, filename, size, caption}."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = UploadSessionCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+        data = serializer.validated_data
+        if request.user != data['project'].creator:
+            return Response({'error': 'Not allowed'}, status=403)
+        session = uploads.start_session(
+            request.user, data['project'], data['filename'], data['size'], caption=data['caption'],
+        )
+        return Response(_upload_session_data(session), status=201)
+
+
+class UploadSessionView(APIView):
+    """
+    GET: offset to resume from. PUT: raw chunk bytes with
+    Content-Range: bytes <start>-<end>/<size>. DELETE: abort.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_session(self, request, pk):
+        return get_object_or_404(UploadSession, pk=pk, user=request.user)
+
+    def get(self, request, pk):
+        return Response(_upload_session_data(self.get_session(request, pk)))
+
+    def put(self, request, pk):
+        session = self.get_session(request, pk)
+        try:
+            start, end, total = uploads.parse_content_range(request.META.get('HTTP_CONTENT_RANGE'))
+            # The raw body stream, never parsed into request.data
+            offset = uploads.write_chunk(session, start, end, total, request.stream)
+        except uploads.OffsetMismatch as exc:
+            return Response({'error': str(exc), 'offset': exc.offset}, status=409)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=400)
+        return Response({'offset': offset, 'complete': offset == session.size})
+
+    def delete(self, request, pk):
+        uploads.abort(self.get_session(request, pk))
+        return Response({'status': 'aborted'})
+
+
+class UploadSessionFinalizeView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk, user=request.user)
+        try:
+            photo = uploads.finalize(session)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=400)
+        return Response(ProjectPhotoSerializer(photo, context={'request': request}).data, status=201)
+
+
 # ========== MESSAGE VIEWS ==========
 
+class InboxPagination(CursorPagination):
+    page_size = 20
+    ordering = ('-last_message_at', '-id')
+
+
+class ConversationMessagesPagination(CursorPagination):
+    page_size = 50
+    ordering = ('-created_at', '-id')
+
+
 class InboxView(generics.ListAPIView):
+    """
+    Conversations, most recently active first, with unread counts: one
+    range scan of conversation_inbox_idx, joined to the conversation and
+    its two users.
+    """
+    serializer_class = ConversationSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = InboxPagination
+
+    def get_queryset(self):
+        return ConversationParticipant.objects.filter(
+            user=self.request.user, last_message_at__isnull=False,
+        ).select_related('conversation', 'conversation__user_low', 'conversation__user_high')
+
+
+class ConversationMessagesView(generics.ListAPIView):
+    """The messages of one conversation, newest first; reading it marks it read."""
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ConversationMessagesPagination
 
     def get_queryset(self):
-        return Message.objects.filter(recipient=self.request.user).order_by('-created_at')
+        return self.conversation.messages.select_related('sender', 'recipient')
+
+    def list(self, request, *args, **kwargs):
+        self.conversation = get_object_or_404(
+            Conversation, pk=kwargs['pk'], memberships__user=request.user,
+        )
+        response = super().list(request, *args, **kwargs)
+        self.conversation.mark_read(request.user)
+        return response
 
 
 class OutboxView(generics.ListAPIView):
@@ -450,25 +851,131 @@ class SendMessageView(generics.CreateAPIView):
 # ========== SEARCH VIEW ==========
 
 class SearchView(APIView):
+    """
+    Ranked full-text search over profiles, projects and posts.
+
+    Query params: q, type (comma-separated: profile,project,post,verbalpost),
+    limit (max 50), offset, cursor (from a previous response's next_cursor).
+    """
     permission_classes = [IsAuthenticatedOrReadOnly]
+    max_limit = 50
 
     def get(self, request):
         query = request.query_params.get('q', '')
         if len(query) < 2:
-            return Response({'users': [], 'projects': []})
+            return Response({'results': [], 'next_cursor': None, 'users': [], 'projects': []})
+
+        valid_kinds = {kind for kind, _ in SearchDocument.KINDS}
+        kinds = [k for k in request.query_params.get('type', '').split(',') if k]
+        if any(k not in valid_kinds for k in kinds):
+            return Response({'error': f'type must be one of {sorted(valid_kinds)}'}, status=400)
+
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), self.max_limit)
+            offset = int(request.query_params.get('offset', 0))
+            if limit < 1 or offset < 0:
+                raise ValueError
+        except ValueError:
+            return Response({'error': 'limit and offset must be non-negative integers'}, status=400)
+
+        try:
+            page = search_cache.cached_search(
+                query, kinds=kinds, limit=limit, offset=offset,
+                cursor=request.query_params.get('cursor'),
+            )
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=400)
+
+        context = {'request': request}
+        results, users, projects = [], [], []
+        for hit, obj in search.load_objects(page.hits):
+            if hit.kind == SearchDocument.KIND_PROFILE:
+                data = UserSerializer(obj.user).data
+                users.append(data)
+            elif hit.kind == SearchDocument.KIND_PROJECT:
+                data = ProjectListSerializer(obj, context=context).data
+                projects.append(data)
+            elif hit.kind == SearchDocument.KIND_POST:
+                data = PostSerializer(obj, context=context).data
+            else:
+                data = VerbalPostSerializer(obj, context=context).data
+            results.append({'type': hit.kind, 'score': hit.score, 'data': data})
+
+        return Response({
+            'results': results,
+            'next_cursor': page.next_cursor,
+            # Kept for clients that only read users/projects
+            'users': users,
+            'projects': projects,
+        })
+
+
+class SearchStatsView(APIView):
+    """Search cache hit-rate counters (staff only)"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(search_cache.get_stats())
+
+
+class UserAutocompleteView(APIView):
+    """Typeahead for mentions / message recipients: ?q=<prefix>&limit=<k>"""
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    max_limit = 25
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 10)), self.max_limit))
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=400)
+
+        users = autocomplete.suggest_users(query, viewer=request.user, limit=limit)
+        return Response(AutocompleteUserSerializer(users, many=True, context={'request': request}).data)
 
-        users = User.objects.filter(
-            Q(username__icontains=query) |
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query)
-        )[:10]
 
-        projects = Project.objects.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query)
-        )[:10]
+# ========== TAG VIEWS ==========
 
+class TagPostsPagination(CursorPagination):
+    page_size = 20
+    ordering = ('-created_at', '-id')
+
+
+class TagPostsView(generics.ListAPIView):
+    """Posts carrying #<name>, newest first; pages off the (tag, -created_at, -id) index"""
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = TagPostsPagination
+
+    def get_queryset(self):
+        self.tag = get_object_or_404(Tag, name=self.kwargs['name'].casefold())
+        return PostTag.objects.filter(tag=self.tag).only('id', 'content_type_id', 'object_id', 'created_at')
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        result = []
+        for item in tags.load_posts(page):
+            if isinstance(item, Post):
+                result.append(PostSerializer(item, context={'request': request}).data)
+            else:
+                result.append(VerbalPostSerializer(item, context={'request': request}).data)
+        response = self.get_paginated_response(result)
+        response.data['tag'] = TagSerializer(self.tag).data
+        return response
+
+
+class TrendingTagsView(APIView):
+    """Precomputed trending tags: ?window=1h|24h|7d (see compute_trending_tags)"""
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get(self, request):
+        window = request.query_params.get('window', '24h')
+        if window not in tags.WINDOW_DELTAS:
+            return Response({'error': f'window must be one of {sorted(tags.WINDOW_DELTAS)}'}, status=400)
+
+        trending = list(TrendingTag.objects.filter(window=window).select_related('tag'))
         return Response({
-            'users': UserSerializer(users, many=True).data,
-            'projects': ProjectListSerializer(projects, many=True).data
+            'window': window,
+            'computed_at': trending[0].computed_at if trending else None,
+            'tags': TrendingTagSerializer(trending, many=True).data,
         })
+
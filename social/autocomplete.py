@@ -0,0 +1,125 @@
+# social/autocomplete.py
+"""
+Username / display-name typeahead.
+
+Every user gets a handful of normalized keys in AutocompleteKey. A prefix
+query is a range scan on that index, capped at CANDIDATE_LIMIT rows, plus
+the same scan restricted to the viewer's follows and followers, so cost
+depends on the page size rather than on the number of users. The
+candidates are then re-ranked by follow-graph proximity to the viewer.
+"""
+import unicodedata
+
+from django.contrib.auth.models import User
+from django.db.models import Q
+
+from .models import AutocompleteKey, Follow
+
+CANDIDATE_LIMIT = 200
+KEY_LENGTH = AutocompleteKey._meta.get_field('key').max_length
+
+# Proximity ranks, best first
+FOLLOWING = 0       # viewer follows them
+FOLLOWER = 1        # they follow the viewer
+SECOND_DEGREE = 2   # followed by someone the viewer follows
+OTHER = 3
+
+_PREFIX_END = '\U0010ffff'
+
+
+def normalize(text):
+    """Casefold and strip accents so 'Élodie' matches 'elo'."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.casefold().split())
+
+
+def key_strings(username, first_name='', last_name=''):
+    full_name = f"{first_name} {last_name}"
+    # Cut after normalizing: NFKD and casefold can lengthen a name
+    keys = {normalize(value)[:KEY_LENGTH] for value in (username, first_name, last_name, full_name)}
+    keys.discard('')
+    return keys
+
+
+def index_user(user):
+    keys = key_strings(user.username, user.first_name, user.last_name)
+    existing = set(user.autocomplete_keys.values_list('key', flat=True))
+    if existing == keys:
+        return
+    user.autocomplete_keys.exclude(key__in=keys).delete()
+    AutocompleteKey.objects.bulk_create(
+        [AutocompleteKey(key=key, user=user) for key in keys - existing],
+        ignore_conflicts=True,
+    )
+
+
+def _candidate_ids(prefix, viewer_id=None):
+    """
+    Users with a key starting with `prefix`, alphabetically: the first
+    CANDIDATE_LIMIT keys overall, plus matching keys of the viewer's follows
+    and followers, who would otherwise be cut off by a crowded prefix.
+    """
+    keys = AutocompleteKey.objects.filter(key__gte=prefix, key__lt=prefix + _PREFIX_END)
+    rows = set(keys.order_by('key', 'user_id').values_list('key', 'user_id')[:CANDIDATE_LIMIT])
+    if viewer_id:
+        network = (
+            Q(user_id__in=Follow.objects.filter(follower_id=viewer_id).values('following'))
+            | Q(user_id__in=Follow.objects.filter(following_id=viewer_id).values('follower'))
+        )
+        rows.update(keys.filter(network).order_by('key', 'user_id').values_list('key', 'user_id')[:CANDIDATE_LIMIT])
+
+    seen = {}
+    for _, user_id in sorted(rows):
+        if user_id != viewer_id and user_id not in seen:
+            seen[user_id] = len(seen)
+    return seen
+
+
+def proximity(viewer, user_ids):
+    """Map each id in `user_ids` to its follow-graph rank relative to `viewer`."""
+    ranks = dict.fromkeys(user_ids, OTHER)
+    if not viewer or not viewer.is_authenticated or not user_ids:
+        return ranks
+
+    viewer_following = Follow.objects.filter(follower=viewer).values('following')
+    second = Follow.objects.filter(
+        follower__in=viewer_following, following__in=user_ids
+    ).values_list('following', flat=True)
+    followers = Follow.objects.filter(
+        following=viewer, follower__in=user_ids
+    ).values_list('follower', flat=True)
+    following = Follow.objects.filter(
+        follower=viewer, following__in=user_ids
+    ).values_list('following', flat=True)
+
+    # Later assignments win, so apply from weakest to strongest
+    for ids, rank in ((second, SECOND_DEGREE), (followers, FOLLOWER), (following, FOLLOWING)):
+        for user_id in ids:
+            ranks[user_id] = rank
+    return ranks
+
+
+def suggest_users(query, viewer=None, limit=10):
+    """
+    Return up to `limit` users whose username or name starts with `query`,
+    closest in the follow graph first. Each user gets a `proximity` attribute.
+    """
+    prefix = normalize(query)[:KEY_LENGTH]
+    if not prefix:
+        return []
+
+    viewer_id = viewer.id if viewer and viewer.is_authenticated else None
+    order = _candidate_ids(prefix, viewer_id)
+    ranks = proximity(viewer, list(order))
+    top_ids = sorted(order, key=lambda user_id: (ranks[user_id], order[user_id]))[:limit]
+
+    users = User.objects.select_related('profile').in_bulk(top_ids)
+    result = []
+    for user_id in top_ids:
+        user = users.get(user_id)
+        if user is None:
+            continue
+        user.proximity = ranks[user_id]
+        result.append(user)
+    return result
@@ -0,0 +1,112 @@
+# social/discovery.py
+"""
+Faceted project discovery.
+
+Filters are parsed into a plain dict, applied to an indexed Project queryset,
+and facet counts are computed disjunctively: the counts for one facet apply
+every *other* active filter, so "Seeking funding (132)" still shows how many
+projects you'd get by switching budget type. Each facet is one GROUP BY, and
+the whole facet block is cached for FACET_TIMEOUT seconds per filter set.
+"""
+import hashlib
+import json
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import Project, Manifestation
+
+FACET_TIMEOUT = 60
+
+CHOICE_FACETS = {
+    'status': Project.STATUS_CHOICES,
+    'budget_type': Project.BUDGET_CHOICES,
+    'project_type': Project.PROJECT_TYPES,
+}
+FACETS = (*CHOICE_FACETS, 'manifestation')
+
+ProjectManifestation = Project.manifestations.through
+
+
+def parse_filters(params):
+    """
+    Build a filter dict from query params; raises ValueError with a message.
+    Multi-value filters are comma separated: ?status=ongoing,paused
+    """
+    filters = {}
+    for name, choices in CHOICE_FACETS.items():
+        values = [v for v in params.get(name, '').split(',') if v]
+        valid = {value for value, _ in choices}
+        if any(v not in valid for v in values):
+            raise ValueError(f'{name} must be one of {sorted(valid)}')
+        if values:
+            filters[name] = sorted(set(values))
+
+    manifestations = [v for v in params.get('manifestation', '').split(',') if v]
+    if manifestations:
+        if not all(v.isdigit() for v in manifestations):
+            raise ValueError('manifestation must be a comma-separated list of ids')
+        filters['manifestation'] = sorted({int(v) for v in manifestations})
+
+    for name in ('from', 'to'):
+        if params.get(name):
+            try:
+                filters[name] = datetime.strptime(params[name], '%Y-%m-%d').date().isoformat()
+            except ValueError:
+                raise ValueError(f'{name} must be a YYYY-MM-DD date')
+    if 'from' in filters and 'to' in filters and filters['to'] < filters['from']:
+        raise ValueError('"to" must not be before "from"')
+    return filters
+
+
+def apply_filters(queryset, filters, skip=None):
+    for name in CHOICE_FACETS:
+        if name in filters and name != skip:
+            queryset = queryset.filter(**{f'{name}__in': filters[name]})
+    if 'manifestation' in filters and skip != 'manifestation':
+        # Subquery rather than a join so projects aren't duplicated per match
+        queryset = queryset.filter(id__in=ProjectManifestation.objects.filter(
+            manifestation_id__in=filters['manifestation']
+        ).values('project_id'))
+    # Date range: projects whose [start_date, end_date] overlaps [from, to];
+    # a missing date leaves that side open
+    if 'from' in filters:
+        queryset = queryset.filter(Q(end_date__gte=filters['from']) | Q(end_date__isnull=True))
+    if 'to' in filters:
+        queryset = queryset.filter(Q(start_date__lte=filters['to']) | Q(start_date__isnull=True))
+    return queryset
+
+
+def _facet_counts(filters):
+    facets = {}
+    for name, choices in CHOICE_FACETS.items():
+        counts = dict(
+            apply_filters(Project.objects.all(), filters, skip=name)
+            .order_by().values_list(name).annotate(n=Count('id'))
+        )
+        facets[name] = [
+            {'value': value, 'label': label, 'count': counts.get(value, 0)}
+            for value, label in choices
+        ]
+
+    projects = apply_filters(Project.objects.all(), filters, skip='manifestation')
+    counts = dict(
+        ProjectManifestation.objects.filter(project_id__in=projects.values('id'))
+        .order_by().values_list('manifestation_id').annotate(n=Count('project_id'))
+    )
+    facets['manifestation'] = [
+        {'value': m.id, 'label': m.name, 'count': counts.get(m.id, 0)}
+        for m in Manifestation.objects.order_by('name')
+    ]
+    return facets
+
+
+def facet_counts(filters):
+    digest = hashlib.sha1(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+    key = f'discovery:facets:{digest}'
+    facets = cache.get(key)
+    if facets is None:
+        facets = _facet_counts(filters)
+        cache.set(key, facets, FACET_TIMEOUT)
+    return facets
@@ -0,0 +1,160 @@
+# social/funding_stats.py
+"""
+Daily funding rollups for campaign charts, and totals reconciliation.
+
+ProjectFundingDaily holds one row per (funding, day) with that day's raised
+amount and supporter count (one per shard and day for sharded campaigns).
+ProjectSupporter.save() bumps the bucket for each new supporter;
+rebuild_daily() recomputes buckets from ProjectSupporter in one grouped
+query per batch of campaigns, for backfills and after deletions or admin
+edits. daily_series() reads a date range, optionally summed by week or
+month in the database.
+
+reconcile() recomputes raised / supporter_count from ProjectSupporter and
+repairs counters that have drifted (deleted supporters, admin edits, a
+crash between writes).
+"""
+import time
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+
+from .models import ProjectFunding, ProjectFundingShard, ProjectSupporter, ProjectFundingDaily
+
+INTERVALS = ('day', 'week', 'month')
+REBUILD_BATCH = 500
+RECONCILE_BATCH = 5000
+
+
+def _rebuild_batch(funding_ids):
+    rows = (
+        ProjectSupporter.objects.filter(funding_id__in=funding_ids)
+        .annotate(day=TruncDate('created_at'))
+        .order_by().values('funding_id', 'day')
+        .annotate(raised=Sum('amount'), supporters=Count('id'))
+    )
+    with transaction.atomic():
+        ProjectFundingDaily.objects.filter(funding_id__in=funding_ids).delete()
+        ProjectFundingDaily.objects.bulk_create([
+            ProjectFundingDaily(
+                funding_id=row['funding_id'], date=row['day'],
+                raised=row['raised'], supporter_count=row['supporters'],
+            )
+            for row in rows
+        ], batch_size=1000)
+
+
+def rebuild_daily(funding_ids=None):
+    """Recompute the rollups for the given campaigns (all when None). Returns the number rebuilt."""
+    if funding_ids is None:
+        funding_ids = ProjectFunding.objects.order_by('id').values_list('id', flat=True)
+    funding_ids = list(funding_ids)
+    for start in range(0, len(funding_ids), REBUILD_BATCH):
+        _rebuild_batch(funding_ids[start:start + REBUILD_BATCH])
+    return len(funding_ids)
+
+
+def daily_series(funding, start=None, end=None, interval='day'):
+    """
+    [{date, raised, supporters}] for days with support between start and end
+    (inclusive, either may be None). For 'week' / 'month' each point is the
+    sum over the bucket, dated by the bucket's first day.
+    """
+    queryset = ProjectFundingDaily.objects.filter(funding=funding)
+    if start:
+        queryset = queryset.filter(date__gte=start)
+    if end:
+        queryset = queryset.filter(date__lte=end)
+
+    # Summed per bucket either way: a sharded campaign has one row per shard and day
+    if interval == 'day':
+        rows = queryset.order_by('date').values_list('date').annotate(Sum('raised'), Sum('supporter_count'))
+    else:
+        trunc = TruncWeek if interval == 'week' else TruncMonth
+        rows = (
+            queryset.annotate(bucket=trunc('date')).order_by('bucket')
+            .values_list('bucket').annotate(Sum('raised'), Sum('supporter_count'))
+        )
+    return [
+        {'date': day, 'raised': raised, 'supporters': supporters}
+        for day, raised, supporters in rows
+    ]
+
+
+def _percent(raised, goal):
+    return round(raised * 100 / goal, 2) if goal > 0 else Decimal('0')
+
+
+def _reconcile_batch(funding_ids, dry_run):
+    """Returns the ProjectFunding rows in the batch whose totals drifted, already corrected."""
+    if not dry_run:
+        # Lock the counters first: a donation in flight either committed before
+        # this (and is in the aggregate) or waits and increments the fixed row
+        list(ProjectFunding.objects.select_for_update().filter(pk__in=funding_ids).values_list('pk'))
+        list(ProjectFundingShard.objects.select_for_update().filter(funding_id__in=funding_ids).values_list('pk'))
+
+    rows = (
+        ProjectFunding.objects.filter(pk__in=funding_ids)
+        .annotate(
+            true_raised=Coalesce(Sum('supporters__amount'), Decimal('0')),
+            true_count=Count('supporters'),
+        )
+        .only('id', 'goal', 'raised', 'supporter_count', 'percent_funded', 'counter_shards')
+    )
+    rows = list(rows)
+
+    # Sharded campaigns keep part of the total in their shard rows
+    sharded = [f.pk for f in rows if f.counter_shards]
+    in_shards = {
+        funding_id: (raised, count) for funding_id, raised, count in
+        ProjectFundingShard.objects.filter(funding_id__in=sharded).order_by()
+        .values_list('funding_id').annotate(Sum('raised'), Sum('supporter_count'))
+    } if sharded else {}
+
+    drifted = []
+    for funding in rows:
+        shard_raised, shard_count = in_shards.get(funding.pk, (Decimal('0'), 0))
+        raised = funding.true_raised - shard_raised
+        count = funding.true_count - shard_count
+        # percent_funded tracks this row's raised (shards are folded in by
+        # compaction), so compare it with the main-row portion too
+        percent = _percent(raised, funding.goal)
+        if (funding.raised, funding.supporter_count, funding.percent_funded) != (raised, count, percent):
+            funding.raised, funding.supporter_count, funding.percent_funded = raised, count, percent
+            drifted.append(funding)
+
+    if drifted and not dry_run:
+        ProjectFunding.objects.bulk_update(drifted, ['raised', 'supporter_count', 'percent_funded'])
+    return drifted
+
+
+def reconcile(dry_run=False, batch_size=RECONCILE_BATCH, on_batch=None):
+    """
+    Recompute every campaign's totals with one grouped aggregate per batch of
+    batch_size campaigns and bulk_update the ones that drifted. With dry_run
+    nothing is locked or written. on_batch(scanned, drifted) is called after
+    each batch. Returns a stats dict.
+    """
+    started = time.perf_counter()
+    funding_ids = list(ProjectFunding.objects.order_by('id').values_list('id', flat=True))
+    scanned = 0
+    drifted = []
+    for start in range(0, len(funding_ids), batch_size):
+        batch = funding_ids[start:start + batch_size]
+        with transaction.atomic():
+            drifted.extend(_reconcile_batch(batch, dry_run))
+        scanned += len(batch)
+        if on_batch:
+            on_batch(scanned, len(drifted))
+
+    elapsed = time.perf_counter() - started
+    return {
+        'scanned': scanned,
+        'drifted': [f.pk for f in drifted],
+        'fixed': 0 if dry_run else len(drifted),
+        'seconds': elapsed,
+        'per_second': scanned / elapsed if elapsed else 0.0,
+    }
@@ -0,0 +1,36 @@
+# social/image_worker.py
+"""
+Process-pool side of the image job queue (see images.py).
+
+Kept free of model imports at module level: with the spawn / forkserver
+start methods each pool process imports this module fresh and has to set
+Django up before touching the ORM. The parent closes its database
+connections before handing out each batch, so forked children open their own.
+"""
+import django
+
+
+def init_process():
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def run(job_id):
+    from django.db import close_old_connections
+    from . import images
+    try:
+        return job_id, images.run_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def placeholder(name):
+    """(name, LQIP data URI or '') for a stored image; used by backfill_image_placeholders."""
+    from django.core.files.storage import default_storage
+    from . import images
+    try:
+        with default_storage.open(name, 'rb') as image_file:
+            return name, images.compute_placeholder(image_file)
+    except OSError:
+        return name, ''
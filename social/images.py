@@ -0,0 +1,434 @@
+# social/images.py
+"""
+Resized derivatives of uploaded images.
+
+Every uploaded image gets fixed-width variants (VARIANT_WIDTHS) in WebP and
+JPEG, written next to each other under derivatives/. EXIF orientation is
+applied to the pixels and all metadata (EXIF, GPS, ICC, comments) is
+dropped, because nothing is passed through to the encoders. Images are
+never upscaled: a variant wider than the original is stored at the
+original's size.
+
+What was generated is recorded in a JSON column next to the image field
+(`<field>_variants`):
+
+    {"source": "post_images/a.jpg",
+     "original": {"width": 4032, "height": 3024},
+     "thumb": {"width": 160, "height": 120,
+               "webp": "derivatives/post_images/a.jpg/thumb.3f9c0b1e2d4a5c6f.webp",
+               "jpeg": "derivatives/post_images/a.jpg/thumb.8e7d6c5b4a392817.jpg"},
+     ...}
+
+Pixel sizes are recorded here so serializers can build srcset data
+without opening any image files.
+
+Derivative file names carry a hash of their own bytes, so they can be
+served as immutable: regenerating them (generate_image_variants --force,
+new encoder settings) writes new names instead of new bytes under an old
+one. Files that are no longer referenced are left to gc_media, so a client
+still holding an old URL doesn't get a 404 right away.
+
+"source" is the image name the variants were made from, so a replaced
+upload is detected by comparing it with the field's current name.
+
+Each image also gets a placeholder: a ~16px WebP inlined as a data URI in
+`<field>_placeholder` (a few hundred bytes), which clients stretch and blur
+while the real image loads. JPEGs up to INLINE_PLACEHOLDER_MAX_BYTES get it
+in the upload request, where reduced-size decoding (Image.draft) keeps it
+cheap, so it's available even before the derivatives are. Other formats
+can't be decoded at reduced size, so their placeholder is made by the image
+job from the decode it does anyway.
+
+Uploads don't wait for any of this: saving a new image sets
+`<field>_status` to pending and queues an ImageJob, which a
+`manage.py process_image_jobs` worker claims and runs in a process pool.
+Until then clients show a placeholder. With settings.IMAGE_JOBS_EAGER the
+job runs inline instead (handy without a worker in development).
+"""
+import base64
+import hashlib
+import os
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .storage import media_storage
+
+from .models import (
+    Profile, Post, Project, ProjectPhoto, ImageJob,
+    IMAGE_NONE, IMAGE_PENDING, IMAGE_READY, IMAGE_FAILED,
+)
+
+VARIANT_WIDTHS = {
+    'thumb': 160,
+    'feed': 640,
+    'full': 1600,
+}
+FORMATS = {
+    # key in the variants dict: (Pillow format, extension, save options)
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+DERIVATIVE_ROOT = 'derivatives'
+# Hex digits of the content hash in derivative file names
+DERIVATIVE_HASH_LENGTH = 16
+
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+PLACEHOLDER_DRAFT = (PLACEHOLDER_SIZE * 8, PLACEHOLDER_SIZE * 8)
+# Bigger uploads aren't read again in the request, even if they are JPEGs
+INLINE_PLACEHOLDER_MAX_BYTES = 8 * 1024 * 1024
+
+MAX_ATTEMPTS = 3
+# A running job not finished after this long is assumed to belong to a dead worker
+STALE_AFTER = timedelta(minutes=15)
+
+# Image field per model; its metadata column is f'{field}_variants'
+IMAGE_FIELDS = {
+    Post: 'image',
+    ProjectPhoto: 'image',
+    Project: 'cover_photo',
+    Profile: 'profile_image',
+}
+
+
+def variants_field(field_name):
+    return f'{field_name}_variants'
+
+
+def status_field(field_name):
+    return f'{field_name}_status'
+
+
+def placeholder_field(field_name):
+    return f'{field_name}_placeholder'
+
+
+def get_variants(instance, field_name):
+    """The stored variants if they belong to the current image, else {}."""
+    image = getattr(instance, field_name)
+    variants = getattr(instance, variants_field(field_name)) or {}
+    if not image or variants.get('source') != image.name:
+        return {}
+    return variants
+
+
+def needs_processing(instance, field_name):
+    image = getattr(instance, field_name)
+    variants = getattr(instance, variants_field(field_name)) or {}
+    return bool(image) and variants.get('source') != image.name
+
+
+def derivative_dir(source_name):
+    # The extension stays, so a.jpg and a.png don't share (and overwrite) a directory
+    return f'{DERIVATIVE_ROOT}/{source_name}'
+
+
+def _open(image_file, draft_size=None):
+    image_file.open('rb')
+    try:
+        img = Image.open(image_file)
+        if draft_size:
+            # JPEG only: decode at 1/2..1/8 scale, no less than draft_size
+            img.draft('RGB', draft_size)
+        img.load()
+    finally:
+        image_file.close()
+    # Bake the EXIF rotation into the pixels before the metadata is dropped
+    return ImageOps.exif_transpose(img)
+
+
+def make_placeholder(img):
+    """Tiny WebP data URI with the image's aspect ratio."""
+    small = img.copy()
+    small.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.BILINEAR)
+    if small.mode not in ('RGB', 'RGBA'):
+        small = small.convert('RGBA' if 'A' in small.mode or 'transparency' in small.info else 'RGB')
+    buffer = BytesIO()
+    small.save(buffer, 'WEBP', quality=PLACEHOLDER_QUALITY)
+    return 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def compute_placeholder(image_file):
+    return make_placeholder(_open(image_file, draft_size=PLACEHOLDER_DRAFT))
+
+
+def inline_placeholder(image_file):
+    """
+    The placeholder if it's cheap to make in the request (a JPEG no bigger
+    than INLINE_PLACEHOLDER_MAX_BYTES), else '' and the image job makes it.
+    """
+    if not image_file:
+        return ''
+    try:
+        if image_file.size > INLINE_PLACEHOLDER_MAX_BYTES:
+            return ''
+        image_file.open('rb')
+        try:
+            img = Image.open(image_file)  # reads the header only
+            if img.format != 'JPEG':
+                return ''
+            img.draft('RGB', PLACEHOLDER_DRAFT)
+            img.load()
+        finally:
+            image_file.close()
+        return make_placeholder(ImageOps.exif_transpose(img))
+    except OSError:
+        return ''
+
+
+def store_placeholder(instance, field_name):
+    """Save the request-time placeholder for the current image ('' until its job runs)."""
+    value = inline_placeholder(getattr(instance, field_name))
+    type(instance).objects.filter(pk=instance.pk).update(**{placeholder_field(field_name): value})
+    setattr(instance, placeholder_field(field_name), value)
+    return value
+
+
+def _encode(img, fmt):
+    pil_format, _, options = FORMATS[fmt]
+    if pil_format == 'JPEG' and img.mode != 'RGB':
+        if img.mode in ('RGBA', 'LA') or 'transparency' in img.info:
+            rgba = img.convert('RGBA')
+            flattened = Image.new('RGB', img.size, (255, 255, 255))
+            flattened.paste(rgba, mask=rgba.getchannel('A'))
+            img = flattened
+        else:
+            img = img.convert('RGB')
+    elif pil_format == 'WEBP' and img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if 'A' in img.mode or 'transparency' in img.info else 'RGB')
+
+    buffer = BytesIO()
+    img.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def _write(prefix, extension, data):
+    name = f'{prefix}.{hashlib.sha256(data).hexdigest()[:DERIVATIVE_HASH_LENGTH]}.{extension}'
+    if default_storage.exists(name):
+        return name  # same bytes already written
+    return default_storage.save(name, ContentFile(data))
+
+
+def generate(image_field, original=None):
+    """
+    Write every variant of `image_field` to storage and return the variants
+    dict. `original` is the decoded image, if the caller already has it.
+    """
+    if original is None:
+        original = _open(image_field)
+    directory = derivative_dir(image_field.name)
+    variants = {
+        'source': image_field.name,
+        # After exif_transpose, i.e. as displayed
+        'original': {'width': original.width, 'height': original.height},
+    }
+
+    for variant, width in VARIANT_WIDTHS.items():
+        img = original
+        if img.width > width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.LANCZOS)
+        entry = {'width': img.width, 'height': img.height}
+        for fmt, (_, extension, _) in FORMATS.items():
+            entry[fmt] = _write(f'{directory}/{variant}', extension, _encode(img, fmt))
+        variants[variant] = entry
+    return variants
+
+
+def delete_variants(variants):
+    """Delete derivative files, unless another row still shares the source blob."""
+    if media_storage.in_use(variants.get('source')):
+        return
+    for variant in VARIANT_WIDTHS:
+        for fmt in FORMATS:
+            name = (variants.get(variant) or {}).get(fmt)
+            if name:
+                default_storage.delete(name)
+
+
+def process(instance, field_name):
+    """
+    (Re)generate the variants for one image field and store them with a
+    queryset update, so no save signals fire again. Returns the new variants.
+    """
+    column = variants_field(field_name)
+    previous = getattr(instance, column) or {}
+    image = getattr(instance, field_name)
+
+    updates = {column: {}, status_field(field_name): IMAGE_NONE}
+    if image:
+        original = _open(image)
+        if not getattr(instance, placeholder_field(field_name)):
+            # Not made in the request (see inline_placeholder)
+            updates[placeholder_field(field_name)] = make_placeholder(original)
+        updates.update({column: generate(image, original), status_field(field_name): IMAGE_READY})
+    type(instance).objects.filter(pk=instance.pk).update(**updates)
+    for name, value in updates.items():
+        setattr(instance, name, value)
+    variants = updates[column]
+
+    if previous.get('source') and previous.get('source') != variants.get('source'):
+        delete_variants(previous)
+    return variants
+
+
+def _set_status(instance, field_name, status):
+    type(instance).objects.filter(pk=instance.pk).update(**{status_field(field_name): status})
+    setattr(instance, status_field(field_name), status)
+
+
+# ---------- JOB QUEUE ----------
+
+def enqueue(instance, field_name):
+    """Mark the image pending and queue derivative generation for it."""
+    store_placeholder(instance, field_name)
+    if getattr(settings, 'IMAGE_JOBS_EAGER', False):
+        try:
+            process(instance, field_name)
+        except OSError:
+            _set_status(instance, field_name, IMAGE_FAILED)
+        return
+
+    ct = ContentType.objects.get_for_model(type(instance))
+    _set_status(instance, field_name, IMAGE_PENDING)
+    queued = ImageJob.objects.filter(
+        content_type=ct, object_id=instance.pk, field_name=field_name,
+        status__in=[ImageJob.STATUS_PENDING, ImageJob.STATUS_RUNNING],
+    )
+    if not queued.exists():
+        ImageJob.objects.create(content_type=ct, object_id=instance.pk, field_name=field_name)
+
+
+def enqueue_many(instances, field_name):
+    """
+    enqueue() for freshly created rows of one model (e.g. from bulk_create,
+    which sends no post_save): placeholders and statuses go out in one
+    bulk_update, the jobs in one bulk_create.
+    """
+    if not instances:
+        return
+    model = type(instances[0])
+    for instance in instances:
+        setattr(instance, placeholder_field(field_name), inline_placeholder(getattr(instance, field_name)))
+        setattr(instance, status_field(field_name), IMAGE_PENDING)
+
+    model.objects.bulk_update(instances, [placeholder_field(field_name), status_field(field_name)])
+    if getattr(settings, 'IMAGE_JOBS_EAGER', False):
+        for instance in instances:
+            try:
+                process(instance, field_name)
+            except OSError:
+                _set_status(instance, field_name, IMAGE_FAILED)
+        return
+
+    ct = ContentType.objects.get_for_model(model)
+    ImageJob.objects.bulk_create([
+        ImageJob(content_type=ct, object_id=instance.pk, field_name=field_name)
+        for instance in instances if getattr(instance, field_name)
+    ])
+
+
+def claim_jobs(limit):
+    """
+    Atomically move up to `limit` runnable jobs to running and return their
+    ids. skip_locked lets several workers claim from the same table.
+    """
+    stale = Q(status=ImageJob.STATUS_RUNNING, updated_at__lt=timezone.now() - STALE_AFTER)
+    with transaction.atomic():
+        ids = list(
+            ImageJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status=ImageJob.STATUS_PENDING) | stale)
+            .order_by('id').values_list('id', flat=True)[:limit]
+        )
+        ImageJob.objects.filter(pk__in=ids).update(
+            status=ImageJob.STATUS_RUNNING, attempts=F('attempts') + 1, updated_at=timezone.now()
+        )
+    return ids
+
+
+def run_job(job_id):
+    """Process one claimed job; returns its final status."""
+    job = ImageJob.objects.select_related('content_type').get(pk=job_id)
+    model = job.content_type.model_class()
+    instance = model.objects.filter(pk=job.object_id).first()
+    if instance is None:  # deleted while queued
+        ImageJob.objects.filter(pk=job.pk).update(status=ImageJob.STATUS_DONE)
+        return ImageJob.STATUS_DONE
+
+    try:
+        process(instance, job.field_name)
+    except OSError as exc:
+        # Not a decodable image; retrying won't help
+        _set_status(instance, job.field_name, IMAGE_FAILED)
+        ImageJob.objects.filter(pk=job.pk).update(status=ImageJob.STATUS_FAILED, error=str(exc))
+        return ImageJob.STATUS_FAILED
+    except Exception as exc:
+        status = ImageJob.STATUS_PENDING if job.attempts < MAX_ATTEMPTS else ImageJob.STATUS_FAILED
+        if status == ImageJob.STATUS_FAILED:
+            _set_status(instance, job.field_name, IMAGE_FAILED)
+        ImageJob.objects.filter(pk=job.pk).update(status=status, error=repr(exc))
+        return status
+
+    # The image may have been replaced while this job ran
+    instance.refresh_from_db()
+    status = ImageJob.STATUS_PENDING if needs_processing(instance, job.field_name) else ImageJob.STATUS_DONE
+    ImageJob.objects.filter(pk=job.pk).update(status=status, attempts=0 if status == ImageJob.STATUS_PENDING else F('attempts'), error='')
+    return status
+
+
+def variant_urls(instance, field_name, request=None):
+    """{variant: {width, height, webp, jpeg}} with URLs, or None before processing."""
+    variants = get_variants(instance, field_name)
+    if not variants:
+        return None
+
+    def url(name):
+        url = default_storage.url(name)
+        return request.build_absolute_uri(url) if request else url
+
+    return {
+        variant: {
+            'width': variants[variant]['width'],
+            'height': variants[variant]['height'],
+            **{fmt: url(variants[variant][fmt]) for fmt in FORMATS},
+        }
+        for variant in VARIANT_WIDTHS if variant in variants
+    }
+
+
+def srcset(instance, field_name, request=None):
+    """
+    Responsive image data from the stored variant sizes, or None before
+    processing: the intrinsic width/height (for reserving layout space),
+    one candidate per distinct width, and ready-made srcset strings.
+    """
+    urls = variant_urls(instance, field_name, request)
+    if not urls:
+        return None
+
+    by_width = {}
+    for entry in urls.values():
+        by_width.setdefault(entry['width'], entry)
+    candidates = [by_width[width] for width in sorted(by_width)]
+
+    # Derivatives made before the original size was recorded: the largest
+    # variant has the original's aspect ratio
+    original = get_variants(instance, field_name).get('original') or candidates[-1]
+    return {
+        'width': original['width'],
+        'height': original['height'],
+        'candidates': candidates,
+        **{
+            fmt: ', '.join(f"{c[fmt]} {c['width']}w" for c in candidates)
+            for fmt in FORMATS
+        },
+    }
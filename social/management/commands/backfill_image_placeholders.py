@@ -0,0 +1,54 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from social import image_worker, images
+
+
+class Command(BaseCommand):
+    help = "Compute LQIP placeholders for existing images, decoding in a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 2)
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--force', action='store_true', help="Recompute existing placeholders too")
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        with ProcessPoolExecutor(max_workers=options['processes'], initializer=image_worker.init_process) as pool:
+            for model, field_name in images.IMAGE_FIELDS.items():
+                column = images.placeholder_field(field_name)
+                queryset = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                if not options['force']:
+                    queryset = queryset.filter(**{column: ''})
+                rows = queryset.order_by('pk').values_list('pk', field_name)
+
+                done = failed = 0
+                last_pk = 0
+                started = time.perf_counter()
+                while True:
+                    # Keyset pages rather than one cursor: connections are closed between chunks
+                    chunk = list(rows.filter(pk__gt=last_pk)[:chunk_size])
+                    if not chunk:
+                        break
+                    last_pk = chunk[-1][0]
+                    # The pool forks workers on demand; don't let them inherit the DB connection
+                    connections.close_all()
+                    placeholders = dict(pool.map(
+                        image_worker.placeholder, {name for _, name in chunk}, chunksize=16
+                    ))
+                    model.objects.bulk_update(
+                        [model(pk=pk, **{column: placeholders[name]}) for pk, name in chunk],
+                        [column], batch_size=500,
+                    )
+                    done += len(chunk)
+                    failed += sum(1 for _, name in chunk if not placeholders[name])
+
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{model.__name__}.{field_name}: {done} images in {elapsed:.2f}s, {failed} unreadable"
+                )
+        self.stdout.write(self.style.SUCCESS("Placeholders up to date"))
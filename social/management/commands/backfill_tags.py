@@ -0,0 +1,57 @@
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from social import tags
+from social.models import Post, VerbalPost, PostTag, Mention
+
+
+class Command(BaseCommand):
+    help = "Parse #hashtags and @mentions out of existing posts, in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        sources = [(Post, 'caption'), (VerbalPost, 'content')]
+
+        for model, text_field in sources:
+            ct = ContentType.objects.get_for_model(model)
+            rows = (
+                model.objects.order_by('pk')
+                .values_list('pk', text_field, 'created_at')
+                .iterator(chunk_size=chunk_size)
+            )
+            done = 0
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                self._index_chunk(ct, chunk)
+                done += len(chunk)
+                self.stdout.write(f"{model.__name__}: {done} processed")
+
+        changed = tags.recount_tags()
+        self.stdout.write(self.style.SUCCESS(f"Backfill complete; {changed} tag counters updated"))
+
+    @transaction.atomic
+    def _index_chunk(self, ct, chunk):
+        parsed = [(pk, tags.parse_tags(text), tags.parse_mentions(text), created_at)
+                  for pk, text, created_at in chunk]
+
+        tag_map = tags.ensure_tags(set().union(*(names for _, names, _, _ in parsed)))
+        PostTag.objects.bulk_create([
+            PostTag(tag=tag_map[name], content_type=ct, object_id=pk, created_at=created_at)
+            for pk, names, _, created_at in parsed for name in names
+        ], ignore_conflicts=True)
+
+        usernames = set().union(*(names for _, _, names, _ in parsed))
+        user_ids = dict(User.objects.filter(username__in=usernames).values_list('username', 'id')) if usernames else {}
+        Mention.objects.bulk_create([
+            Mention(user_id=user_ids[name], content_type=ct, object_id=pk, created_at=created_at)
+            for pk, _, names, created_at in parsed for name in names if name in user_ids
+        ], ignore_conflicts=True)
@@ -0,0 +1,54 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from social.models import Project, ProjectFunding, ProjectSupporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark concurrent donations to a single project, unsharded vs sharded. "
+        "Creates and deletes its own scratch project; run against Postgres for "
+        "meaningful numbers (SQLite serializes all writers anyway)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--donations', type=int, default=2000)
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--shards', type=int, default=16)
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username='bench_funding_user')
+        try:
+            for shards in (0, options['shards']):
+                self._run(user, shards, options['donations'], options['threads'])
+        finally:
+            Project.objects.filter(creator=user).delete()
+            user.delete()
+
+    def _run(self, user, shards, donations, threads):
+        project = Project.objects.create(creator=user, title='Funding benchmark', description='scratch')
+        funding = ProjectFunding.objects.create(project=project, goal=Decimal('1000000'))
+        funding.set_counter_shards(shards)
+
+        def donate(_):
+            try:
+                ProjectSupporter.objects.create(funding=funding, user=user, amount=Decimal('1.00'))
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(donate, range(donations)))
+        elapsed = time.perf_counter() - started
+
+        funding = ProjectFunding.objects.get(pk=funding.pk)
+        assert funding.total_supporters == donations, funding.total_supporters
+        self.stdout.write(
+            f"shards={shards:<3} {donations} donations / {threads} threads: "
+            f"{elapsed:.2f}s ({donations / elapsed:.0f} donations/s), raised ${funding.total_raised}"
+        )
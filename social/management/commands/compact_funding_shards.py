@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from social.models import ProjectFunding
+
+
+class Command(BaseCommand):
+    help = "Fold sharded funding counters back into ProjectFunding (run periodically, e.g. every minute)."
+
+    def handle(self, *args, **options):
+        compacted = 0
+        for funding in ProjectFunding.objects.filter(counter_shards__gt=0).iterator():
+            if funding.compact_shards():
+                compacted += 1
+        self.stdout.write(self.style.SUCCESS(f"Compacted {compacted} funding counters"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from social import tags
+
+
+class Command(BaseCommand):
+    help = "Recompute the precomputed trending tag tables (run from cron, e.g. every 5 minutes)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--window', action='append', choices=sorted(tags.WINDOW_DELTAS),
+            help="Window(s) to recompute; defaults to all.",
+        )
+
+    def handle(self, *args, **options):
+        for window in options['window'] or tags.WINDOW_DELTAS:
+            tags.compute_trending(window)
+            self.stdout.write(f"Trending tags recomputed for {window}")
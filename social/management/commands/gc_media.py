@@ -0,0 +1,63 @@
+import os
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from social import media_gc
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete (or quarantine) media files no row references any more: images of "
+        "deleted rows, replaced uploads, their derivatives, unreferenced blobs, "
+        "stale blobs/tmp files and abandoned upload parts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report orphans without touching them")
+        parser.add_argument(
+            '--quarantine', metavar='DIR',
+            help="Move orphans here (keeping their relative paths) instead of deleting them",
+        )
+        parser.add_argument('--batch-size', type=int, default=media_gc.GC_BATCH)
+        parser.add_argument(
+            '--max-per-second', type=float, default=None,
+            help="Rate limit: remove at most this many files per second",
+        )
+        parser.add_argument(
+            '--grace-hours', type=float, default=media_gc.GRACE.total_seconds() / 3600,
+            help="Leave files modified within this many hours alone",
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        if options['max_per_second'] is not None and options['max_per_second'] <= 0:
+            raise CommandError("--max-per-second must be positive")
+        quarantine = options['quarantine'] and os.path.abspath(options['quarantine'])
+        dry_run = options['dry_run']
+
+        def progress(stats):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"{stats['orphans']} orphans so far ({stats['blobs']} blobs)")
+
+        stats = media_gc.collect(
+            dry_run=dry_run,
+            quarantine_dir=quarantine,
+            grace=timedelta(hours=options['grace_hours']),
+            batch_size=options['batch_size'],
+            max_per_second=options['max_per_second'],
+            on_batch=progress,
+        )
+
+        verb = "Would remove" if dry_run else ("Quarantined" if quarantine else "Removed")
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {stats['orphans']} orphaned files ({stats['blobs']} blobs), "
+            f"{stats['tmp']} temp files and {stats['parts']} upload parts; "
+            f"expired {stats['sessions']} upload sessions"
+        ))
+        if stats['kept_blobs']:
+            self.stdout.write(self.style.WARNING(
+                f"Kept {stats['kept_blobs']} blobs that no row references but whose ref count "
+                f"is above zero; check for drift"
+            ))
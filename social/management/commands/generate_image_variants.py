@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from social import images
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP/JPEG derivatives for images that don't have them yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Regenerate existing derivatives too")
+
+    def handle(self, *args, **options):
+        for model, field_name in images.IMAGE_FIELDS.items():
+            done = failed = 0
+            queryset = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            for instance in queryset.order_by('pk').iterator(chunk_size=200):
+                if not (options['force'] or images.needs_processing(instance, field_name)):
+                    continue
+                try:
+                    images.process(instance, field_name)
+                    done += 1
+                except OSError as exc:
+                    failed += 1
+                    self.stderr.write(f"{model.__name__} #{instance.pk}: {exc}")
+            self.stdout.write(f"{model.__name__}.{field_name}: {done} processed, {failed} failed")
+        self.stdout.write(self.style.SUCCESS("Image derivatives up to date"))
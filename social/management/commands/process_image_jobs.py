@@ -0,0 +1,48 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from social import image_worker, images
+from social.models import ImageJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the image derivative worker: claim queued ImageJobs and process "
+        "them in a local process pool. Several workers can share one queue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 2)
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help="Jobs claimed at a time (default: 2 x processes)")
+        parser.add_argument('--poll', type=float, default=2.0, help="Seconds to sleep when the queue is empty")
+        parser.add_argument('--once', action='store_true', help="Exit when the queue is empty")
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        batch_size = options['batch_size'] or processes * 2
+
+        with ProcessPoolExecutor(max_workers=processes, initializer=image_worker.init_process) as pool:
+            while True:
+                job_ids = images.claim_jobs(batch_size)
+                if not job_ids:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll'])
+                    continue
+
+                # The pool forks workers on demand; they must not inherit
+                # (and share) this process's database connection
+                connections.close_all()
+                started = time.perf_counter()
+                results = list(pool.map(image_worker.run, job_ids))
+                elapsed = time.perf_counter() - started
+                failed = sum(1 for _, status in results if status == ImageJob.STATUS_FAILED)
+                self.stdout.write(
+                    f"{len(results)} jobs in {elapsed:.2f}s ({failed} failed)"
+                )
+        self.stdout.write(self.style.SUCCESS("Image job queue drained"))
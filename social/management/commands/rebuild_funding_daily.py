@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from social import funding_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute ProjectFundingDaily rollups from ProjectSupporter rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--funding', type=int, nargs='*', dest='funding_ids',
+            help="Only rebuild these ProjectFunding ids (default: all)",
+        )
+
+    def handle(self, *args, **options):
+        count = funding_stats.rebuild_daily(options['funding_ids'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt daily rollups for {count} campaigns"))
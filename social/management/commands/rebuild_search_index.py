@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from social import search
+from social.models import Profile, Project, Post, VerbalPost, SearchDocument
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index from profiles, projects and posts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        sources = [
+            Profile.objects.select_related('user'),
+            Project.objects.all(),
+            Post.objects.all(),
+            VerbalPost.objects.all(),
+        ]
+
+        with transaction.atomic():
+            SearchDocument.objects.all().delete()
+            total = 0
+            for queryset in sources:
+                batch = []
+                for obj in queryset.order_by('pk').iterator(chunk_size=chunk_size):
+                    batch.append(search.build_document(obj))
+                    if len(batch) >= chunk_size:
+                        SearchDocument.objects.bulk_create(batch)
+                        total += len(batch)
+                        batch = []
+                if batch:
+                    SearchDocument.objects.bulk_create(batch)
+                    total += len(batch)
+                self.stdout.write(f"Indexed {queryset.model.__name__} objects")
+            search.rebuild_fts()
+
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt: {total} documents"))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from social import funding_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute ProjectFunding.raised / supporter_count from the supporter rows "
+        "and fix any drift (run nightly)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without writing")
+        parser.add_argument('--batch-size', type=int, default=funding_stats.RECONCILE_BATCH)
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        def progress(scanned, drifted):
+            self.stdout.write(f"{scanned} campaigns scanned, {drifted} drifted")
+
+        stats = funding_stats.reconcile(dry_run=dry_run, batch_size=options['batch_size'], on_batch=progress)
+
+        if stats['drifted'] and options['verbosity'] > 1:
+            self.stdout.write("Drifted funding ids: " + ", ".join(map(str, stats['drifted'])))
+        verb = "would fix" if dry_run else "fixed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['scanned']} campaigns in {stats['seconds']:.2f}s "
+            f"({stats['per_second']:.0f}/s); {len(stats['drifted'])} drifted, {verb} "
+            f"{len(stats['drifted']) if dry_run else stats['fixed']}"
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from social.models import ProjectFunding
+
+
+class Command(BaseCommand):
+    help = "Enable sharded donation counters for a project's funding (0 disables them)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_id', type=int)
+        parser.add_argument('shards', type=int, help="Number of counter shards, e.g. 16; 0 to disable")
+
+    def handle(self, *args, **options):
+        if not 0 <= options['shards'] <= 256:
+            raise CommandError("shards must be between 0 and 256")
+        try:
+            funding = ProjectFunding.objects.get(project_id=options['project_id'])
+        except ProjectFunding.DoesNotExist:
+            raise CommandError("Funding is not enabled for this project")
+
+        funding.set_counter_shards(options['shards'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Funding for project {options['project_id']} now uses {options['shards']} shards"
+        ))
@@ -0,0 +1,218 @@
+# social/media_gc.py
+"""
+Garbage collection of MEDIA_ROOT (`manage.py gc_media`).
+
+Deleting a post, project or photo, or replacing an image, leaves its file
+(and its derivatives) on disk. The collector:
+
+1. Builds the set of referenced names by streaming `values_list` iterators
+   over every image field and every `<field>_variants` column. No model
+   instances are built, so memory is one string per referenced file.
+2. Walks MEDIA_ROOT with os.scandir and yields every file that isn't in the
+   set and hasn't been modified within the grace period (a file being
+   saved right now may not have its row yet).
+3. Deletes the orphans in batches, or moves them under a quarantine
+   directory (same relative path) so they can be restored. An optional rate
+   limit sleeps between batches to spare the disk.
+
+Content-addressed blobs are removed one at a time with their MediaBlob row
+locked and its ref_count re-checked, deleting the file before the row's
+deletion commits. storage.save() takes the same lock before it reuses a
+file, so a re-upload of the same bytes either keeps the blob or writes it
+again. Leftover blobs/tmp files and the part files of finished
+or abandoned upload sessions are cleaned up as well.
+"""
+import os
+import shutil
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import images, uploads
+from .models import MediaBlob, UploadSession
+from .storage import BLOB_ROOT, is_blob
+
+GC_BATCH = 500
+# Files younger than this may belong to a save whose row isn't committed yet
+GRACE = timedelta(hours=1)
+ITERATOR_CHUNK = 2000
+
+
+def referenced_names():
+    """Every media name a row points at: images and their derivatives."""
+    names = set()
+    for model, field_name in images.IMAGE_FIELDS.items():
+        column = images.variants_field(field_name)
+        rows = model.objects.exclude(**{field_name: ''}).values_list(field_name, column)
+        for name, variants in rows.iterator(chunk_size=ITERATOR_CHUNK):
+            names.add(name)
+            for variant in images.VARIANT_WIDTHS:
+                for fmt in images.FORMATS:
+                    derivative = ((variants or {}).get(variant) or {}).get(fmt)
+                    if derivative:
+                        names.add(derivative)
+    return names
+
+
+def walk(root, skip=()):
+    """Yield paths of all files under `root` relative to it, '/'-separated."""
+    stack = ['']
+    while stack:
+        relative = stack.pop()
+        try:
+            entries = os.scandir(os.path.join(root, relative))
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                path = f'{relative}/{entry.name}' if relative else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if path not in skip:
+                        stack.append(path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield path, entry.stat(follow_symlinks=False).st_mtime
+
+
+def find_orphans(referenced, grace, quarantine_dir=None):
+    """Unreferenced media files older than `grace` (a timedelta)."""
+    root = str(settings.MEDIA_ROOT)
+    cutoff = time.time() - grace.total_seconds()
+    skip = {f'{BLOB_ROOT}/tmp'}
+    if quarantine_dir:
+        relative = os.path.relpath(quarantine_dir, root)
+        if not relative.startswith('..'):
+            skip.add(relative.replace(os.sep, '/'))
+    for path, mtime in walk(root, skip=skip):
+        if mtime < cutoff and path not in referenced:
+            yield path
+
+
+def stale_temp_files(grace):
+    """Half-written uploads in blobs/tmp, left behind by crashed requests."""
+    tmp_root = os.path.join(settings.MEDIA_ROOT, BLOB_ROOT, 'tmp')
+    cutoff = time.time() - grace.total_seconds()
+    for path, mtime in walk(tmp_root):
+        if mtime < cutoff:
+            yield f'{BLOB_ROOT}/tmp/{path}'
+
+
+def expire_upload_sessions(dry_run=False):
+    """
+    Abort open sessions idle for longer than uploads.SESSION_TTL and remove
+    part files no open session owns. Returns (sessions expired, part files removed).
+    """
+    stale_ids = set(
+        str(pk) for pk in UploadSession.objects.filter(
+            status=UploadSession.STATUS_OPEN, updated_at__lt=timezone.now() - uploads.SESSION_TTL,
+        ).values_list('pk', flat=True).iterator(chunk_size=ITERATOR_CHUNK)
+    )
+    if stale_ids and not dry_run:
+        UploadSession.objects.filter(pk__in=stale_ids).update(
+            status=UploadSession.STATUS_ABORTED, updated_at=timezone.now(),
+        )
+    open_ids = set(
+        str(pk) for pk in UploadSession.objects.filter(status=UploadSession.STATUS_OPEN)
+        .values_list('pk', flat=True).iterator(chunk_size=ITERATOR_CHUNK)
+    ) - stale_ids
+
+    part_dir = uploads.upload_dir()
+    removed = 0
+    for path, _ in walk(part_dir):
+        if os.path.splitext(path)[0] in open_ids:
+            continue
+        removed += 1
+        if not dry_run:
+            os.unlink(os.path.join(part_dir, path))
+    return len(stale_ids), removed
+
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _remove(path, quarantine_dir):
+    full_path = os.path.join(settings.MEDIA_ROOT, path)
+    try:
+        if quarantine_dir:
+            target = os.path.join(quarantine_dir, path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.move(full_path, target)
+        else:
+            os.unlink(full_path)
+    except FileNotFoundError:
+        pass  # removed since the walk
+
+
+def _collect_blob(path, dry_run, quarantine_dir):
+    """Remove one orphaned blob and its row. Returns False if the blob is still in use."""
+    if dry_run:
+        return not MediaBlob.objects.filter(name=path, ref_count__gt=0).exists()
+    digest = os.path.splitext(os.path.basename(path))[0]
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(name=path).first()
+        if blob is None and not MediaBlob.objects.filter(sha256=digest).exists():
+            # No row: claim one, so a save of the same bytes waits for us
+            try:
+                with transaction.atomic():
+                    blob = MediaBlob.objects.create(sha256=digest, name=path, size=0)
+            except IntegrityError:
+                return False  # being saved right now
+        if blob is not None:
+            if blob.ref_count > 0:
+                return False
+            blob.delete()
+        _remove(path, quarantine_dir)
+    return True
+
+
+def collect(dry_run=False, quarantine_dir=None, grace=GRACE, batch_size=GC_BATCH,
+            max_per_second=None, on_batch=None):
+    """
+    Remove (or quarantine) orphaned media. Returns counts per kind; with
+    dry_run nothing is touched and the counts are what would be removed.
+    """
+    started = time.monotonic()
+    stats = {'orphans': 0, 'blobs': 0, 'kept_blobs': 0, 'tmp': 0, 'sessions': 0, 'parts': 0}
+
+    referenced = referenced_names()
+    for batch in _batches(find_orphans(referenced, grace, quarantine_dir), batch_size):
+        blobs = [path for path in batch if is_blob(path)]
+        if blobs:
+            # Blobs counted as used are kept: re-uploaded since the walk, or a
+            # reference that isn't visible yet
+            still_used = {path for path in blobs if not _collect_blob(path, dry_run, quarantine_dir)}
+            batch = [path for path in batch if path not in still_used]
+            stats['kept_blobs'] += len(still_used)
+
+        if not dry_run:
+            for path in batch:
+                if not is_blob(path):
+                    _remove(path, quarantine_dir)
+        stats['orphans'] += len(batch)
+        stats['blobs'] += sum(1 for path in batch if is_blob(path))
+        if on_batch:
+            on_batch(stats)
+        if max_per_second:
+            # Sleep off whatever this batch took less than its rate-limited budget
+            budget = len(batch) / max_per_second
+            time.sleep(max(0.0, budget - (time.monotonic() - started)))
+            started = time.monotonic()
+
+    for batch in _batches(stale_temp_files(grace), batch_size):
+        if not dry_run:
+            for path in batch:
+                _remove(path, None)
+        stats['tmp'] += len(batch)
+
+    stats['sessions'], stats['parts'] = expire_upload_sessions(dry_run=dry_run)
+    return stats
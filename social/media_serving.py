@@ -0,0 +1,172 @@
+# social/media_serving.py
+"""
+Serving MEDIA_ROOT files in every environment.
+
+serve_media() answers conditional requests (If-None-Match /
+If-Modified-Since -> 304) and single byte ranges (206, with If-Range)
+itself. Content-addressed blobs and derivatives (whose names carry a hash
+of their bytes, see images.py) never change under the same name, so they
+get a year-long immutable Cache-Control. Other files get a short max-age.
+
+With settings.MEDIA_OFFLOAD set, the response carries no body. Instead it
+tells the front proxy which file to send: 'x-sendfile' for Apache/lighttpd
+(X-Sendfile: absolute path), 'x-accel-redirect' for nginx
+(X-Accel-Redirect: MEDIA_ACCEL_REDIRECT_PREFIX + path, an `internal`
+location aliased to MEDIA_ROOT). The proxy then handles ranges, so Python
+workers never stream file bytes.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe, parse_etags
+from django.views.decorators.http import require_safe
+
+from .storage import BLOB_ROOT
+
+STREAM_CHUNK = 64 * 1024
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE = 'public, max-age=3600'
+
+# A 64-hex-digit path segment: blobs/ab/cd/<sha256>.jpg
+CONTENT_HASH_RE = re.compile(r'(^|/)[0-9a-f]{64}(\.[\w]+)?(/|$)')
+# A derivative named after its own bytes: derivatives/.../feed.<16 hex>.webp
+DERIVATIVE_HASH_RE = re.compile(r'/\w+\.[0-9a-f]{16}\.\w+$')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def is_immutable(path):
+    if path.startswith(f'{BLOB_ROOT}/'):
+        return bool(CONTENT_HASH_RE.search(path))
+    # Derivatives written before their names carried a hash were overwritten in place
+    return path.startswith('derivatives/') and bool(DERIVATIVE_HASH_RE.search(path))
+
+
+def make_etag(path, stat):
+    """Strong ETag: the content hash for content-addressed files, else size + mtime."""
+    if path.startswith(f'{BLOB_ROOT}/'):
+        return '"%s"' % os.path.splitext(os.path.basename(path))[0]
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single satisfiable range, None to serve the
+    whole file (no header, or multiple ranges), or 'unsatisfiable'.
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match:
+        return None  # multipart or malformed: a full 200 is always allowed
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # suffix range: last N bytes
+        length = int(last)
+        if length == 0:
+            return 'unsatisfiable'
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        return 'unsatisfiable'
+    return start, end
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        return if_none_match.strip() == '*' or etag in parse_etags(if_none_match)
+    since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return since is not None and int(mtime) <= since
+
+
+def _iter_range(full_path, start, length):
+    with open(full_path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(STREAM_CHUNK, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:  # path escapes MEDIA_ROOT
+        raise Http404
+    if path.startswith(f'{BLOB_ROOT}/tmp/'):
+        raise Http404  # uploads still being written
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    etag = make_etag(path, stat)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': IMMUTABLE_CACHE if is_immutable(path) else DEFAULT_CACHE,
+        'Accept-Ranges': 'bytes',
+    }
+    if _not_modified(request, etag, stat.st_mtime):
+        response = HttpResponseNotModified()
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    offload = getattr(settings, 'MEDIA_OFFLOAD', None)
+    if offload:
+        # Ranges and streaming are left to the proxy
+        response = HttpResponse(content_type=content_type)
+        if offload == 'x-accel-redirect':
+            prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+            response['X-Accel-Redirect'] = prefix + quote(path)
+        else:
+            response['X-Sendfile'] = full_path
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    size = stat.st_size
+    byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if byte_range and if_range and if_range.strip() != etag:
+        byte_range = None  # the client's partial copy is stale: send it all
+
+    if byte_range == 'unsatisfiable':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        body = _iter_range(full_path, start, length) if request.method != 'HEAD' else []
+        response = StreamingHttpResponse(body, status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(length)
+    else:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        response['Content-Length'] = str(size)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    for name, value in headers.items():
+        response[name] = value
+    return response
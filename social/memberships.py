@@ -0,0 +1,49 @@
+# social/memberships.py
+"""
+Keeps ProjectMembership in step with Project.creator and Project.collaborators.
+sync_projects() recomputes the wanted rows for a set of projects and applies
+only the difference, so it is safe to call after any change.
+"""
+from .models import Project, ProjectMembership
+
+Collaborators = Project.collaborators.through
+
+
+def sync_projects(project_ids):
+    project_ids = list(project_ids)
+    if not project_ids:
+        return
+
+    wanted = {}
+    for project_id, user_id in Collaborators.objects.filter(
+        project_id__in=project_ids
+    ).values_list('project_id', 'user_id'):
+        wanted[(project_id, user_id)] = ProjectMembership.ROLE_COLLABORATOR
+    # Creator wins if the creator is also listed as a collaborator
+    for project_id, user_id in Project.objects.filter(
+        id__in=project_ids
+    ).values_list('id', 'creator_id'):
+        wanted[(project_id, user_id)] = ProjectMembership.ROLE_CREATOR
+
+    existing = {
+        (m.project_id, m.user_id): m
+        for m in ProjectMembership.objects.filter(project_id__in=project_ids)
+    }
+
+    stale = [m.pk for key, m in existing.items() if key not in wanted]
+    if stale:
+        ProjectMembership.objects.filter(pk__in=stale).delete()
+
+    changed = []
+    for key, membership in existing.items():
+        if key in wanted and membership.role != wanted[key]:
+            membership.role = wanted[key]
+            changed.append(membership)
+    if changed:
+        ProjectMembership.objects.bulk_update(changed, ['role'])
+
+    ProjectMembership.objects.bulk_create([
+        ProjectMembership(project_id=project_id, user_id=user_id, role=role)
+        for (project_id, user_id), role in wanted.items()
+        if (project_id, user_id) not in existing
+    ], ignore_conflicts=True)
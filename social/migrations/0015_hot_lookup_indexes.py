@@ -0,0 +1,44 @@
+# Generated by Django 4.2.20 on 2026-10-19 11:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('social', '0014_projectfunding_projectsupporter_projectbudgetitem'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['content_type', 'object_id', '-created_at'], name='comment_target_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['following', 'follower'], name='follow_following_follower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='like',
+            index=models.Index(fields=['content_type', 'object_id'], name='like_target_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['recipient', '-created_at'], name='message_recipient_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['sender', '-created_at'], name='message_sender_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['user', '-created_at'], name='post_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='verbalpost',
+            index=models.Index(fields=['user', '-created_at'], name='verbalpost_user_created_idx'),
+        ),
+    ]
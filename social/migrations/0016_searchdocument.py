@@ -0,0 +1,93 @@
+# Generated by Django 4.2.20 on 2026-10-19 11:15
+
+from django.db import migrations, models
+
+
+# SQLite: external-content FTS5 table over social_searchdocument, kept in
+# sync with it by triggers (see https://sqlite.org/fts5.html#external_content_tables)
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE social_searchdocument_fts USING fts5(
+        title, body,
+        content='social_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER social_searchdocument_ai AFTER INSERT ON social_searchdocument BEGIN
+        INSERT INTO social_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER social_searchdocument_ad AFTER DELETE ON social_searchdocument BEGIN
+        INSERT INTO social_searchdocument_fts(social_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER social_searchdocument_au AFTER UPDATE ON social_searchdocument BEGIN
+        INSERT INTO social_searchdocument_fts(social_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO social_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS social_searchdocument_au",
+    "DROP TRIGGER IF EXISTS social_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS social_searchdocument_ai",
+    "DROP TABLE IF EXISTS social_searchdocument_fts",
+]
+
+# Postgres: generated tsvector column (title weighted above body) + GIN index
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE social_searchdocument ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX social_searchdocument_vector_idx ON social_searchdocument USING GIN (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS social_searchdocument_vector_idx",
+    "ALTER TABLE social_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for sql in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0015_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('profile', 'Profile'), ('project', 'Project'), ('post', 'Image post'), ('verbalpost', 'Verbal post')], max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            _run({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRES_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.20 on 2026-10-19 11:17
+
+import unicodedata
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Frozen copy of social.autocomplete.normalize / key_strings
+def normalize(text):
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.casefold().split())
+
+
+def key_strings(username, first_name='', last_name=''):
+    full_name = f"{first_name} {last_name}"
+    keys = {normalize(value)[:300] for value in (username, first_name, last_name, full_name)}
+    keys.discard('')
+    return keys
+
+
+def backfill_keys(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    AutocompleteKey = apps.get_model('social', 'AutocompleteKey')
+    batch = []
+    users = User.objects.order_by('pk').values_list('pk', 'username', 'first_name', 'last_name')
+    for pk, username, first_name, last_name in users.iterator(chunk_size=2000):
+        batch.extend(
+            AutocompleteKey(key=key, user_id=pk)
+            for key in key_strings(username, first_name, last_name)
+        )
+        if len(batch) >= 5000:
+            AutocompleteKey.objects.bulk_create(batch)
+            batch = []
+    AutocompleteKey.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0016_searchdocument'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AutocompleteKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=300)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='autocomplete_keys', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('key', 'user')},
+            },
+        ),
+        migrations.RunPython(backfill_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 4.2.20 on 2026-10-19 11:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('social', '0017_autocompletekey'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('post_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Mention',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField()),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mentions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-created_at'], name='mention_user_created_idx'), models.Index(fields=['content_type', 'object_id'], name='mention_target_idx')],
+                'unique_together': {('user', 'content_type', 'object_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PostTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField()),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_tags', to='social.tag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tag', '-created_at', '-id'], name='posttag_tag_created_idx'), models.Index(fields=['content_type', 'object_id'], name='posttag_target_idx'), models.Index(fields=['created_at'], name='posttag_created_idx')],
+                'unique_together': {('tag', 'content_type', 'object_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TrendingTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.CharField(choices=[('1h', 'Last hour'), ('24h', 'Last 24 hours'), ('7d', 'Last 7 days')], max_length=5)),
+                ('rank', models.PositiveIntegerField()),
+                ('count', models.PositiveIntegerField()),
+                ('computed_at', models.DateTimeField()),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='social.tag')),
+            ],
+            options={
+                'ordering': ['window', 'rank'],
+                'unique_together': {('window', 'rank')},
+            },
+        ),
+    ]
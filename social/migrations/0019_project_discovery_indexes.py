@@ -0,0 +1,31 @@
+# Generated by Django 4.2.20 on 2026-10-19 11:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0018_tags_mentions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['status', '-id'], name='project_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['budget_type', '-id'], name='project_budget_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['project_type', '-id'], name='project_project_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['start_date', 'end_date'], name='project_dates_idx'),
+        ),
+    ]
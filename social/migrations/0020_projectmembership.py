@@ -0,0 +1,45 @@
+# Generated by Django 4.2.20 on 2026-10-19 11:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_memberships(apps, schema_editor):
+    Project = apps.get_model('social', 'Project')
+    ProjectMembership = apps.get_model('social', 'ProjectMembership')
+    Collaborators = Project.collaborators.through
+
+    ProjectMembership.objects.bulk_create([
+        ProjectMembership(user_id=creator_id, project_id=project_id, role='creator')
+        for project_id, creator_id in Project.objects.values_list('id', 'creator_id').iterator()
+    ], batch_size=1000)
+    # A creator also listed as collaborator keeps the creator row
+    ProjectMembership.objects.bulk_create([
+        ProjectMembership(user_id=user_id, project_id=project_id, role='collaborator')
+        for project_id, user_id in Collaborators.objects.values_list('project_id', 'user_id').iterator()
+    ], batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0019_project_discovery_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('creator', 'Creator'), ('collaborator', 'Collaborator')], max_length=20)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='social.project')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'project')},
+            },
+        ),
+        migrations.RunPython(backfill_memberships, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.20 on 2026-10-19 11:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0020_projectmembership'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectfunding',
+            name='counter_shards',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ProjectFundingShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('raised', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('supporter_count', models.PositiveIntegerField(default=0)),
+                ('funding', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shards', to='social.projectfunding')),
+            ],
+            options={
+                'unique_together': {('funding', 'shard')},
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:26
+
+from django.conf import settings
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def backfill_percent_funded(apps, schema_editor):
+    ProjectFunding = apps.get_model('social', 'ProjectFunding')
+    changed = []
+    for funding in ProjectFunding.objects.filter(goal__gt=0).iterator(chunk_size=1000):
+        funding.percent_funded = round(funding.raised * 100 / funding.goal, 2)
+        changed.append(funding)
+    ProjectFunding.objects.bulk_update(changed, ['percent_funded'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0021_funding_counter_shards'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectfunding',
+            name='percent_funded',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=9),
+        ),
+        migrations.RunPython(backfill_percent_funded, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='projectfunding',
+            index=models.Index(fields=['-raised', 'id'], name='funding_raised_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectfunding',
+            index=models.Index(fields=['-supporter_count', 'id'], name='funding_supporters_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectfunding',
+            index=models.Index(fields=['-percent_funded', 'id'], name='funding_percent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectsupporter',
+            index=models.Index(fields=['funding', '-created_at', '-id'], name='supporter_funding_created_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily(apps, schema_editor):
+    ProjectSupporter = apps.get_model('social', 'ProjectSupporter')
+    ProjectFundingDaily = apps.get_model('social', 'ProjectFundingDaily')
+    rows = (
+        ProjectSupporter.objects.annotate(day=TruncDate('created_at'))
+        .order_by().values('funding_id', 'day')
+        .annotate(raised=Sum('amount'), supporters=Count('id'))
+    )
+    ProjectFundingDaily.objects.bulk_create([
+        ProjectFundingDaily(
+            funding_id=row['funding_id'], date=row['day'],
+            raised=row['raised'], supporter_count=row['supporters'],
+        )
+        for row in rows.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0022_funding_leaderboard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectFundingDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('raised', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('supporter_count', models.PositiveIntegerField(default=0)),
+                ('funding', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily', to='social.projectfunding')),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('funding', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_daily, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+IMAGE_FIELDS = {
+    'post': 'image',
+    'projectphoto': 'image',
+    'project': 'cover_photo',
+    'profile': 'profile_image',
+}
+
+
+def mark_existing_images(apps, schema_editor):
+    """Images with derivatives are ready; the rest get a job queued."""
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    ImageJob = apps.get_model('social', 'ImageJob')
+    for model_name, field_name in IMAGE_FIELDS.items():
+        model = apps.get_model('social', model_name)
+        ct, _ = ContentType.objects.get_or_create(app_label='social', model=model_name)
+        jobs = []
+        ready = []
+        rows = (
+            model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            .values_list('pk', field_name, f'{field_name}_variants')
+        )
+        for pk, name, variants in rows.iterator():
+            if (variants or {}).get('source') == name:
+                ready.append(pk)
+            else:
+                jobs.append(ImageJob(content_type=ct, object_id=pk, field_name=field_name))
+        for start in range(0, len(ready), 500):
+            model.objects.filter(pk__in=ready[start:start + 500]).update(**{f'{field_name}_status': 'ready'})
+        ImageJob.objects.bulk_create(jobs, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('social', '0024_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='profile_image_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='cover_photo_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='projectphoto',
+            name='image_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', editable=False, max_length=10),
+        ),
+        migrations.CreateModel(
+            name='ImageJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('field_name', models.CharField(max_length=50)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'id'], name='imagejob_status_idx')],
+            },
+        ),
+        migrations.RunPython(mark_existing_images, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0025_image_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='profile_image_placeholder',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='cover_photo_placeholder',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='projectphoto',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
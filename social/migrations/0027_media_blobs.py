@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:36
+
+import social.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0026_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.BigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('phash', models.CharField(blank=True, max_length=16)),
+                ('phash_band0', models.PositiveIntegerField(db_index=True, null=True)),
+                ('phash_band1', models.PositiveIntegerField(db_index=True, null=True)),
+                ('phash_band2', models.PositiveIntegerField(db_index=True, null=True)),
+                ('phash_band3', models.PositiveIntegerField(db_index=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(storage=social.storage.get_media_storage, upload_to='post_images/'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='profile_image',
+            field=models.ImageField(blank=True, null=True, storage=social.storage.get_media_storage, upload_to='profile_images/'),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='cover_photo',
+            field=models.ImageField(blank=True, null=True, storage=social.storage.get_media_storage, upload_to='project_covers/'),
+        ),
+        migrations.AlterField(
+            model_name='projectphoto',
+            name='image',
+            field=models.ImageField(storage=social.storage.get_media_storage, upload_to='project_photos/'),
+        ),
+    ]
@@ -0,0 +1,125 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_conversations(apps, schema_editor):
+    Message = apps.get_model('social', 'Message')
+    Conversation = apps.get_model('social', 'Conversation')
+    ConversationParticipant = apps.get_model('social', 'ConversationParticipant')
+
+    pairs = {
+        tuple(sorted(pair))
+        for pair in Message.objects.order_by().values_list('sender_id', 'recipient_id').distinct().iterator()
+    }
+    Conversation.objects.bulk_create(
+        [Conversation(user_low_id=low, user_high_id=high) for low, high in pairs], batch_size=1000,
+    )
+    conversation_ids = {
+        (low, high): pk for pk, low, high in Conversation.objects.values_list('pk', 'user_low_id', 'user_high_id')
+    }
+    ConversationParticipant.objects.bulk_create([
+        ConversationParticipant(conversation_id=pk, user_id=user_id)
+        for (low, high), pk in conversation_ids.items() for user_id in {low, high}
+    ], batch_size=1000)
+
+    for (low, high), pk in conversation_ids.items():
+        Message.objects.filter(
+            Q(sender_id=low, recipient_id=high) | Q(sender_id=high, recipient_id=low)
+        ).update(conversation_id=pk)
+
+    # Newest message per conversation: the first row of each group in this order
+    latest = Message.objects.order_by('conversation_id', '-created_at', '-id').values_list(
+        'conversation_id', 'created_at', 'body', 'sender_id'
+    )
+    seen = set()
+    for pk, created_at, body, sender_id in latest.iterator():
+        if pk in seen:
+            continue
+        seen.add(pk)
+        body = ' '.join(body.split())
+        Conversation.objects.filter(pk=pk).update(
+            last_message_at=created_at, last_sender_id=sender_id,
+            last_message_preview=body if len(body) <= 140 else body[:139] + '…',
+        )
+        ConversationParticipant.objects.filter(conversation_id=pk).update(last_message_at=created_at)
+
+    unread = (
+        Message.objects.filter(is_read=False).exclude(sender_id=models.F('recipient_id'))
+        .order_by().values('conversation_id', 'recipient_id').annotate(n=Count('id'))
+    )
+    for row in unread.iterator():
+        ConversationParticipant.objects.filter(
+            conversation_id=row['conversation_id'], user_id=row['recipient_id'],
+        ).update(unread_count=row['n'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0028_upload_sessions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationParticipant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('last_message_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_message_at', models.DateTimeField(blank=True, null=True)),
+                ('last_message_preview', models.CharField(blank=True, max_length=140)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_sender', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user_high', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user_low', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='conversation',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='social.conversation'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'created_at'], name='message_conversation_idx'),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='conversation',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='social.conversation'),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversation_memberships', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='participants',
+            field=models.ManyToManyField(related_name='conversations', through='social.ConversationParticipant', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='conversationparticipant',
+            index=models.Index(fields=['user', '-last_message_at', '-id'], name='conversation_inbox_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='conversationparticipant',
+            unique_together={('conversation', 'user')},
+        ),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(fields=('user_low', 'user_high'), name='conversation_pair_unique'),
+        ),
+        migrations.RunPython(backfill_conversations, migrations.RunPython.noop),
+    ]
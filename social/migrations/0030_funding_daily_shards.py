@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0029_conversations'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='projectfundingdaily',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='projectfundingdaily',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterUniqueTogether(
+            name='projectfundingdaily',
+            unique_together={('funding', 'date', 'shard')},
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:58
+
+from django.db import migrations, models
+from django.db.models import Q
+
+IMAGE_FIELDS = {
+    'post': 'image',
+    'projectphoto': 'image',
+    'project': 'cover_photo',
+    'profile': 'profile_image',
+}
+
+
+def mark_missing_images(apps, schema_editor):
+    """Rows without an image were left pending; they have nothing to process."""
+    for model_name, field_name in IMAGE_FIELDS.items():
+        model = apps.get_model('social', model_name)
+        model.objects.filter(Q(**{field_name: ''}) | Q(**{f'{field_name}__isnull': True})).update(
+            **{f'{field_name}_status': 'none'}
+        )
+
+
+def unmark_missing_images(apps, schema_editor):
+    for model_name, field_name in IMAGE_FIELDS.items():
+        apps.get_model('social', model_name).objects.filter(
+            **{f'{field_name}_status': 'none'}
+        ).update(**{f'{field_name}_status': 'pending'})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0030_funding_daily_shards'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image_status',
+            field=models.CharField(choices=[('none', 'No image'), ('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='none', editable=False, max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='profile_image_status',
+            field=models.CharField(choices=[('none', 'No image'), ('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='none', editable=False, max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='cover_photo_status',
+            field=models.CharField(choices=[('none', 'No image'), ('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='none', editable=False, max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='projectphoto',
+            name='image_status',
+            field=models.CharField(choices=[('none', 'No image'), ('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='none', editable=False, max_length=10),
+        ),
+        migrations.RunPython(mark_missing_images, unmark_missing_images),
+    ]
@@ -1,7 +1,10 @@
 # Create your models here.
+import random
+import uuid
 from decimal import Decimal
-from django.db import models
-from django.db.models import F
+from functools import cached_property
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, Sum, Case, When, Value, ExpressionWrapper, OuterRef, Subquery
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
@@ -10,6 +13,8 @@ from django.utils import timezone
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
 
+from .storage import get_media_storage
+
 # --------- BASE MODEL FOR TIMESTAMPING ----------
 class TimestampedModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -17,6 +22,26 @@ class TimestampedModel(models.Model):
     class Meta:
         abstract = True
 
+# --------- IMAGE PROCESSING STATUS ----------
+# Derivatives (see images.py) are generated by the image job queue; until
+# then an image's <field>_status is pending and clients show a placeholder.
+# A row without an image is none.
+IMAGE_NONE = 'none'
+IMAGE_PENDING = 'pending'
+IMAGE_READY = 'ready'
+IMAGE_FAILED = 'failed'
+IMAGE_STATUS_CHOICES = [
+    (IMAGE_NONE, 'No image'),
+    (IMAGE_PENDING, 'Pending'),
+    (IMAGE_READY, 'Ready'),
+    (IMAGE_FAILED, 'Failed'),
+]
+
+
+def image_status_field():
+    return models.CharField(max_length=10, choices=IMAGE_STATUS_CHOICES, default=IMAGE_NONE, editable=False)
+
+
 # --------- USER PROFILE ----------
 class Profile(models.Model):
     USER_TYPES = [
@@ -28,7 +53,10 @@ class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     user_type = models.CharField(max_length=20, choices=USER_TYPES, default='artist')
     bio = models.TextField(blank=True, max_length=1500)
-    profile_image = models.ImageField(upload_to='profile_images/', blank=True, null=True)
+    profile_image = models.ImageField(upload_to='profile_images/', storage=get_media_storage, blank=True, null=True)
+    profile_image_variants = models.JSONField(default=dict, blank=True, editable=False)  # see images.py
+    profile_image_status = image_status_field()
+    profile_image_placeholder = models.TextField(blank=True, editable=False)  # LQIP data URI
     date_joined = models.DateTimeField(auto_now_add=True)
     # Removed duplicate user_type field that was here
 
@@ -41,7 +69,10 @@ class Profile(models.Model):
 # --------- IMAGE POST ----------
 class Post(TimestampedModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    image = models.ImageField(upload_to='post_images/')
+    image = models.ImageField(upload_to='post_images/', storage=get_media_storage)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)  # see images.py
+    image_status = image_status_field()
+    image_placeholder = models.TextField(blank=True, editable=False)  # LQIP data URI
     caption = models.TextField(blank=True)
 
     def __str__(self):
@@ -49,6 +80,10 @@ class Post(TimestampedModel):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Profile and feed listings: filter by author, newest first
+            models.Index(fields=['user', '-created_at'], name='post_user_created_idx'),
+        ]
 
 # --------- VERBAL POST (text only) ----------
 class VerbalPost(TimestampedModel):
@@ -60,6 +95,9 @@ class VerbalPost(TimestampedModel):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='verbalpost_user_created_idx'),
+        ]
 
 # --------- LIKE (generic, for both post types) ----------
 class Like(TimestampedModel):
@@ -70,6 +108,11 @@ class Like(TimestampedModel):
 
     class Meta:
         unique_together = ('user', 'content_type', 'object_id')
+        indexes = [
+            # Like counts filter by (content_type, object_id); the unique
+            # constraint above leads with user so it can't serve them.
+            models.Index(fields=['content_type', 'object_id'], name='like_target_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} liked {self.content_type} #{self.object_id}"
@@ -84,6 +127,9 @@ class Comment(TimestampedModel):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['content_type', 'object_id', '-created_at'], name='comment_target_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} commented: {self.content[:30]}..."
@@ -118,13 +164,25 @@ class Project(models.Model):
     description = models.TextField()
     project_type = models.CharField(max_length=20, choices=PROJECT_TYPES, default='solo')
     collaborators = models.ManyToManyField(User, blank=True, related_name='collaborative_projects')
-    cover_photo = models.ImageField(upload_to='project_covers/', blank=True, null=True)
+    cover_photo = models.ImageField(upload_to='project_covers/', storage=get_media_storage, blank=True, null=True)
+    cover_photo_variants = models.JSONField(default=dict, blank=True, editable=False)  # see images.py
+    cover_photo_status = image_status_field()
+    cover_photo_placeholder = models.TextField(blank=True, editable=False)  # LQIP data URI
 
     # ✅ new fields
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='ongoing')
     manifestations = models.ManyToManyField('Manifestation', blank=True)
     budget_type = models.CharField(max_length=20, choices=BUDGET_CHOICES, default='none')
 
+    class Meta:
+        indexes = [
+            # Discovery filters (see discovery.py)
+            models.Index(fields=['status', '-id'], name='project_status_idx'),
+            models.Index(fields=['budget_type', '-id'], name='project_budget_type_idx'),
+            models.Index(fields=['project_type', '-id'], name='project_project_type_idx'),
+            models.Index(fields=['start_date', 'end_date'], name='project_dates_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -140,6 +198,31 @@ class Project(models.Model):
         super().save(*args, **kwargs)
 
 
+# ----------- PROJECT MEMBERSHIP (materialized) --------------
+class ProjectMembership(models.Model):
+    """
+    One row per (user, project) for creators and collaborators, kept in sync
+    by signals (see memberships.py). "Projects for user X, newest first" is a
+    range scan on the (user, project) unique index instead of an OR + DISTINCT.
+    """
+    ROLE_CREATOR = 'creator'
+    ROLE_COLLABORATOR = 'collaborator'
+    ROLES = [
+        (ROLE_CREATOR, 'Creator'),
+        (ROLE_COLLABORATOR, 'Collaborator'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='project_memberships')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='memberships')
+    role = models.CharField(max_length=20, choices=ROLES)
+
+    class Meta:
+        unique_together = ('user', 'project')
+
+    def __str__(self):
+        return f"{self.user.username} ({self.role}) on {self.project.title}"
+
+
 #-------- MESSAGE MODEL --------
 class Message(TimestampedModel):
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_messages')
@@ -148,10 +231,129 @@ class Message(TimestampedModel):
     body = models.TextField()
     is_read = models.BooleanField(default=False)
     parent = models.ForeignKey('self', null=True, blank=True, related_name='replies', on_delete=models.CASCADE)
+    conversation = models.ForeignKey(
+        'Conversation', null=True, blank=True, related_name='messages', on_delete=models.CASCADE
+    )
+
+    class Meta:
+        indexes = [
+            # Inbox / outbox listings, newest first
+            models.Index(fields=['recipient', '-created_at'], name='message_recipient_created_idx'),
+            models.Index(fields=['sender', '-created_at'], name='message_sender_created_idx'),
+            # One thread, oldest first
+            models.Index(fields=['conversation', 'created_at'], name='message_conversation_idx'),
+        ]
 
     def __str__(self):
         return f'Message from {self.sender.username} to {self.recipient.username}: {self.subject}'
 
+    @transaction.atomic
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if adding and self.conversation_id is None:
+            # By the pair, not the parent: a reply can't land in a third party's thread
+            self.conversation = Conversation.between(self.sender, self.recipient)
+        super().save(*args, **kwargs)
+        if adding:
+            self.conversation.record_message(self)
+
+
+#------ CONVERSATIONS ------
+
+class Conversation(models.Model):
+    """
+    All messages between two users. The newest message is denormalized here
+    and the unread count per user on ConversationParticipant, both updated
+    on send, so the inbox never scans messages.
+    """
+    PREVIEW_LENGTH = 140
+
+    # The pair, lower user id first: one conversation per pair of users
+    user_low = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    user_high = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    participants = models.ManyToManyField(User, through='ConversationParticipant', related_name='conversations')
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    last_message_preview = models.CharField(max_length=PREVIEW_LENGTH, blank=True)
+    last_sender = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_low', 'user_high'], name='conversation_pair_unique'),
+        ]
+
+    def __str__(self):
+        return f'Conversation {self.user_low_id} / {self.user_high_id}'
+
+    @classmethod
+    def preview(cls, body):
+        body = ' '.join(body.split())
+        return body if len(body) <= cls.PREVIEW_LENGTH else body[:cls.PREVIEW_LENGTH - 1] + '…'
+
+    @classmethod
+    def between(cls, user, other):
+        """The conversation of two users, created with its participants if needed."""
+        low, high = sorted([user, other], key=lambda u: u.pk)
+        conversation = cls.objects.filter(user_low=low, user_high=high).first()
+        if conversation:
+            return conversation
+        try:
+            with transaction.atomic():
+                conversation = cls.objects.create(user_low=low, user_high=high)
+                ConversationParticipant.objects.bulk_create([
+                    ConversationParticipant(conversation=conversation, user_id=user_id)
+                    for user_id in {low.pk, high.pk}
+                ])
+                return conversation
+        except IntegrityError:
+            # The first message of the pair was sent concurrently
+            return cls.objects.get(user_low=low, user_high=high)
+
+    def record_message(self, message):
+        """Denormalize a new message: last-message fields and the recipient's unread count."""
+        newer = models.Q(last_message_at__isnull=True) | models.Q(last_message_at__lte=message.created_at)
+        Conversation.objects.filter(newer, pk=self.pk).update(
+            last_message_at=message.created_at,
+            last_message_preview=self.preview(message.body),
+            last_sender=message.sender,
+        )
+        # One UPDATE for both rows: move both up the inbox, bump the recipient's unread count
+        unread = F('unread_count')
+        if message.recipient_id != message.sender_id:
+            unread = Case(
+                When(user_id=message.recipient_id, then=F('unread_count') + 1), default=F('unread_count'),
+                output_field=models.PositiveIntegerField(),
+            )
+        self.memberships.update(
+            last_message_at=Case(
+                When(newer, then=Value(message.created_at)), default=F('last_message_at'),
+                output_field=models.DateTimeField(),
+            ),
+            unread_count=unread,
+        )
+
+    def mark_read(self, user):
+        """Clear `user`'s unread count and flag the messages they received as read."""
+        self.memberships.filter(user=user, unread_count__gt=0).update(unread_count=0)
+        self.messages.filter(recipient=user, is_read=False).update(is_read=True)
+
+
+class ConversationParticipant(models.Model):
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='memberships')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='conversation_memberships')
+    unread_count = models.PositiveIntegerField(default=0)
+    # Copy of conversation.last_message_at, so the inbox is one index range scan
+    last_message_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('conversation', 'user')
+        indexes = [
+            models.Index(fields=['user', '-last_message_at', '-id'], name='conversation_inbox_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} in conversation {self.conversation_id}'
+
 
 #------ FOLLOWING MODEL ------
 
@@ -162,6 +364,10 @@ class Follow(models.Model):
 
     class Meta:
         unique_together = ('follower', 'following')
+        indexes = [
+            # Follower lists and counts: covers (following) -> follower
+            models.Index(fields=['following', 'follower'], name='follow_following_follower_idx'),
+        ]
 
     def __str__(self):
         return f"{self.follower.username} follows {self.following.username}"
@@ -178,7 +384,10 @@ class Manifestation(models.Model):
 # ----------- PROJECT PHOTOS --------------
 class ProjectPhoto(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='photos')
-    image = models.ImageField(upload_to='project_photos/')
+    image = models.ImageField(upload_to='project_photos/', storage=get_media_storage)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)  # see images.py
+    image_status = image_status_field()
+    image_placeholder = models.TextField(blank=True, editable=False)  # LQIP data URI
     caption = models.CharField(max_length=200, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
@@ -211,19 +420,194 @@ class ProjectFunding(models.Model):
     raised = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     supporter_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    # 0 = every donation updates this row; N > 0 = donations spread over N
+    # ProjectFundingShard rows (for hot campaigns), folded back in by
+    # compact_shards(). Always read totals via total_raised / total_supporters.
+    counter_shards = models.PositiveSmallIntegerField(default=0)
+    # raised / goal * 100, maintained in the same UPDATE as raised so the
+    # "closest to goal" leaderboard is an index scan (uncapped, unlike percentage)
+    percent_funded = models.DecimalField(max_digits=9, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [
+            # Funding leaderboards (see api_views.FundingLeaderboardView)
+            models.Index(fields=['-raised', 'id'], name='funding_raised_idx'),
+            models.Index(fields=['-supporter_count', 'id'], name='funding_supporters_idx'),
+            models.Index(fields=['-percent_funded', 'id'], name='funding_percent_idx'),
+        ]
 
     def __str__(self):
-        return f"Funding for {self.project.title}: ${self.raised}/${self.goal}"
+        return f"Funding for {self.project.title}: ${self.total_raised}/${self.goal}"
+
+    @staticmethod
+    def percent_expression(raised):
+        """SQL expression for percent_funded given an expression for raised."""
+        return Case(
+            When(goal__gt=0, then=ExpressionWrapper(
+                # float factor: SQLite stores whole decimals as integers and
+                # would otherwise truncate the division
+                raised * Value(100.0) / F('goal'),
+                output_field=models.DecimalField(max_digits=9, decimal_places=2),
+            )),
+            default=Value(Decimal('0')),
+            output_field=models.DecimalField(max_digits=9, decimal_places=2),
+        )
+
+    def save(self, *args, **kwargs):
+        goal = self.goal or 0
+        raised = self.raised or 0
+        self.percent_funded = round(Decimal(raised) * 100 / Decimal(goal), 2) if goal > 0 else Decimal('0')
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def shard_total_annotations(funding_id='pk', prefix=''):
+        """
+        Subquery annotations with each row's shard sums, so listing many
+        campaigns doesn't aggregate shards once per row. funding_id is the
+        path to the ProjectFunding id from the annotated model ('pk' on
+        ProjectFunding, 'funding__id' on Project); _shard_totals picks up
+        `shard_raised` / `shard_supporters` (see serializers.funding_summary
+        for the prefixed form on Project rows).
+        """
+        shards = ProjectFundingShard.objects.filter(funding_id=OuterRef(funding_id)).order_by().values('funding_id')
+        return {
+            f'{prefix}shard_raised': Subquery(shards.annotate(total=Sum('raised')).values('total')),
+            f'{prefix}shard_supporters': Subquery(shards.annotate(total=Sum('supporter_count')).values('total')),
+        }
+
+    @cached_property
+    def _shard_totals(self):
+        if not self.counter_shards:
+            return Decimal('0'), 0
+        if 'shard_raised' in self.__dict__:  # annotated by the queryset
+            return Decimal(self.shard_raised or 0), self.shard_supporters or 0
+        totals = self.shards.aggregate(raised=Sum('raised'), supporters=Sum('supporter_count'))
+        return totals['raised'] or Decimal('0'), totals['supporters'] or 0
+
+    @property
+    def total_raised(self):
+        return ((self.raised or Decimal('0')) + self._shard_totals[0]).quantize(Decimal('0.01'))
+
+    @property
+    def total_supporters(self):
+        return self.supporter_count + self._shard_totals[1]
 
     @property
     def percentage(self):
         if self.goal > 0:
-            return min(round((self.raised / self.goal) * 100), 100)
+            return min(round((self.total_raised / self.goal) * 100), 100)
         return 0
 
     @property
     def is_funded(self):
-        return self.raised >= self.goal
+        return self.total_raised >= self.goal
+
+    def record_support(self, amount):
+        """
+        Add one donation to the totals without a read-modify-write. Returns
+        the shard it was counted in (0 for this row), for the daily rollup.
+        """
+        if self.counter_shards:
+            shard = random.randrange(self.counter_shards)
+            updated = ProjectFundingShard.objects.filter(
+                funding_id=self.pk, shard=shard
+            ).update(raised=F('raised') + amount, supporter_count=F('supporter_count') + 1)
+            if updated:
+                return shard
+        # Using F() expressions prevents race conditions with concurrent updates
+        ProjectFunding.objects.filter(pk=self.pk).update(
+            raised=F('raised') + amount,
+            supporter_count=F('supporter_count') + 1,
+            percent_funded=self.percent_expression(F('raised') + amount),
+        )
+        return 0
+
+    def set_counter_shards(self, count):
+        """Switch sharded counting on (count > 0) or off (0)."""
+        with transaction.atomic():
+            # Lock every shard, zero ones included: a donation landing on a
+            # shard about to be deleted would otherwise be lost with it
+            list(ProjectFundingShard.objects.select_for_update().filter(funding=self).values_list('pk'))
+            self.compact_shards()
+            ProjectFundingShard.objects.filter(funding=self, shard__gte=count).delete()
+            ProjectFundingShard.objects.bulk_create(
+                [ProjectFundingShard(funding=self, shard=i) for i in range(count)],
+                ignore_conflicts=True,
+            )
+            ProjectFunding.objects.filter(pk=self.pk).update(counter_shards=count)
+        self.counter_shards = count
+        self.__dict__.pop('_shard_totals', None)
+
+    def compact_shards(self):
+        """Fold shard totals into this row and zero the shards. Returns shards folded."""
+        with transaction.atomic():
+            shards = list(
+                ProjectFundingShard.objects.select_for_update()
+                .filter(funding=self).exclude(supporter_count=0)
+            )
+            if not shards:
+                return 0
+            folded = sum(s.raised for s in shards)
+            ProjectFunding.objects.filter(pk=self.pk).update(
+                raised=F('raised') + folded,
+                supporter_count=F('supporter_count') + sum(s.supporter_count for s in shards),
+                percent_funded=self.percent_expression(F('raised') + folded),
+            )
+            ProjectFundingShard.objects.filter(pk__in=[s.pk for s in shards]).update(
+                raised=0, supporter_count=0
+            )
+        self.refresh_from_db(fields=['raised', 'supporter_count', 'percent_funded'])
+        self.__dict__.pop('_shard_totals', None)
+        return len(shards)
+
+
+class ProjectFundingShard(models.Model):
+    """One slice of a sharded ProjectFunding counter (see ProjectFunding.counter_shards)"""
+    funding = models.ForeignKey(ProjectFunding, on_delete=models.CASCADE, related_name='shards')
+    shard = models.PositiveSmallIntegerField()
+    raised = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    supporter_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('funding', 'shard')
+
+    def __str__(self):
+        return f"Shard {self.shard} of funding #{self.funding_id}: ${self.raised}"
+
+
+class ProjectFundingDaily(models.Model):
+    """
+    Per-day funding rollup for campaign charts (see social/funding_stats.py).
+    A sharded campaign's day is split over the same shard numbers as its
+    counters, so concurrent donations don't queue on one row; readers sum
+    the shards of each day.
+    """
+    funding = models.ForeignKey(ProjectFunding, on_delete=models.CASCADE, related_name='daily')
+    date = models.DateField()
+    shard = models.PositiveSmallIntegerField(default=0)
+    raised = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    supporter_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('funding', 'date', 'shard')
+        ordering = ['date']
+
+    def __str__(self):
+        return f"Funding #{self.funding_id} on {self.date} (shard {self.shard}): ${self.raised}"
+
+    @classmethod
+    def record(cls, funding_id, day, amount, shard=0):
+        """Add one supporter of `amount` to the (funding, day, shard) bucket."""
+        bucket = {'funding_id': funding_id, 'date': day, 'shard': shard}
+        increment = {'raised': F('raised') + amount, 'supporter_count': F('supporter_count') + 1}
+        if cls.objects.filter(**bucket).update(**increment):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(**bucket, raised=amount, supporter_count=1)
+        except IntegrityError:
+            # Another supporter created the bucket first
+            cls.objects.filter(**bucket).update(**increment)
 
 
 class ProjectBudgetItem(models.Model):
@@ -256,21 +640,267 @@ class ProjectSupporter(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['funding', '-created_at', '-id'], name='supporter_funding_created_idx'),
+        ]
 
     def __str__(self):
         display = 'Anonymous' if self.is_anonymous else (self.user.username if self.user else self.name)
         return f"{display} supported ${self.amount}"
 
+    @transaction.atomic
     def save(self, *args, **kwargs):
+        # The supporter row and the counter bumps commit together, so
+        # reconcile_funding never sees one without the other
         is_new = self.pk is None
         super().save(*args, **kwargs)
 
         # Update funding totals atomically when a new supporter is added
-        # Using F() expressions prevents race conditions with concurrent updates
         if is_new:
-            from .models import ProjectFunding
-            ProjectFunding.objects.filter(pk=self.funding_id).update(
-                raised=F('raised') + self.amount,
-                supporter_count=F('supporter_count') + 1
+            shard = self.funding.record_support(self.amount)
+            ProjectFundingDaily.record(
+                self.funding_id, timezone.localdate(self.created_at), self.amount, shard=shard
             )
 
+
+# ----------- FULL-TEXT SEARCH INDEX --------------
+
+class SearchDocument(models.Model):
+    """
+    Denormalized searchable text for profiles, projects and posts.
+    Kept in sync by signals (see signals.py); the engine-specific full-text
+    index over it (FTS5 on SQLite, tsvector + GIN on Postgres) is created in
+    migration 0016 and queried through search.py.
+    """
+    KIND_PROFILE = 'profile'
+    KIND_PROJECT = 'project'
+    KIND_POST = 'post'
+    KIND_VERBALPOST = 'verbalpost'
+    KINDS = [
+        (KIND_PROFILE, 'Profile'),
+        (KIND_PROJECT, 'Project'),
+        (KIND_POST, 'Image post'),
+        (KIND_VERBALPOST, 'Verbal post'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KINDS)
+    object_id = models.PositiveIntegerField()
+    title = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}: {self.title[:30]}"
+
+
+# ----------- USERNAME AUTOCOMPLETE INDEX --------------
+
+class AutocompleteKey(models.Model):
+    """
+    Normalized name keys (username, first/last/full name) per user.
+    Prefix lookups are range scans on the (key, user) index:
+    key >= prefix AND key < prefix + U+10FFFF. See autocomplete.py.
+    """
+    key = models.CharField(max_length=300)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='autocomplete_keys')
+
+    class Meta:
+        unique_together = ('key', 'user')
+
+    def __str__(self):
+        return f"{self.key} -> {self.user_id}"
+
+
+# ----------- HASHTAGS & MENTIONS --------------
+
+class Tag(TimestampedModel):
+    """Normalized #hashtag; post_count is maintained by tags.sync_post()"""
+    name = models.CharField(max_length=50, unique=True)
+    post_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"#{self.name}"
+
+
+class PostTag(models.Model):
+    """Inverted index row: tag -> Post / VerbalPost (generic, like Like/Comment)"""
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='post_tags')
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    post = GenericForeignKey('content_type', 'object_id')
+    # Copied from the post so "posts with tag X" pages off this index alone
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('tag', 'content_type', 'object_id')
+        indexes = [
+            models.Index(fields=['tag', '-created_at', '-id'], name='posttag_tag_created_idx'),
+            models.Index(fields=['content_type', 'object_id'], name='posttag_target_idx'),
+            models.Index(fields=['created_at'], name='posttag_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.tag.name} on {self.content_type} #{self.object_id}"
+
+
+class Mention(models.Model):
+    """@username mention of a user inside a Post caption / VerbalPost"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mentions')
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    post = GenericForeignKey('content_type', 'object_id')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'content_type', 'object_id')
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='mention_user_created_idx'),
+            models.Index(fields=['content_type', 'object_id'], name='mention_target_idx'),
+        ]
+
+    def __str__(self):
+        return f"@{self.user.username} in {self.content_type} #{self.object_id}"
+
+
+class TrendingTag(models.Model):
+    """Precomputed top tags per sliding window; rebuilt by compute_trending_tags"""
+    WINDOWS = [
+        ('1h', 'Last hour'),
+        ('24h', 'Last 24 hours'),
+        ('7d', 'Last 7 days'),
+    ]
+
+    window = models.CharField(max_length=5, choices=WINDOWS)
+    rank = models.PositiveIntegerField()
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='+')
+    count = models.PositiveIntegerField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('window', 'rank')
+        ordering = ['window', 'rank']
+
+    def __str__(self):
+        return f"{self.window} #{self.rank}: {self.tag.name} ({self.count})"
+
+
+
+# ----------- IMAGE JOB QUEUE --------------
+
+class ImageJob(models.Model):
+    """
+    Deferred derivative generation for one image field, claimed and run by
+    `manage.py process_image_jobs` (see images.py).
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    target = GenericForeignKey('content_type', 'object_id')
+    field_name = models.CharField(max_length=50)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Workers claim the oldest pending jobs
+            models.Index(fields=['status', 'id'], name='imagejob_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.model} #{self.object_id}.{self.field_name} ({self.status})"
+
+
+# ----------- CONTENT-ADDRESSED MEDIA --------------
+
+class MediaBlob(models.Model):
+    """
+    One stored file under blobs/, shared by every image field that uploaded
+    the same bytes (see storage.py).
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    # 64-bit dHash as hex, plus its four 16-bit bands for indexed near-duplicate lookups
+    phash = models.CharField(max_length=16, blank=True)
+    phash_band0 = models.PositiveIntegerField(null=True, db_index=True)
+    phash_band1 = models.PositiveIntegerField(null=True, db_index=True)
+    phash_band2 = models.PositiveIntegerField(null=True, db_index=True)
+    phash_band3 = models.PositiveIntegerField(null=True, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+    def set_phash(self, phash):
+        from .storage import phash_bands
+        self.phash = phash
+        (self.phash_band0, self.phash_band1,
+         self.phash_band2, self.phash_band3) = phash_bands(phash)
+        MediaBlob.objects.filter(pk=self.pk).update(
+            phash=self.phash, phash_band0=self.phash_band0, phash_band1=self.phash_band1,
+            phash_band2=self.phash_band2, phash_band3=self.phash_band3,
+        )
+
+    def near_duplicates(self, max_distance=None):
+        """Other blobs whose image is within max_distance bits (default 3, the most the bands guarantee)."""
+        from .storage import NEAR_DUPLICATE_DISTANCE, hamming
+        if not self.phash:
+            return []
+        max_distance = NEAR_DUPLICATE_DISTANCE if max_distance is None else max_distance
+        any_band = models.Q()
+        for i in range(4):
+            any_band |= models.Q(**{f'phash_band{i}': getattr(self, f'phash_band{i}')})
+        candidates = MediaBlob.objects.filter(any_band).exclude(pk=self.pk)
+        return [blob for blob in candidates if hamming(self.phash, blob.phash) <= max_distance]
+
+
+# ----------- RESUMABLE UPLOADS --------------
+
+class UploadSession(models.Model):
+    """A chunked upload in progress (see uploads.py); becomes a ProjectPhoto on finalize."""
+    STATUS_OPEN = 'open'
+    STATUS_COMPLETE = 'complete'
+    STATUS_ABORTED = 'aborted'
+    STATUS_CHOICES = [
+        (STATUS_OPEN, 'Open'),
+        (STATUS_COMPLETE, 'Complete'),
+        (STATUS_ABORTED, 'Aborted'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    caption = models.CharField(max_length=200, blank=True)
+    size = models.BigIntegerField()
+    received = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_OPEN)
+    photo = models.ForeignKey(ProjectPhoto, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Expiring abandoned sessions
+            models.Index(fields=['status', 'updated_at'], name='upload_status_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size} bytes, {self.status})"
@@ -0,0 +1,165 @@
+# social/project_calendar.py
+"""
+Month-windowed access to ProjectCalendarEntry, plus timeline markers.
+
+Entries are read one calendar month at a time (a range scan on the
+(project, date) unique index) and cached per month. Cache keys carry a
+per-project version, so invalidate() makes every cached month and timeline
+of a project stale at once without having to know which keys exist.
+"""
+import calendar
+import time
+from datetime import date
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.functions import Substr
+
+from .models import ProjectCalendarEntry
+
+MONTH_TIMEOUT = 60 * 60
+MAX_RANGE_DAYS = 366
+MAX_BULK_ITEMS = 366
+
+TIMELINE_TIMEOUT = 60 * 60
+DEFAULT_RESOLUTION = 100
+MAX_RESOLUTION = 2000
+LABEL_LENGTH = 60
+
+
+def _version_key(project_id):
+    return f'calendar:{project_id}:version'
+
+
+def _version(project_id):
+    key = _version_key(project_id)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def invalidate(project_id):
+    cache.set(_version_key(project_id), time.time_ns(), timeout=None)
+
+
+def month_bounds(year, month):
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _months(start, end):
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def month_entries(project_id, year, month):
+    """Serialized entries for one month, served from cache when possible."""
+    from .serializers import ProjectCalendarEntrySerializer
+
+    key = f'calendar:{project_id}:v{_version(project_id)}:{year:04d}-{month:02d}'
+    entries = cache.get(key)
+    if entries is None:
+        queryset = ProjectCalendarEntry.objects.filter(
+            project_id=project_id, date__range=month_bounds(year, month)
+        ).order_by('date')
+        entries = list(ProjectCalendarEntrySerializer(queryset, many=True).data)
+        cache.set(key, entries, MONTH_TIMEOUT)
+    return entries
+
+
+def entries_between(project_id, start, end):
+    """Entries with start <= date <= end, assembled from the cached months."""
+    first, last = start.isoformat(), end.isoformat()
+    result = []
+    for year, month in _months(start, end):
+        result.extend(
+            entry for entry in month_entries(project_id, year, month)
+            if first <= entry['date'] <= last
+        )
+    return result
+
+
+def _label(text):
+    return (text[:LABEL_LENGTH] + "…") if len(text) > LABEL_LENGTH else text
+
+
+def timeline_markers(project, resolution=DEFAULT_RESOLUTION):
+    """
+    Progress-bar markers for non-empty entries between start_date and end_date,
+    bucketed to `resolution` slots (pixels, or 100 for percent). Entries in the
+    same slot merge into one marker carrying a count and the first entry's
+    label. Cached per project, date range and resolution; the cache key
+    includes the dates, so editing them needs no explicit invalidation.
+    """
+    start, end = project.start_date, project.end_date
+    if not (start and end and end > start):
+        return []
+
+    key = f'timeline:{project.pk}:v{_version(project.pk)}:{start}:{end}:{resolution}'
+    markers = cache.get(key)
+    if markers is not None:
+        return markers
+
+    total_days = (end - start).days
+    rows = (
+        ProjectCalendarEntry.objects
+        .filter(project_id=project.pk, date__range=(start, end))
+        .exclude(content='')
+        .order_by('date')
+        .values_list('date', Substr('content', 1, LABEL_LENGTH + 1))
+    )
+
+    buckets = {}
+    for day, snippet in rows.iterator():
+        offset = (day - start).days
+        slot = min(offset * resolution // total_days, resolution - 1)
+        marker = buckets.get(slot)
+        if marker is None:
+            buckets[slot] = {
+                'pos': offset / total_days * 100,
+                'date': day.strftime('%Y-%m-%d'),
+                'end_date': day.strftime('%Y-%m-%d'),
+                'count': 1,
+                'label': _label(snippet),
+            }
+        else:
+            marker['count'] += 1
+            marker['end_date'] = day.strftime('%Y-%m-%d')
+
+    markers = list(buckets.values())
+    cache.set(key, markers, TIMELINE_TIMEOUT)
+    return markers
+
+
+def bulk_upsert(project, items):
+    """
+    Apply many {date, content} items in one transaction: non-empty content is
+    upserted with a single INSERT .. ON CONFLICT, empty content deletes that
+    day in a single DELETE. Later items win over earlier ones for the same date.
+    Returns (saved_dates, deleted_dates), both sorted.
+    """
+    by_date = {}
+    for item in items:
+        by_date[item['date']] = item['content'].strip()
+
+    saved = sorted(day for day, content in by_date.items() if content)
+    deleted = sorted(day for day, content in by_date.items() if not content)
+
+    with transaction.atomic():
+        if saved:
+            ProjectCalendarEntry.objects.bulk_create(
+                [ProjectCalendarEntry(project=project, date=day, content=by_date[day]) for day in saved],
+                update_conflicts=True,
+                unique_fields=['project', 'date'],
+                update_fields=['content', 'updated_at'],
+            )
+        if deleted:
+            ProjectCalendarEntry.objects.filter(project=project, date__in=deleted).delete()
+        # bulk_create sends no post_save, so invalidate once for the whole batch
+        transaction.on_commit(lambda: invalidate(project.pk))
+
+    return saved, deleted
@@ -0,0 +1,217 @@
+# social/search.py
+"""
+Full-text search over SearchDocument.
+
+SQLite uses the FTS5 table created in migration 0016 (ranked by bm25),
+Postgres uses the generated tsvector column + GIN index (ranked by ts_rank).
+Any other engine falls back to icontains so the API keeps working.
+
+Scores are normalised so that *lower is better* on every backend, which lets
+cursor pagination use one keyset rule: (score, id) > (last_score, last_id).
+"""
+import base64
+import binascii
+import json
+import re
+from collections import namedtuple
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Profile, Project, ProjectFunding, Post, VerbalPost, SearchDocument
+
+SearchHit = namedtuple('SearchHit', ['id', 'kind', 'object_id', 'score'])
+SearchPage = namedtuple('SearchPage', ['hits', 'next_cursor'])
+
+# Letters and digits, like FTS5's unicode61 and Postgres' parser: '_' separates tokens
+_TOKEN_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+# bm25 column weights for (title, body)
+_SQLITE_WEIGHTS = (10.0, 1.0)
+
+
+# ---------- DOCUMENT BUILDING ----------
+
+def document_fields(instance):
+    """Return (kind, object_id, title, body) for a searchable instance, or None."""
+    if isinstance(instance, Profile):
+        user = instance.user
+        title = ' '.join(filter(None, [user.username, user.first_name, user.last_name]))
+        return SearchDocument.KIND_PROFILE, instance.pk, title, instance.bio or ''
+    if isinstance(instance, Project):
+        return SearchDocument.KIND_PROJECT, instance.pk, instance.title, instance.description or ''
+    if isinstance(instance, Post):
+        return SearchDocument.KIND_POST, instance.pk, '', instance.caption or ''
+    if isinstance(instance, VerbalPost):
+        return SearchDocument.KIND_VERBALPOST, instance.pk, '', instance.content or ''
+    return None
+
+
+def build_document(instance):
+    fields = document_fields(instance)
+    if fields is None:
+        return None
+    kind, object_id, title, body = fields
+    return SearchDocument(kind=kind, object_id=object_id, title=title[:255], body=body)
+
+
+def index_instance(instance):
+    fields = document_fields(instance)
+    if fields is None:
+        return
+    kind, object_id, title, body = fields
+    SearchDocument.objects.update_or_create(
+        kind=kind, object_id=object_id,
+        defaults={'title': title[:255], 'body': body},
+    )
+
+
+def remove_instance(instance):
+    fields = document_fields(instance)
+    if fields is None:
+        return
+    SearchDocument.objects.filter(kind=fields[0], object_id=fields[1]).delete()
+
+
+def rebuild_fts():
+    """Re-sync the engine-side index from social_searchdocument (SQLite only)."""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO social_searchdocument_fts(social_searchdocument_fts) VALUES ('rebuild')"
+            )
+
+
+# ---------- CURSORS ----------
+
+def encode_cursor(hit):
+    raw = json.dumps({'s': hit.score, 'i': hit.id}).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    """Return (score, id) or raise ValueError for a malformed cursor."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(data['s']), int(data['i'])
+    except (binascii.Error, ValueError, KeyError, TypeError) as exc:
+        raise ValueError('Invalid cursor') from exc
+
+
+# ---------- QUERYING ----------
+
+def tokenize(query):
+    return _TOKEN_RE.findall(query.lower())
+
+
+def search(query, kinds=None, limit=20, offset=0, cursor=None):
+    """
+    Ranked search. Pass either `offset` or a `cursor` from a previous page.
+    Returns a SearchPage whose next_cursor is None on the last page.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return SearchPage([], None)
+
+    after = decode_cursor(cursor) if cursor else None
+    if after:
+        offset = 0
+
+    if connection.vendor == 'sqlite':
+        rows = _search_sqlite(tokens, kinds, limit + 1, offset, after)
+    elif connection.vendor == 'postgresql':
+        rows = _search_postgres(tokens, kinds, limit + 1, offset, after)
+    else:
+        rows = _search_fallback(tokens, kinds, limit + 1, offset, after)
+
+    hits = [SearchHit(*row) for row in rows]
+    next_cursor = encode_cursor(hits[limit - 1]) if len(hits) > limit else None
+    return SearchPage(hits[:limit], next_cursor)
+
+
+def _filters(kinds, after, params):
+    clauses = []
+    if kinds:
+        clauses.append('kind IN (%s)' % ', '.join(['%s'] * len(kinds)))
+        params.extend(kinds)
+    if after:
+        clauses.append('(score > %s OR (score = %s AND id > %s))')
+        params.extend([after[0], after[0], after[1]])
+    return ('WHERE ' + ' AND '.join(clauses)) if clauses else ''
+
+
+def _search_sqlite(tokens, kinds, limit, offset, after):
+    # Quote every token so user input can't inject FTS5 syntax; '*' = prefix match
+    match = ' '.join('"%s"*' % token for token in tokens)
+    params = [*_SQLITE_WEIGHTS, match]
+    where = _filters(kinds, after, params)
+    params.extend([limit, offset])
+    sql = f"""
+        SELECT id, kind, object_id, score FROM (
+            SELECT d.id AS id, d.kind AS kind, d.object_id AS object_id,
+                   bm25(social_searchdocument_fts, %s, %s) AS score
+            FROM social_searchdocument_fts
+            JOIN social_searchdocument d ON d.id = social_searchdocument_fts.rowid
+            WHERE social_searchdocument_fts MATCH %s
+        ) {where}
+        ORDER BY score, id
+        LIMIT %s OFFSET %s
+    """
+    with connection.cursor() as cur:
+        cur.execute(sql, params)
+        return cur.fetchall()
+
+
+def _search_postgres(tokens, kinds, limit, offset, after):
+    tsquery = ' & '.join('%s:*' % token for token in tokens)
+    params = [tsquery]
+    where = _filters(kinds, after, params)
+    params.extend([limit, offset])
+    sql = f"""
+        SELECT id, kind, object_id, score FROM (
+            SELECT d.id, d.kind, d.object_id,
+                   (-ts_rank(d.search_vector, q))::float8 AS score
+            FROM social_searchdocument d, to_tsquery('simple', %s) q
+            WHERE d.search_vector @@ q
+        ) ranked {where}
+        ORDER BY score, id
+        LIMIT %s OFFSET %s
+    """
+    with connection.cursor() as cur:
+        cur.execute(sql, params)
+        return cur.fetchall()
+
+
+def _search_fallback(tokens, kinds, limit, offset, after):
+    qs = SearchDocument.objects.all()
+    for token in tokens:
+        qs = qs.filter(Q(title__icontains=token) | Q(body__icontains=token))
+    if kinds:
+        qs = qs.filter(kind__in=kinds)
+    if after:
+        qs = qs.filter(id__gt=after[1])
+    rows = qs.order_by('id').values_list('id', 'kind', 'object_id')[offset:offset + limit]
+    return [(id_, kind, object_id, 0.0) for id_, kind, object_id in rows]
+
+
+def load_objects(hits):
+    """Fetch the model instances behind `hits` with one query per kind."""
+    querysets = {
+        SearchDocument.KIND_PROFILE: Profile.objects.select_related('user'),
+        SearchDocument.KIND_PROJECT: Project.objects.select_related('creator', 'funding').annotate(
+            **ProjectFunding.shard_total_annotations('funding__id', prefix='funding_')
+        ),
+        SearchDocument.KIND_POST: Post.objects.select_related('user', 'user__profile'),
+        SearchDocument.KIND_VERBALPOST: VerbalPost.objects.select_related('user', 'user__profile'),
+    }
+    ids_by_kind = {}
+    for hit in hits:
+        ids_by_kind.setdefault(hit.kind, []).append(hit.object_id)
+
+    loaded = {}
+    for kind, ids in ids_by_kind.items():
+        for pk, obj in querysets[kind].in_bulk(ids).items():
+            loaded[(kind, pk)] = obj
+
+    # Stale documents (object deleted without a signal) are skipped
+    return [(hit, loaded[(hit.kind, hit.object_id)]) for hit in hits if (hit.kind, hit.object_id) in loaded]
@@ -0,0 +1,202 @@
+# social/search_cache.py
+"""
+Short-lived cache in front of search.search() for typeahead traffic.
+
+Each normalized query caches up to CANDIDATE_LIMIT ranked candidates (all
+kinds) together with their normalized tokens. Pages, kind filters and cursors
+are then served from that list. When `q=arti` misses but `q=art` is cached and
+was not truncated, the longer query's results are a subset of it, so they are
+found by filtering those candidates in Python instead of going back to the
+database. Derived entries keep the parent query's scores and record which
+query those are (`scored_by`). A cursor names the query its scores came
+from, so the next page is served from an entry with the same scores even
+after the one it was issued from has been evicted.
+
+Entries live in the 'search' cache alias (short TTL, LRU eviction). The
+hit/miss counters live in the 'default' alias, where search traffic can't
+evict them, so get_stats() works across workers on a shared cache.
+"""
+import base64
+import binascii
+import hashlib
+import json
+
+from django.core.cache import caches
+
+from . import search
+from .autocomplete import normalize
+from .models import SearchDocument
+
+CANDIDATE_LIMIT = 200
+
+STAT_HIT = 'hit'
+STAT_PREFIX_HIT = 'prefix_hit'
+STAT_MISS = 'miss'
+STATS = (STAT_HIT, STAT_PREFIX_HIT, STAT_MISS)
+
+
+def _cache():
+    return caches['search']
+
+
+def _stats_cache():
+    return caches['default']
+
+
+def normalize_tokens(text):
+    return search.tokenize(normalize(text))
+
+
+def _entry_key(normalized_query):
+    digest = hashlib.sha1(normalized_query.encode()).hexdigest()
+    return f'search:q:{digest}'
+
+
+def _stat_key(name):
+    return f'search:stats:{name}'
+
+
+def _record(stat):
+    cache = _stats_cache()
+    key = _stat_key(stat)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:  # evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def get_stats():
+    counts = _stats_cache().get_many([_stat_key(name) for name in STATS])
+    stats = {name: counts.get(_stat_key(name), 0) for name in STATS}
+    total = sum(stats.values())
+    served = stats[STAT_HIT] + stats[STAT_PREFIX_HIT]
+    stats['requests'] = total
+    stats['hit_rate'] = round(served / total, 4) if total else 0.0
+    return stats
+
+
+def reset_stats():
+    _stats_cache().delete_many([_stat_key(name) for name in STATS])
+
+
+def _matches(query_tokens, doc_tokens):
+    # Same semantics as the FTS query: every query token prefixes some document token
+    return all(any(doc.startswith(token) for doc in doc_tokens) for token in query_tokens)
+
+
+def _fetch(query, normalized):
+    page = search.search(query, limit=CANDIDATE_LIMIT)
+    texts = dict(
+        (pk, (title, body)) for pk, title, body in
+        SearchDocument.objects.filter(id__in=[h.id for h in page.hits]).values_list('id', 'title', 'body')
+    )
+    candidates = [
+        (tuple(hit), frozenset(normalize_tokens(' '.join(texts.get(hit.id, ('', ''))))))
+        for hit in page.hits
+    ]
+    return {'candidates': candidates, 'complete': page.next_cursor is None, 'scored_by': normalized}
+
+
+def _derive(parent, query_tokens):
+    return {
+        'candidates': [c for c in parent['candidates'] if _matches(query_tokens, c[1])],
+        'complete': True,
+        'scored_by': parent['scored_by'],
+    }
+
+
+def encode_cursor(hit, scored_by, normalized):
+    """search.encode_cursor(), plus the scoring query when it isn't `normalized` itself."""
+    data = {'s': hit.score, 'i': hit.id}
+    if scored_by != normalized:
+        data['q'] = scored_by
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+def cursor_scored_by(cursor, normalized):
+    """The query whose scores `cursor` refers to; ValueError if it can't be one of ours."""
+    try:
+        scored_by = json.loads(base64.urlsafe_b64decode(cursor.encode())).get('q', normalized)
+    except (binascii.Error, ValueError, AttributeError) as exc:
+        raise ValueError('Invalid cursor') from exc
+    if not isinstance(scored_by, str) or not scored_by or not normalized.startswith(scored_by):
+        raise ValueError('Invalid cursor')
+    return scored_by
+
+
+def get_candidates(query, scored_by=None):
+    """
+    Return the cache entry for `query`, filling it from a prefix entry or the
+    DB. `scored_by` (from a cursor) is the query whose scores the entry must
+    carry; an entry scored otherwise is rebuilt from it. Returns None if that
+    is no longer possible.
+    """
+    normalized = ' '.join(normalize_tokens(query))
+    cache = _cache()
+    key = _entry_key(normalized)
+
+    entry = cache.get(key)
+    if entry is not None and scored_by in (None, entry['scored_by']):
+        _record(STAT_HIT)
+        return entry
+
+    if scored_by and scored_by != normalized:
+        parent = cache.get(_entry_key(scored_by))
+        if parent is not None and parent['scored_by'] == scored_by:
+            _record(STAT_PREFIX_HIT)
+        else:
+            parent = _fetch(scored_by, scored_by)
+            cache.set(_entry_key(scored_by), parent)
+            _record(STAT_MISS)
+        if not parent['complete']:
+            return None  # the prefix now has more than CANDIDATE_LIMIT results
+        entry = _derive(parent, normalized.split())
+        cache.set(key, entry)
+        return entry
+
+    # A cursor scored by this query itself needs its own database scores
+    prefixes = [] if scored_by else range(len(normalized) - 1, 1, -1)
+    for end in prefixes:
+        prefix = normalized[:end].rstrip()
+        if not prefix or prefix == normalized:
+            continue
+        parent = cache.get(_entry_key(prefix))
+        if parent is not None and parent['complete']:
+            entry = _derive(parent, normalized.split())
+            cache.set(key, entry)
+            _record(STAT_PREFIX_HIT)
+            return entry
+
+    entry = _fetch(query, normalized)
+    cache.set(key, entry)
+    _record(STAT_MISS)
+    return entry
+
+
+def cached_search(query, kinds=None, limit=20, offset=0, cursor=None):
+    """Drop-in for search.search() that serves pages from the cache when it can."""
+    after = search.decode_cursor(cursor) if cursor else None
+    normalized = ' '.join(normalize_tokens(query))
+    if not normalized:
+        return search.SearchPage([], None)
+
+    scored_by = cursor_scored_by(cursor, normalized) if cursor else None
+    entry = get_candidates(query, scored_by)
+    if entry is None:
+        # Can't reproduce the cursor's scores any more: best effort from the database
+        return search.search(query, kinds=kinds, limit=limit, cursor=cursor)
+    hits = [search.SearchHit(*hit) for hit, _ in entry['candidates']]
+    if kinds:
+        hits = [hit for hit in hits if hit.kind in kinds]
+    if after:
+        hits = [hit for hit in hits if (hit.score, hit.id) > after]
+        offset = 0
+
+    window = hits[offset:offset + limit + 1]
+    if len(window) <= limit and not entry['complete']:
+        # The page runs past the cached candidates; let the database answer it
+        return search.search(query, kinds=kinds, limit=limit, offset=offset, cursor=cursor)
+
+    next_cursor = encode_cursor(window[limit - 1], entry['scored_by'], normalized) if len(window) > limit else None
+    return search.SearchPage(window[:limit], next_cursor)
@@ -3,13 +3,44 @@ from decimal import Decimal
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, Min, Max
+from . import images, project_calendar, uploads
 from .models import (
     Profile, Post, VerbalPost, Comment, Like, Project,
     Message, Follow, ProjectPhoto, ProjectCalendarEntry, Manifestation,
-    ProjectFunding, ProjectBudgetItem, ProjectSupporter
+    ProjectFunding, ProjectBudgetItem, ProjectSupporter, Tag, TrendingTag,
+    ConversationParticipant
 )
 
 
+# ========== IMAGES ==========
+
+class ImageVariantsField(serializers.Field):
+    """
+    Derivative URLs for an image field (see images.py); null until the
+    image's <field>_status is ready, while clients show a placeholder
+    """
+
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        return images.variant_urls(instance, self.image_field, self.context.get('request'))
+
+
+class ImageSrcsetField(ImageVariantsField):
+    """
+    {width, height, candidates, webp, jpeg} for <img srcset>, built from the
+    stored variant sizes; null until the derivatives exist
+    """
+
+    def to_representation(self, instance):
+        return images.srcset(instance, self.image_field, self.context.get('request'))
+
+
 # ========== USER & PROFILE ==========
 
 class UserSerializer(serializers.ModelSerializer):
@@ -18,18 +49,39 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'email', 'first_name', 'last_name']
 
 
+class AutocompleteUserSerializer(serializers.ModelSerializer):
+    """Lean user payload for typeahead; expects users from autocomplete.suggest_users"""
+    profile_image = serializers.SerializerMethodField()
+    proximity = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'first_name', 'last_name', 'profile_image', 'proximity']
+
+    def get_profile_image(self, obj):
+        profile = getattr(obj, 'profile', None)
+        if profile and profile.profile_image:
+            request = self.context.get('request')
+            if request:
+                return request.build_absolute_uri(profile.profile_image.url)
+            return profile.profile_image.url
+        return None
+
+
 class ProfileSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     username = serializers.CharField(source='user.username', read_only=True)
     follower_count = serializers.SerializerMethodField()
     following_count = serializers.SerializerMethodField()
     is_following = serializers.SerializerMethodField()
+    profile_image_variants = ImageVariantsField('profile_image')
 
     class Meta:
         model = Profile
         fields = [
             'id', 'user', 'username', 'user_type', 'bio',
-            'profile_image', 'date_joined',
+            'profile_image', 'profile_image_variants', 'profile_image_status', 'profile_image_placeholder',
+            'date_joined',
             'follower_count', 'following_count', 'is_following'
         ]
 
@@ -65,12 +117,15 @@ class PostSerializer(serializers.ModelSerializer):
     comment_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
     post_type = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField('image')
+    image_srcset = ImageSrcsetField('image')
 
     class Meta:
         model = Post
         fields = [
             'id', 'user', 'username', 'profile_image',
-            'image', 'caption', 'created_at',
+            'image', 'image_variants', 'image_srcset', 'image_status', 'image_placeholder',
+            'caption', 'created_at',
             'like_count', 'comment_count', 'is_liked', 'post_type'
         ]
 
@@ -204,6 +259,9 @@ class ProjectSupporterSerializer(serializers.ModelSerializer):
 
 
 class ProjectFundingSerializer(serializers.ModelSerializer):
+    # Totals include any not-yet-compacted counter shards
+    raised = serializers.DecimalField(source='total_raised', max_digits=10, decimal_places=2, read_only=True)
+    supporter_count = serializers.IntegerField(source='total_supporters', read_only=True)
     budget_items = ProjectBudgetItemSerializer(many=True, read_only=True)
     recent_supporters = serializers.SerializerMethodField()
     percentage = serializers.SerializerMethodField()
@@ -218,16 +276,14 @@ class ProjectFundingSerializer(serializers.ModelSerializer):
         ]
 
     def get_recent_supporters(self, obj):
-        supporters = obj.supporters.order_by('-created_at')[:5]
+        supporters = obj.supporters.select_related('user').order_by('-created_at')[:5]
         return ProjectSupporterSerializer(supporters, many=True).data
 
     def get_percentage(self, obj):
-        if obj.goal > 0:
-            return min(round((obj.raised / obj.goal) * 100), 100)
-        return 0
+        return obj.percentage
 
     def get_is_funded(self, obj):
-        return obj.raised >= obj.goal
+        return obj.is_funded
 
 
 class ProjectSupportCreateSerializer(serializers.Serializer):
@@ -239,12 +295,25 @@ class ProjectSupportCreateSerializer(serializers.Serializer):
     is_anonymous = serializers.BooleanField(default=False)
 
 
+class FundingDailyPointSerializer(serializers.Serializer):
+    """One point of funding_stats.daily_series()"""
+    date = serializers.DateField()
+    raised = serializers.DecimalField(max_digits=12, decimal_places=2)
+    supporters = serializers.IntegerField()
+
+
 # ========== PROJECT PHOTOS ==========
 
 class ProjectPhotoSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField('image')
+    image_srcset = ImageSrcsetField('image')
+
     class Meta:
         model = ProjectPhoto
-        fields = ['id', 'image', 'caption', 'uploaded_at']
+        fields = [
+            'id', 'image', 'image_variants', 'image_srcset', 'image_status', 'image_placeholder',
+            'caption', 'uploaded_at'
+        ]
 
 
 # ========== PROJECT CALENDAR ==========
@@ -255,17 +324,74 @@ class ProjectCalendarEntrySerializer(serializers.ModelSerializer):
         fields = ['id', 'date', 'content', 'created_at']
 
 
+class CalendarBulkItemSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    content = serializers.CharField(allow_blank=True)
+
+
+class CalendarBulkSerializer(serializers.Serializer):
+    entries = serializers.ListField(
+        child=CalendarBulkItemSerializer(), allow_empty=False, max_length=project_calendar.MAX_BULK_ITEMS
+    )
+
+
+class UploadSessionCreateSerializer(serializers.Serializer):
+    """Start of a resumable photo upload (see uploads.py)."""
+    project = serializers.PrimaryKeyRelatedField(queryset=Project.objects.all())
+    filename = serializers.CharField(max_length=255, trim_whitespace=True)
+    size = serializers.IntegerField(min_value=1, max_value=uploads.MAX_UPLOAD_SIZE)
+    caption = serializers.CharField(max_length=200, allow_blank=True, required=False, default='')
+
+
 # ========== PROJECTS ==========
 
+def funding_summary(project):
+    """
+    The `funding` payload of project serializers. Project querysets that list
+    many campaigns annotate ProjectFunding.shard_total_annotations(
+    'funding__id', prefix='funding_'), which is handed to the funding here
+    so sharded totals don't cost a query per row.
+    """
+    # ProjectFunding is OneToOne; if it doesn't exist yet, accessing obj.funding can crash.
+    try:
+        funding = project.funding
+    except ProjectFunding.DoesNotExist:
+        funding = None
+
+    if not funding:
+        return {"enabled": False}
+
+    if hasattr(project, 'funding_shard_raised') and 'shard_raised' not in funding.__dict__:
+        funding.shard_raised = project.funding_shard_raised
+        funding.shard_supporters = project.funding_shard_supporters
+        funding.__dict__.pop('_shard_totals', None)
+
+    goal = funding.goal or 0
+    raised = funding.total_raised
+    percentage = min(round((raised / goal) * 100), 100) if goal > 0 else 0
+
+    return {
+        "enabled": True,
+        "goal": goal,
+        "raised": raised,
+        "percentage": percentage,
+        "is_funded": raised >= goal,
+    }
+
+
 class ProjectListSerializer(serializers.ModelSerializer):
     creator = UserSerializer(read_only=True)
     progress_percent = serializers.SerializerMethodField()
     funding = serializers.SerializerMethodField()
+    cover_photo_variants = ImageVariantsField('cover_photo')
+    cover_photo_srcset = ImageSrcsetField('cover_photo')
 
     class Meta:
         model = Project
         fields = [
-            'id', 'title', 'description', 'cover_photo',
+            'id', 'title', 'description',
+            'cover_photo', 'cover_photo_variants', 'cover_photo_srcset',
+            'cover_photo_status', 'cover_photo_placeholder',
             'project_type', 'status', 'budget_type',
             'start_date', 'end_date', 'creator',
             'progress_percent', 'funding'
@@ -282,49 +408,51 @@ class ProjectListSerializer(serializers.ModelSerializer):
         return None
 
     def get_funding(self, obj):
-        # ProjectFunding is OneToOne; if it doesn't exist yet, accessing obj.funding can crash.
-        try:
-            funding = obj.funding
-        except ProjectFunding.DoesNotExist:
-            funding = None
-
-        if not funding:
-            return {"enabled": False}
-
-        goal = funding.goal or 0
-        raised = funding.raised or 0
-        percentage = min(round((raised / goal) * 100), 100) if goal > 0 else 0
-
-        return {
-            "enabled": True,
-            "goal": goal,
-            "raised": raised,
-            "percentage": percentage,
-            "is_funded": raised >= goal,
-        }
+        return funding_summary(obj)
 
 
 class ProjectDetailSerializer(serializers.ModelSerializer):
     creator = UserSerializer(read_only=True)
     collaborators = UserSerializer(many=True, read_only=True)
     photos = ProjectPhotoSerializer(many=True, read_only=True)
-    calendar_entries = ProjectCalendarEntrySerializer(many=True, read_only=True)
+    calendar_summary = serializers.SerializerMethodField()
     manifestations = serializers.StringRelatedField(many=True)
     progress_percent = serializers.SerializerMethodField()
     funding = serializers.SerializerMethodField()
     days_remaining = serializers.SerializerMethodField()
+    cover_photo_variants = ImageVariantsField('cover_photo')
+    cover_photo_srcset = ImageSrcsetField('cover_photo')
 
     class Meta:
         model = Project
         fields = [
-            'id', 'title', 'description', 'cover_photo',
+            'id', 'title', 'description',
+            'cover_photo', 'cover_photo_variants', 'cover_photo_srcset',
+            'cover_photo_status', 'cover_photo_placeholder',
             'project_type', 'status', 'budget_type',
             'start_date', 'end_date',
             'creator', 'collaborators', 'manifestations',
-            'photos', 'calendar_entries',
+            'photos', 'calendar_summary',
             'progress_percent', 'days_remaining', 'funding'
         ]
 
+    def get_calendar_summary(self, obj):
+        # Entries themselves come from /projects/<id>/calendar/?from=&to=;
+        # ProjectViewSet annotates these so retrieve doesn't need extra queries.
+        if not hasattr(obj, 'calendar_entry_count'):
+            stats = obj.calendar_entries.aggregate(
+                calendar_entry_count=Count('id'),
+                calendar_first_date=Min('date'),
+                calendar_last_date=Max('date'),
+            )
+            for name, value in stats.items():
+                setattr(obj, name, value)
+        return {
+            'entry_count': obj.calendar_entry_count,
+            'first_date': obj.calendar_first_date,
+            'last_date': obj.calendar_last_date,
+        }
+
     def get_progress_percent(self, obj):
         if obj.start_date and obj.end_date:
             from django.utils import timezone
@@ -343,25 +471,7 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
         return None
 
     def get_funding(self, obj):
-        try:
-            funding = obj.funding
-        except ProjectFunding.DoesNotExist:
-            funding = None
-
-        if not funding:
-            return {'enabled': False}
-
-        goal = funding.goal or 0
-        raised = funding.raised or 0
-        percentage = min(round((raised / goal) * 100), 100) if goal > 0 else 0
-
-        return {
-            'enabled': True,
-            'goal': goal,
-            'raised': raised,
-            'percentage': percentage,
-            'is_funded': raised >= goal
-        }
+        return funding_summary(obj)
 
 
 class ProjectCreateSerializer(serializers.ModelSerializer):
@@ -418,10 +528,36 @@ class MessageSerializer(serializers.ModelSerializer):
         model = Message
         fields = [
             'id', 'sender', 'recipient', 'subject', 'body',
-            'is_read', 'parent', 'created_at'
+            'is_read', 'parent', 'conversation', 'created_at'
         ]
 
 
+class ConversationSerializer(serializers.ModelSerializer):
+    """
+    One inbox row: a ConversationParticipant of the current user, with
+    conversation, user_low and user_high select_related.
+    """
+    id = serializers.IntegerField(source='conversation_id', read_only=True)
+    correspondent = serializers.SerializerMethodField()
+    last_message_preview = serializers.CharField(source='conversation.last_message_preview', read_only=True)
+    last_message_from_me = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ConversationParticipant
+        fields = [
+            'id', 'correspondent', 'last_message_at', 'last_message_preview',
+            'last_message_from_me', 'unread_count'
+        ]
+
+    def get_correspondent(self, obj):
+        conversation = obj.conversation
+        other = conversation.user_high if conversation.user_low_id == obj.user_id else conversation.user_low
+        return UserSerializer(other).data
+
+    def get_last_message_from_me(self, obj):
+        return obj.conversation.last_sender_id == obj.user_id
+
+
 class MessageCreateSerializer(serializers.ModelSerializer):
     recipient_username = serializers.CharField(write_only=True)
 
@@ -439,6 +575,23 @@ class MessageCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+# ========== TAGS ==========
+
+class TagSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ['name', 'post_count']
+
+
+class TrendingTagSerializer(serializers.ModelSerializer):
+    name = serializers.CharField(source='tag.name', read_only=True)
+    post_count = serializers.IntegerField(source='tag.post_count', read_only=True)
+
+    class Meta:
+        model = TrendingTag
+        fields = ['rank', 'name', 'count', 'post_count']
+
+
 # ========== FEED (Combined Posts) ==========
 
 class FeedItemSerializer(serializers.Serializer):
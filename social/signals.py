@@ -0,0 +1,189 @@
+# social/signals.py
+from django.contrib.auth.models import User
+from django.core.files import File
+from django.db.models.signals import post_init, pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from . import autocomplete, images, memberships, project_calendar, search, tags
+from .storage import media_storage
+from .models import (
+    Profile, Project, Post, VerbalPost, ProjectPhoto, ProjectCalendarEntry, ProjectMembership,
+    IMAGE_NONE, IMAGE_FAILED,
+)
+
+
+# ---------- SEARCH INDEX SYNC ----------
+
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=VerbalPost)
+def index_search_document(sender, instance, raw=False, **kwargs):
+    if raw:  # loaddata: let rebuild_search_index handle fixtures
+        return
+    search.index_instance(instance)
+
+
+@receiver(post_delete, sender=Profile)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=VerbalPost)
+def remove_search_document(sender, instance, **kwargs):
+    search.remove_instance(instance)
+
+
+@receiver(post_save, sender=User)
+def reindex_profile_on_user_change(sender, instance, created, raw=False, **kwargs):
+    # Username / names live on User but are indexed with the profile
+    if raw or created:
+        return
+    try:
+        profile = instance.profile
+    except Profile.DoesNotExist:
+        return
+    search.index_instance(profile)
+
+
+# ---------- AUTOCOMPLETE KEYS ----------
+
+@receiver(post_save, sender=User)
+def index_autocomplete_keys(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    autocomplete.index_user(instance)
+
+
+# ---------- HASHTAGS & MENTIONS ----------
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=VerbalPost)
+def sync_post_tags(sender, instance, raw=False, **kwargs):
+    if raw:  # loaddata: run backfill_tags afterwards
+        return
+    tags.sync_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=VerbalPost)
+def remove_post_tags(sender, instance, **kwargs):
+    tags.remove_post(instance)
+
+
+# ---------- PROJECT CALENDAR CACHE ----------
+
+@receiver(post_save, sender=ProjectCalendarEntry)
+@receiver(post_delete, sender=ProjectCalendarEntry)
+def invalidate_project_calendar(sender, instance, **kwargs):
+    project_calendar.invalidate(instance.project_id)
+
+
+# ---------- PROJECT MEMBERSHIP ----------
+
+@receiver(post_save, sender=Project)
+def sync_project_membership(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    memberships.sync_projects([instance.pk])
+
+
+@receiver(m2m_changed, sender=Project.collaborators.through)
+def sync_collaborator_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        memberships.sync_projects([instance.pk])
+    elif action == 'post_clear':
+        # user.collaborative_projects.clear(): pk_set is not provided
+        ProjectMembership.objects.filter(
+            user=instance, role=ProjectMembership.ROLE_COLLABORATOR
+        ).delete()
+    else:
+        memberships.sync_projects(pk_set)
+
+
+# ---------- MEDIA BLOB REFERENCES ----------
+
+def _loaded_name(instance, field_name):
+    # Read the raw attribute so deferred image fields don't trigger a query
+    value = instance.__dict__.get(field_name)
+    return getattr(value, 'name', value) or ''
+
+
+@receiver(post_init, sender=Post)
+@receiver(post_init, sender=ProjectPhoto)
+@receiver(post_init, sender=Project)
+@receiver(post_init, sender=Profile)
+def remember_image_name(sender, instance, **kwargs):
+    instance._stored_image_name = _loaded_name(instance, images.IMAGE_FIELDS[sender])
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=ProjectPhoto)
+@receiver(pre_save, sender=Project)
+@receiver(pre_save, sender=Profile)
+def note_image_upload(sender, instance, raw=False, **kwargs):
+    # An uncommitted file is stored by the field's pre_save, which adds a blob reference
+    field_name = images.IMAGE_FIELDS[sender]
+    value = instance.__dict__.get(field_name)
+    instance._image_uploading = isinstance(value, File) and not getattr(value, '_committed', False)
+    # release_replaced_blob resets _stored_image_name before queue_image_variants runs
+    instance._image_changed = (instance._image_uploading
+                               or _loaded_name(instance, field_name) != getattr(instance, '_stored_image_name', ''))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=ProjectPhoto)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Profile)
+def release_replaced_blob(sender, instance, raw=False, **kwargs):
+    current = _loaded_name(instance, images.IMAGE_FIELDS[sender])
+    previous = getattr(instance, '_stored_image_name', '')
+    if previous and previous != current:
+        media_storage.release(previous)
+    elif previous and getattr(instance, '_image_uploading', False):
+        # The same bytes uploaded again to this row: one reference is enough
+        media_storage.release(current)
+    instance._image_uploading = False
+    instance._stored_image_name = current
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=ProjectPhoto)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Profile)
+def release_deleted_blob(sender, instance, **kwargs):
+    media_storage.release(_loaded_name(instance, images.IMAGE_FIELDS[sender]))
+
+
+# ---------- IMAGE DERIVATIVES ----------
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=ProjectPhoto)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Profile)
+def queue_image_variants(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    field_name = images.IMAGE_FIELDS[sender]
+    changed = getattr(instance, '_image_changed', True)
+    instance._image_changed = False
+    failed = getattr(instance, images.status_field(field_name)) == IMAGE_FAILED
+    if images.needs_processing(instance, field_name) and (changed or not failed):
+        # Decoding and resizing happen in process_image_jobs, not in the request.
+        # A failed image is only retried when replaced or via generate_image_variants.
+        images.enqueue(instance, field_name)
+    elif not getattr(instance, field_name):
+        # Image removed: just drop the old derivatives and placeholder
+        if (getattr(instance, images.variants_field(field_name))
+                or getattr(instance, images.status_field(field_name)) != IMAGE_NONE):
+            images.process(instance, field_name)
+        if getattr(instance, images.placeholder_field(field_name)):
+            images.store_placeholder(instance, field_name)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=ProjectPhoto)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Profile)
+def delete_image_variants(sender, instance, **kwargs):
+    images.delete_variants(getattr(instance, images.variants_field(images.IMAGE_FIELDS[sender])) or {})
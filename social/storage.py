@@ -0,0 +1,170 @@
+# social/storage.py
+"""
+Content-addressed storage for uploaded images.
+
+Uploads are streamed to a temporary file under MEDIA_ROOT while being
+hashed (SHA-256), then moved to blobs/<h[0:2]>/<h[2:4]>/<hash><ext>. The
+same bytes uploaded as a post, a project photo and a cover photo are
+stored once, and no directory grows past a few thousand entries. The
+upload_to prefix of the field is ignored for new files; names stored
+before this storage existed keep working, since they are still plain
+paths under MEDIA_ROOT.
+
+Each blob has a MediaBlob row counting the model fields that point at it.
+save() increments the count, locking the row before it decides whether
+the file already exists; release() is called by the signals when a row is
+deleted or its image replaced. Blobs that reach zero are removed by
+`manage.py gc_media`, not inline, which takes the same row lock and
+re-checks the count, so a concurrent re-upload of the same bytes can't lose
+its file.
+
+MediaBlob also stores a 64-bit difference hash (dHash) of the image. It is
+split into four 16-bit bands with an index each: two images within
+Hamming distance 3 must share at least one band, so near-duplicates are
+found with indexed lookups instead of comparing against every blob.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+from PIL import Image, ImageOps
+
+BLOB_ROOT = 'blobs'
+HASH_CHUNK = 1024 * 1024
+PHASH_BANDS = 4
+NEAR_DUPLICATE_DISTANCE = 3
+
+
+def blob_name(digest, extension):
+    return f'{BLOB_ROOT}/{digest[:2]}/{digest[2:4]}/{digest}{extension.lower()}'
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(f'{BLOB_ROOT}/')
+
+
+def dhash(image_file):
+    """64-bit difference hash as 16 hex digits, or '' if not an image."""
+    try:
+        img = Image.open(image_file)
+        img.draft('L', (64, 64))
+        img = ImageOps.exif_transpose(img).convert('L').resize((9, 8), Image.LANCZOS)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return ''
+    pixels = list(img.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left, right = pixels[row * 9 + col], pixels[row * 9 + col + 1]
+            bits = (bits << 1) | (left > right)
+    return f'{bits:016x}'
+
+
+def phash_bands(phash):
+    """The four 16-bit bands of a dHash, most significant first."""
+    if not phash:
+        return [None] * PHASH_BANDS
+    value = int(phash, 16)
+    return [(value >> (16 * (PHASH_BANDS - 1 - i))) & 0xFFFF for i in range(PHASH_BANDS)]
+
+
+def hamming(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count('1')
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+
+    def _save(self, name, content):
+        _, extension = os.path.splitext(name)
+        tmp_dir = self.path(f'{BLOB_ROOT}/tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in content.chunks(HASH_CHUNK):
+                    digest.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+            digest = digest.hexdigest()
+
+            with transaction.atomic():
+                # The reference is taken (and the row locked) before looking at
+                # the file, so gc_media can't remove a blob this save reuses
+                final, created = self._claim(digest, extension, size)
+                final_path = self.path(final)
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                if os.path.exists(final_path):
+                    os.unlink(tmp_path)
+                else:
+                    # Atomic; a concurrent writer of the same hash writes the same bytes
+                    os.replace(tmp_path, final_path)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(final_path, self.file_permissions_mode)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        if created:
+            from .models import MediaBlob
+
+            with open(final_path, 'rb') as blob_file:
+                MediaBlob.objects.get(sha256=digest).set_phash(dhash(blob_file))
+        return final
+
+    def _claim(self, digest, extension, size):
+        """
+        Add a reference to the blob of `digest`, creating its row if needed.
+        Returns (name, created). Same bytes under another extension reuse the
+        existing blob's name.
+        """
+        from .models import MediaBlob
+
+        while True:
+            blob = MediaBlob.objects.select_for_update().filter(sha256=digest).first()
+            if blob:
+                MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+                return blob.name, False
+            name = blob_name(digest, extension)
+            try:
+                with transaction.atomic():
+                    MediaBlob.objects.create(sha256=digest, name=name, size=size, ref_count=1)
+                return name, True
+            except IntegrityError:
+                continue  # created or being collected concurrently: look again
+
+    def release(self, name):
+        """
+        Drop one reference to a blob. Returns the remaining count, or None
+        if `name` isn't a content-addressed blob.
+        """
+        from .models import MediaBlob
+
+        if not is_blob(name):
+            return None
+        MediaBlob.objects.filter(name=name, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+        return MediaBlob.objects.filter(name=name).values_list('ref_count', flat=True).first() or 0
+
+    def in_use(self, name):
+        """Whether any row still references blob `name`; False for plain per-row files."""
+        from .models import MediaBlob
+
+        if not is_blob(name):
+            return False
+        return MediaBlob.objects.filter(name=name, ref_count__gt=0).exists()
+
+
+media_storage = ContentAddressedStorage()
+
+
+def get_media_storage():
+    # Callable for FileField(storage=...), so migrations don't capture settings
+    return media_storage
@@ -0,0 +1,155 @@
+# social/tags.py
+"""
+#hashtag / @mention extraction for Post captions and VerbalPost content.
+
+sync_post() diffs the parsed text against the stored PostTag / Mention rows,
+so editing a caption only touches the tags that actually changed, and keeps
+Tag.post_count in step with F() updates. compute_trending() rebuilds the
+TrendingTag table for a window from one grouped aggregate.
+"""
+import re
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Post, VerbalPost, Tag, PostTag, Mention, TrendingTag
+
+TAG_LENGTH = Tag._meta.get_field('name').max_length
+HASHTAG_RE = re.compile(r'(?<![\w#&])#(\w{1,%d})' % TAG_LENGTH, re.UNICODE)
+MENTION_RE = re.compile(r'(?<![\w@])@([\w.@+-]{1,150})', re.UNICODE)
+
+WINDOW_DELTAS = {
+    '1h': timedelta(hours=1),
+    '24h': timedelta(hours=24),
+    '7d': timedelta(days=7),
+}
+TRENDING_SIZE = 50
+
+
+def post_text(post):
+    if isinstance(post, Post):
+        return post.caption or ''
+    if isinstance(post, VerbalPost):
+        return post.content or ''
+    return None
+
+
+def parse_tags(text):
+    # casefold() can lengthen a name ('ß' -> 'ss'), so cut again afterwards
+    return {name.casefold()[:TAG_LENGTH] for name in HASHTAG_RE.findall(text or '')}
+
+
+def parse_mentions(text):
+    # A sentence-ending '.' is not part of the username
+    return {name.rstrip('.') for name in MENTION_RE.findall(text or '')} - {''}
+
+
+def ensure_tags(names):
+    """Return {name: Tag}, creating any missing tags in one statement."""
+    if not names:
+        return {}
+    Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    return {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+
+
+@transaction.atomic
+def sync_post(post):
+    text = post_text(post)
+    if text is None:
+        return
+    ct = ContentType.objects.get_for_model(post.__class__)
+
+    # --- tags ---
+    wanted = parse_tags(text)
+    current = dict(
+        PostTag.objects.filter(content_type=ct, object_id=post.pk)
+        .values_list('tag__name', 'tag_id')
+    )
+    removed_ids = [tag_id for name, tag_id in current.items() if name not in wanted]
+    if removed_ids:
+        PostTag.objects.filter(content_type=ct, object_id=post.pk, tag_id__in=removed_ids).delete()
+        Tag.objects.filter(pk__in=removed_ids).update(post_count=F('post_count') - 1)
+
+    added = ensure_tags(wanted - set(current))
+    if added:
+        PostTag.objects.bulk_create([
+            PostTag(tag=tag, content_type=ct, object_id=post.pk, created_at=post.created_at)
+            for tag in added.values()
+        ])
+        Tag.objects.filter(pk__in=[tag.pk for tag in added.values()]).update(post_count=F('post_count') + 1)
+
+    # --- mentions ---
+    usernames = parse_mentions(text)
+    user_ids = set(User.objects.filter(username__in=usernames).values_list('id', flat=True)) if usernames else set()
+    existing = set(Mention.objects.filter(content_type=ct, object_id=post.pk).values_list('user_id', flat=True))
+    if existing - user_ids:
+        Mention.objects.filter(content_type=ct, object_id=post.pk, user_id__in=existing - user_ids).delete()
+    if user_ids - existing:
+        Mention.objects.bulk_create([
+            Mention(user_id=user_id, content_type=ct, object_id=post.pk, created_at=post.created_at)
+            for user_id in user_ids - existing
+        ])
+
+
+def load_posts(refs):
+    """
+    Resolve rows carrying (content_type_id, object_id) to Post / VerbalPost
+    instances, in the same order, with one query per post model.
+    """
+    querysets = {
+        ContentType.objects.get_for_model(Post).id: Post.objects.select_related('user', 'user__profile'),
+        ContentType.objects.get_for_model(VerbalPost).id: VerbalPost.objects.select_related('user', 'user__profile'),
+    }
+    ids_by_ct = {}
+    for ref in refs:
+        ids_by_ct.setdefault(ref.content_type_id, []).append(ref.object_id)
+    loaded = {
+        (ct_id, pk): obj
+        for ct_id, ids in ids_by_ct.items() if ct_id in querysets
+        for pk, obj in querysets[ct_id].in_bulk(ids).items()
+    }
+    return [loaded[key] for key in ((r.content_type_id, r.object_id) for r in refs) if key in loaded]
+
+
+@transaction.atomic
+def remove_post(post):
+    ct = ContentType.objects.get_for_model(post.__class__)
+    rows = PostTag.objects.filter(content_type=ct, object_id=post.pk)
+    tag_ids = list(rows.values_list('tag_id', flat=True))
+    if tag_ids:
+        rows.delete()
+        Tag.objects.filter(pk__in=tag_ids).update(post_count=F('post_count') - 1)
+    Mention.objects.filter(content_type=ct, object_id=post.pk).delete()
+
+
+def recount_tags():
+    """Recompute every Tag.post_count from PostTag in one grouped query."""
+    counts = dict(PostTag.objects.values_list('tag').annotate(n=Count('id')))
+    changed = []
+    for tag in Tag.objects.only('id', 'post_count').iterator(chunk_size=2000):
+        count = counts.get(tag.id, 0)
+        if tag.post_count != count:
+            tag.post_count = count
+            changed.append(tag)
+    Tag.objects.bulk_update(changed, ['post_count'], batch_size=1000)
+    return len(changed)
+
+
+@transaction.atomic
+def compute_trending(window, now=None):
+    now = now or timezone.now()
+    since = now - WINDOW_DELTAS[window]
+    top = (
+        PostTag.objects.filter(created_at__gte=since)
+        .values('tag').annotate(n=Count('id'))
+        .order_by('-n', 'tag')[:TRENDING_SIZE]
+    )
+    TrendingTag.objects.filter(window=window).delete()
+    TrendingTag.objects.bulk_create([
+        TrendingTag(window=window, rank=rank, tag_id=row['tag'], count=row['n'], computed_at=now)
+        for rank, row in enumerate(top, start=1)
+    ])
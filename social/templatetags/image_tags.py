@@ -0,0 +1,35 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+from .. import images
+from ..models import IMAGE_PENDING
+
+register = template.Library()
+
+
+@register.simple_tag
+def picture(obj, field_name, variant='feed', **attrs):
+    """
+    <picture> for one derivative of obj.<field_name>: WebP with a JPEG
+    fallback. While the derivatives are still being generated the LQIP
+    placeholder is shown; if generation failed, the original upload.
+    Extra keyword arguments become <img> attributes.
+    """
+    image = getattr(obj, field_name)
+    if not image:
+        return ''
+    attributes = format_html(''.join(f' {name}="{{}}"' for name in attrs), *attrs.values())
+    urls = images.variant_urls(obj, field_name)
+    if not urls:
+        pending = getattr(obj, images.status_field(field_name)) == IMAGE_PENDING
+        if pending:
+            src = getattr(obj, images.placeholder_field(field_name)) or static('social/img/image-pending.svg')
+        else:
+            src = image.url
+        return format_html('<img src="{}"{}>', src, attributes)
+    urls = urls[variant]
+    return format_html(
+        '<picture><source srcset="{}" type="image/webp"><img src="{}"{}></picture>',
+        urls['webp'], urls['jpeg'], attributes,
+    )
@@ -1,3 +1,1277 @@
-from django.test import TestCase
+import os
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache, caches
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.test import APIClient
+
+from . import (
+    autocomplete, discovery, funding_stats, images, media_gc, project_calendar, search, search_cache, tags, uploads,
+)
+from .api_views import ProjectViewSet
+from .models import (
+    Post, VerbalPost, Like, Comment, Message, Follow,
+    Profile, Project, ProjectFunding, ProjectPhoto, ProjectSupporter, ProjectCalendarEntry, Manifestation, ImageJob,
+    MediaBlob, Conversation, ConversationParticipant, Tag, PostTag, Mention, UploadSession,
+    ProjectMembership,
+)
+from .serializers import PostSerializer, ProjectListSerializer
+
+
+# ========== QUERY PLAN REGRESSION ==========
+
+class QueryPlanTests(TestCase):
+    """
+    Seeds a small dataset and checks EXPLAIN output for the hot lookups, so a
+    schema change that drops one of the composite indexes fails loudly instead
+    of quietly turning the query back into a table scan.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = User.objects.bulk_create([
+            User(username=f'planuser{i}') for i in range(20)
+        ])
+        posts = Post.objects.bulk_create([
+            Post(user=cls.users[i % 20], image=f'post_images/{i}.jpg', caption=f'caption {i}')
+            for i in range(200)
+        ])
+        VerbalPost.objects.bulk_create([
+            VerbalPost(user=cls.users[i % 20], content=f'words {i}')
+            for i in range(200)
+        ])
+        cls.post_ct = ContentType.objects.get_for_model(Post)
+        Like.objects.bulk_create([
+            Like(user=user, content_type=cls.post_ct, object_id=post.id)
+            for post in posts[:50] for user in cls.users[:5]
+        ])
+        Comment.objects.bulk_create([
+            Comment(user=cls.users[i % 20], content=f'comment {i}',
+                    content_type=cls.post_ct, object_id=posts[i % 50].id)
+            for i in range(300)
+        ])
+        Message.objects.bulk_create([
+            Message(sender=cls.users[i % 20], recipient=cls.users[(i + 1) % 20],
+                    subject=f'subject {i}', body='body')
+            for i in range(300)
+        ])
+        Follow.objects.bulk_create([
+            Follow(follower=follower, following=following)
+            for follower in cls.users for following in cls.users
+            if follower != following
+        ])
+
+    def assertUsesIndex(self, queryset, index_name, ordered=False):
+        table = queryset.model._meta.db_table
+
+        if connection.vendor == 'postgresql':
+            # The seed set is tiny, so make the planner prove it *can* use the index
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+            self.assertNotIn(f'Seq Scan on {table}', plan, plan)
+            self.assertIn(index_name, plan, plan)
+            if ordered:
+                self.assertNotRegex(plan, r'(?m)^\s*(->\s*)?Sort\b', plan)
+            return
+
+        if connection.vendor != 'sqlite':
+            self.skipTest(f'No plan assertions for {connection.vendor}')
+
+        plan = queryset.explain()
+        self.assertRegex(plan, rf'SEARCH {table} USING (COVERING )?INDEX {index_name}\b', plan)
+        self.assertNotRegex(plan, rf'SCAN {table}\b', plan)
+        if ordered:
+            self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan, plan)
+
+    def test_like_lookup_by_target(self):
+        qs = Like.objects.filter(content_type=self.post_ct, object_id=1)
+        self.assertUsesIndex(qs, 'like_target_idx')
+
+    def test_comment_lookup_by_target(self):
+        qs = Comment.objects.filter(content_type=self.post_ct, object_id=1)
+        self.assertUsesIndex(qs, 'comment_target_created_idx', ordered=True)
+
+    def test_posts_by_user_newest_first(self):
+        qs = Post.objects.filter(user=self.users[0])
+        self.assertUsesIndex(qs, 'post_user_created_idx', ordered=True)
+
+    def test_verbal_posts_by_user_newest_first(self):
+        qs = VerbalPost.objects.filter(user=self.users[0])
+        self.assertUsesIndex(qs, 'verbalpost_user_created_idx', ordered=True)
+
+    def test_inbox_newest_first(self):
+        qs = Message.objects.filter(recipient=self.users[0]).order_by('-created_at')
+        self.assertUsesIndex(qs, 'message_recipient_created_idx', ordered=True)
+
+    def test_outbox_newest_first(self):
+        qs = Message.objects.filter(sender=self.users[0]).order_by('-created_at')
+        self.assertUsesIndex(qs, 'message_sender_created_idx', ordered=True)
+
+    def test_conversation_inbox(self):
+        qs = ConversationParticipant.objects.filter(user=self.users[0]).order_by('-last_message_at', '-id')
+        self.assertUsesIndex(qs, 'conversation_inbox_idx', ordered=True)
+
+    def test_followers_of_user(self):
+        qs = Follow.objects.filter(following=self.users[0]).values_list('follower', flat=True)
+        self.assertUsesIndex(qs, 'follow_following_follower_idx')
+
+
+# ========== PROJECT API QUERY COUNTS ==========
+
+class ProjectQueryCountTests(TestCase):
+    """Pin the number of queries per ProjectViewSet action so N+1s can't creep back in."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = User.objects.create_user('projectowner')
+        Profile.objects.create(user=cls.creator)
+        collaborators = User.objects.bulk_create([User(username=f'collab{i}') for i in range(3)])
+        manifestation = Manifestation.objects.create(name='Installation')
+        cls.projects = []
+        for i in range(10):
+            project = Project.objects.create(
+                creator=cls.creator, title=f'Project {i}', description='desc',
+                start_date=date(2026, 1, 1), end_date=date(2026, 12, 31),
+            )
+            project.collaborators.add(*collaborators)
+            project.manifestations.add(manifestation)
+            if i % 2:
+                ProjectFunding.objects.create(project=project, goal=Decimal('1000'))
+            ProjectPhoto.objects.create(project=project, image=f'project_photos/{i}.jpg')
+            ProjectCalendarEntry.objects.create(project=project, date=date(2026, 2, 1), content='day one')
+            cls.projects.append(project)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_list(self):
+        # COUNT for pagination + one joined SELECT (creator, funding)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/projects/')
+        self.assertEqual(response.status_code, 200)
+        funded = [p for p in response.json()['results'] if p['funding']['enabled']]
+        self.assertEqual(len(funded), 5)
+
+    def test_list_with_sharded_funding(self):
+        # Shard sums come from a subquery annotation, not one aggregate per row
+        for project in self.projects[1::2]:
+            project.funding.set_counter_shards(4)
+            ProjectSupporter.objects.create(funding=project.funding, name='fan', amount=Decimal('10'))
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/projects/')
+        raised = {p['id']: Decimal(str(p['funding']['raised'])) for p in response.json()['results'] if p['funding']['enabled']}
+        self.assertEqual(set(raised.values()), {Decimal('10')})
+
+    def test_retrieve(self):
+        # project + creator + funding + calendar summary, then collaborators, manifestations, photos
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/projects/{self.projects[1].pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['funding']['enabled'])
+
+    def test_funding(self):
+        # project + funding, budget items, recent supporters
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/projects/{self.projects[1].pk}/funding/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_profile_projects(self):
+        # profile lookup + one membership range scan joined to project/creator/funding
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/profiles/{self.creator.username}/projects/')
+        results = response.json()['results']
+        self.assertEqual(len(results), 10)
+        self.assertEqual({p['role'] for p in results}, {'creator'})
+
+
+class ProjectListBenchmark(TestCase):
+    """Serializing 1,000 projects with the list queryset must stay a single query."""
+
+    def test_list_1000_projects(self):
+        creator = User.objects.create_user('bulkcreator')
+        projects = Project.objects.bulk_create([
+            Project(creator=creator, title=f'Bulk {i}', description='desc')
+            for i in range(1000)
+        ])
+        ProjectFunding.objects.bulk_create([
+            ProjectFunding(project=project, goal=Decimal('500'))
+            for project in projects[::3]
+        ])
+
+        view = ProjectViewSet(action='list')
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            data = ProjectListSerializer(view.get_queryset(), many=True).data
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(data), 1000)
+        self.assertEqual(
+            len(queries), 1, f"listed 1,000 projects in {elapsed * 1000:.1f} ms with {len(queries)} queries",
+        )
+
+
+# ========== MEDIA SERVING ==========
+
+class MediaServingTests(TestCase):
+    """Byte ranges, validators and cache headers of /media/."""
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        self.digest = 'ab' * 32
+        self.path = f'blobs/ab/ab/{self.digest}.jpg'
+        os.makedirs(os.path.join(self.root.name, 'blobs/ab/ab'))
+        with open(os.path.join(self.root.name, self.path), 'wb') as f:
+            f.write(bytes(range(256)) * 4)
+        override = override_settings(MEDIA_ROOT=self.root.name, MEDIA_OFFLOAD=None)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_full_response_headers(self):
+        response = self.client.get(f'/media/{self.path}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(256)) * 4)
+        self.assertEqual(response['ETag'], f'"{self.digest}"')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_derivatives_keep_the_source_extension(self):
+        self.assertNotEqual(images.derivative_dir('post_images/a.jpg'), images.derivative_dir('post_images/a.png'))
+        directory = images.derivative_dir(self.path)
+        self.assertEqual(directory, f'derivatives/blobs/ab/ab/{self.digest}.jpg')
+        os.makedirs(os.path.join(self.root.name, directory))
+        for name in ('feed.webp', 'feed.0123456789abcdef.webp'):
+            open(os.path.join(self.root.name, directory, name), 'wb').close()
+        # Only a name carrying the derivative's own hash is safe to cache forever
+        self.assertEqual(self.client.get(f'/media/{directory}/feed.webp')['Cache-Control'], 'public, max-age=3600')
+        self.assertIn('immutable', self.client.get(f'/media/{directory}/feed.0123456789abcdef.webp')['Cache-Control'])
+
+    def test_byte_ranges(self):
+        response = self.client.get(f'/media/{self.path}', HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/1024')
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(10, 20)))
+
+        response = self.client.get(f'/media/{self.path}', HTTP_RANGE='bytes=-4')
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(252, 256)))
+
+        response = self.client.get(f'/media/{self.path}', HTTP_RANGE='bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+        # Stale If-Range: the whole file instead of the range
+        response = self.client.get(f'/media/{self.path}', HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_conditional_get(self):
+        response = self.client.get(f'/media/{self.path}', HTTP_IF_NONE_MATCH=f'"{self.digest}"')
+        self.assertEqual(response.status_code, 304)
+
+    def test_accel_redirect_offload(self):
+        with override_settings(MEDIA_OFFLOAD='x-accel-redirect', MEDIA_ACCEL_REDIRECT_PREFIX='/protected/'):
+            response = self.client.get(f'/media/{self.path}')
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected/{self.path}')
+        self.assertEqual(response.content, b'')
+
+    def test_path_traversal(self):
+        self.assertEqual(self.client.get('/media/..%2Fdb.sqlite3').status_code, 404)
+
+
+# ========== RESUMABLE UPLOADS ==========
+
+class ResumableUploadTests(TestCase):
+    """Chunked project photo upload, including a resume after an out-of-order chunk."""
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        override = override_settings(
+            MEDIA_ROOT=os.path.join(self.root.name, 'media'),
+            CHUNKED_UPLOAD_DIR=os.path.join(self.root.name, 'parts'),
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.creator = User.objects.create_user('uploader')
+        self.project = Project.objects.create(creator=self.creator, title='Big photos', description='desc')
+        self.client = APIClient()
+        self.client.force_authenticate(self.creator)
+
+        buffer = BytesIO()
+        Image.new('RGB', (64, 48), 'teal').save(buffer, 'PNG')
+        self.data = buffer.getvalue()
+
+    def put_chunk(self, upload_id, start, end):
+        return self.client.put(
+            f'/api/uploads/{upload_id}/', self.data[start:end + 1],
+            content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{end}/{len(self.data)}',
+        )
+
+    def test_chunked_upload(self):
+        response = self.client.post('/api/uploads/', {
+            'project': self.project.pk, 'filename': 'big.png', 'size': len(self.data), 'caption': 'wide',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        upload_id = response.json()['id']
+        middle = len(self.data) // 2
+
+        # Skipping ahead is refused with the offset to resume from
+        response = self.put_chunk(upload_id, middle, len(self.data) - 1)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 0)
+
+        self.assertEqual(self.put_chunk(upload_id, 0, middle - 1).json()['offset'], middle)
+        self.assertEqual(self.client.get(f'/api/uploads/{upload_id}/').json()['offset'], middle)
+        self.assertTrue(self.put_chunk(upload_id, middle, len(self.data) - 1).json()['complete'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/uploads/{upload_id}/finalize/')
+        self.assertEqual(response.status_code, 201)
+        photo = ProjectPhoto.objects.get(project=self.project)
+        self.assertEqual(photo.caption, 'wide')
+        with photo.image.open('rb') as stored:
+            self.assertEqual(stored.read(), self.data)
+        self.assertEqual(os.listdir(os.path.join(self.root.name, 'parts')), [])
+
+    def test_repeated_finalize_returns_the_same_photo(self):
+        session = uploads.start_session(self.creator, self.project, 'twice.png', len(self.data))
+        uploads.write_chunk(session, 0, len(self.data) - 1, len(self.data), BytesIO(self.data))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            photo = uploads.finalize(session)
+        # `session` is stale (still open), like a request that read it before the first finalize
+        self.assertEqual(uploads.finalize(session), photo)
+        self.assertEqual(ProjectPhoto.objects.filter(project=self.project).count(), 1)
+
+    def test_racing_chunk_loses_at_commit(self):
+        session = uploads.start_session(self.creator, self.project, 'race.png', len(self.data))
+        data = self.data
+
+        class RacedStream(BytesIO):
+            """Another request commits the same chunk while this body is still being read."""
+            def read(self, size=-1):
+                UploadSession.objects.filter(pk=session.pk).update(received=len(data))
+                return super().read(size)
+
+        with self.assertRaises(uploads.OffsetMismatch) as raised:
+            uploads.write_chunk(session, 0, len(data) - 1, len(data), RacedStream(data))
+        self.assertEqual(raised.exception.offset, len(data))
+
+    def test_bad_session_parameters_are_rejected(self):
+        valid = {'project': self.project.pk, 'filename': 'ok.png', 'size': 10, 'caption': 'fine'}
+        for bad in [{'project': 'abc'}, {'project': 999999}, {'size': 'lots'}, {'size': 0},
+                    {'size': uploads.MAX_UPLOAD_SIZE + 1}, {'filename': ''}, {'caption': 'x' * 201}]:
+            response = self.client.post('/api/uploads/', {**valid, **bad}, format='json')
+            self.assertEqual(response.status_code, 400, bad)
+        self.assertEqual(self.client.post('/api/uploads/', valid, format='json').status_code, 201)
+
+    def test_only_creator_can_upload(self):
+        self.client.force_authenticate(User.objects.create_user('stranger'))
+        response = self.client.post('/api/uploads/', {
+            'project': self.project.pk, 'filename': 'x.png', 'size': 10,
+        }, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class BatchPhotoUploadTests(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        override = override_settings(MEDIA_ROOT=self.root.name, IMAGE_JOBS_EAGER=False)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.creator = User.objects.create_user('gallery')
+        self.project = Project.objects.create(creator=self.creator, title='Gallery', description='desc')
+        self.client = APIClient()
+        self.client.force_authenticate(self.creator)
+
+    def image_file(self, name, color, fmt='PNG'):
+        buffer = BytesIO()
+        Image.new('RGB', (40, 30), color).save(buffer, fmt)
+        buffer.name = name
+        buffer.seek(0)
+        return buffer
+
+    def test_upload_many(self):
+        files = [self.image_file(f'{i}.png', (i * 40, 0, 0)) for i in range(3)]
+        files += [self.image_file(f'{i}.jpg', (0, i * 40, 0), 'JPEG') for i in range(2)]
+        response = self.client.post(f'/api/projects/{self.project.pk}/upload_photos/', {
+            'images': files, 'captions': ['first', 'second'],
+        }, format='multipart')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual([p['caption'] for p in response.json()], ['first', 'second', '', '', ''])
+
+        photos = ProjectPhoto.objects.filter(project=self.project)
+        self.assertEqual(photos.count(), 5)
+        # JPEGs get theirs in the request; the rest wait for their job
+        self.assertEqual(
+            sorted(bool(p.image_placeholder) for p in photos), [False, False, False, True, True],
+        )
+        jobs = ImageJob.objects.filter(object_id__in=[p.pk for p in photos])
+        self.assertEqual(jobs.count(), 5)
+
+        for job_id in images.claim_jobs(10):
+            images.run_job(job_id)
+        self.assertTrue(all(
+            p.image_placeholder.startswith('data:image/webp')
+            for p in ProjectPhoto.objects.filter(project=self.project)
+        ))
+
+    def test_invalid_file_rejects_batch(self):
+        bad = BytesIO(b'not an image')
+        bad.name = 'bad.png'
+        response = self.client.post(f'/api/projects/{self.project.pk}/upload_photos/', {
+            'images': [self.image_file('ok.png', 'red'), bad],
+        }, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('1', response.json()['errors'])
+        self.assertFalse(ProjectPhoto.objects.filter(project=self.project).exists())
+
+
+# ========== MEDIA GC ==========
+
+class MediaGarbageCollectionTests(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        override = override_settings(
+            MEDIA_ROOT=os.path.join(self.root.name, 'media'),
+            CHUNKED_UPLOAD_DIR=os.path.join(self.root.name, 'parts'),
+            IMAGE_JOBS_EAGER=False,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user('collector')
+
+    def make_post(self, color):
+        buffer = BytesIO()
+        Image.new('RGB', (20, 20), color).save(buffer, 'PNG')
+        return Post.objects.create(user=self.user, image=ContentFile(buffer.getvalue(), name='p.png'))
+
+    def age_media(self):
+        old = time.time() - 2 * 3600
+        for directory, _, files in os.walk(os.path.join(self.root.name, 'media')):
+            for name in files:
+                os.utime(os.path.join(directory, name), (old, old))
+
+    def test_deleted_post_image_is_collected(self):
+        kept, deleted = self.make_post('red'), self.make_post('blue')
+        stray = os.path.join(self.root.name, 'media', 'post_images', 'stray.jpg')
+        os.makedirs(os.path.dirname(stray))
+        open(stray, 'wb').close()
+        deleted_name = deleted.image.name
+        deleted.delete()
+        self.age_media()
+
+        preview = media_gc.collect(dry_run=True)
+        self.assertEqual((preview['orphans'], preview['blobs']), (2, 1))
+        self.assertTrue(os.path.exists(stray))
+
+        quarantine = os.path.join(self.root.name, 'quarantine')
+        media_gc.collect(quarantine_dir=quarantine)
+        self.assertTrue(kept.image.storage.exists(kept.image.name))
+        self.assertFalse(kept.image.storage.exists(deleted_name))
+        self.assertTrue(os.path.exists(os.path.join(quarantine, deleted_name)))
+        self.assertFalse(MediaBlob.objects.filter(name=deleted_name).exists())
+        self.assertTrue(MediaBlob.objects.filter(name=kept.image.name).exists())
+
+    def test_reuploading_same_bytes_keeps_one_reference(self):
+        post = self.make_post('green')
+        name = post.image.name
+        buffer = BytesIO()
+        Image.new('RGB', (20, 20), 'green').save(buffer, 'PNG')
+        post.image = ContentFile(buffer.getvalue(), name='again.png')
+        post.save()
+        post.caption = 'edited'
+        post.save()  # no upload: the reference stays
+        self.assertEqual(post.image.name, name)
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 1)
+
+        post.delete()
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 0)
+
+    def test_resized_copy_is_a_near_duplicate(self):
+        def upload(img, name, fmt):
+            buffer = BytesIO()
+            img.save(buffer, fmt)
+            post = Post.objects.create(user=self.user, image=ContentFile(buffer.getvalue(), name=name))
+            return MediaBlob.objects.get(name=post.image.name)
+
+        original = Image.linear_gradient('L').resize((240, 160)).convert('RGB')
+        original.paste((200, 30, 30), (30, 40, 110, 120))
+        unrelated = Image.linear_gradient('L').rotate(90).resize((240, 160)).convert('RGB')
+        unrelated.paste((20, 200, 20), (150, 10, 230, 60))
+
+        blob = upload(original, 'original.png', 'PNG')
+        copy = upload(original.resize((120, 80), Image.LANCZOS), 'copy.jpg', 'JPEG')
+        other = upload(unrelated, 'other.png', 'PNG')
+
+        self.assertNotEqual(blob.sha256, copy.sha256)
+        self.assertEqual([b.pk for b in blob.near_duplicates()], [copy.pk])
+        self.assertEqual([b.pk for b in copy.near_duplicates()], [blob.pk])
+        self.assertNotIn(blob.pk, [b.pk for b in other.near_duplicates()])
+
+    def test_rows_without_an_image_are_not_pending(self):
+        self.assertEqual(Post.objects.create(user=self.user, caption='text only').image_status, 'none')
+
+        post = self.make_post('orange')
+        self.assertEqual(Post.objects.get(pk=post.pk).image_status, 'pending')
+        post.image = None
+        post.save()
+        self.assertEqual(Post.objects.get(pk=post.pk).image_status, 'none')
+
+    def test_reupload_rewrites_a_blob_whose_file_is_gone(self):
+        post = self.make_post('purple')
+        name = post.image.name
+        post.delete()
+        # Collected file whose row is still there (e.g. the collector stopped halfway)
+        os.unlink(post.image.storage.path(name))
+
+        again = self.make_post('purple')
+        self.assertEqual(again.image.name, name)
+        self.assertTrue(again.image.storage.exists(name))
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 1)
+
+        self.age_media()
+        stats = media_gc.collect()
+        self.assertEqual(stats['blobs'], 0)
+        self.assertTrue(again.image.storage.exists(name))
+
+# ========== IMAGE DERIVATIVES ==========
+
+class ImageDerivativeTests(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        override = override_settings(MEDIA_ROOT=self.root.name, IMAGE_JOBS_EAGER=True)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user('photographer')
+
+    def rotated_jpeg(self):
+        """400x200 as stored, red left / blue right, tagged to display rotated 90° clockwise (200x400)."""
+        img = Image.new('RGB', (400, 200), 'blue')
+        img.paste((255, 0, 0), (0, 0, 200, 200))
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation
+        exif[0x010F] = 'SecretCam'  # Make
+        buffer = BytesIO()
+        img.save(buffer, 'JPEG', exif=exif, quality=95)
+        return ContentFile(buffer.getvalue(), name='rotated.jpg')
+
+    def test_variants_are_oriented_sized_and_stripped(self):
+        post = Post.objects.create(user=self.user, image=self.rotated_jpeg())
+        variants = post.image_variants
+        self.assertEqual(post.image_status, 'ready')
+        self.assertEqual(variants['original'], {'width': 200, 'height': 400})
+
+        expected = {'thumb': (160, 320), 'feed': (200, 400), 'full': (200, 400)}  # never upscaled
+        for variant, size in expected.items():
+            self.assertEqual((variants[variant]['width'], variants[variant]['height']), size)
+            for fmt, pil_format in (('webp', 'WEBP'), ('jpeg', 'JPEG')):
+                name = variants[variant][fmt]
+                self.assertTrue(name.startswith(images.derivative_dir(post.image.name) + '/'))
+                with post.image.storage.open(name) as stored:
+                    img = Image.open(stored)
+                    img.load()
+                self.assertEqual((img.format, img.size), (pil_format, size))
+                self.assertEqual(dict(img.getexif()), {})
+                self.assertNotIn('exif', img.info)
+                # The left (red) side of the stored pixels is now on top
+                rgb = img.convert('RGB')
+                top, bottom = rgb.getpixel((size[0] // 2, 5)), rgb.getpixel((size[0] // 2, size[1] - 5))
+                self.assertGreater(top[0], 200)
+                self.assertGreater(bottom[2], 200)
+
+    def test_srcset_from_finished_variants(self):
+        post = Post.objects.create(user=self.user, image=self.rotated_jpeg())
+        srcset = PostSerializer(post).data['image_srcset']
+        self.assertEqual((srcset['width'], srcset['height']), (200, 400))
+        self.assertEqual([c['width'] for c in srcset['candidates']], [160, 200])  # feed and full are both 200 wide
+        urls = {variant: images.variant_urls(post, 'image')[variant] for variant in ('thumb', 'feed')}
+        self.assertEqual(srcset['webp'], f"{urls['thumb']['webp']} 160w, {urls['feed']['webp']} 200w")
+        self.assertEqual(srcset['jpeg'], f"{urls['thumb']['jpeg']} 160w, {urls['feed']['jpeg']} 200w")
+
+    def test_srcset_falls_back_while_pending_or_failed(self):
+        with self.settings(IMAGE_JOBS_EAGER=False):
+            post = Post.objects.create(user=self.user, image=self.rotated_jpeg())
+        data = PostSerializer(post).data
+        self.assertEqual(data['image_status'], 'pending')
+        self.assertIsNone(data['image_srcset'])
+        self.assertIsNone(data['image_variants'])
+        self.assertTrue(data['image_placeholder'].startswith('data:image/webp'))  # a JPEG: made in the request
+
+        Post.objects.filter(pk=post.pk).update(image_status='failed')
+        data = PostSerializer(Post.objects.get(pk=post.pk)).data
+        self.assertEqual(data['image_status'], 'failed')
+        self.assertIsNone(data['image_srcset'])
+        self.assertTrue(data['image'])  # clients fall back to the original
+
+    def test_failed_image_is_not_requeued_on_unrelated_saves(self):
+        with self.settings(IMAGE_JOBS_EAGER=False):
+            post = Post.objects.create(user=self.user, image=self.rotated_jpeg())
+            ImageJob.objects.update(status=ImageJob.STATUS_FAILED)
+            Post.objects.filter(pk=post.pk).update(image_status='failed')
+
+            post = Post.objects.get(pk=post.pk)
+            post.caption = 'edited'
+            post.save()
+            self.assertEqual(ImageJob.objects.count(), 1)
+            self.assertEqual(Post.objects.get(pk=post.pk).image_status, 'failed')
+
+            post.image = self.rotated_jpeg()
+            post.save()
+            self.assertEqual(ImageJob.objects.filter(status=ImageJob.STATUS_PENDING).count(), 1)
+            self.assertEqual(Post.objects.get(pk=post.pk).image_status, 'pending')
+
+        call_command('generate_image_variants', '--force', stdout=StringIO())
+        self.assertEqual(Post.objects.get(pk=post.pk).image_status, 'ready')
+
+    def test_regenerated_derivatives_get_new_names(self):
+        post = Post.objects.create(user=self.user, image=self.rotated_jpeg())
+        before = post.image_variants
+        for fmt in ('webp', 'jpeg'):
+            self.assertRegex(before['feed'][fmt], r'/feed\.[0-9a-f]{16}\.(webp|jpg)$')
+
+        call_command('generate_image_variants', '--force', stdout=StringIO())
+        self.assertEqual(Post.objects.get(pk=post.pk).image_variants, before)  # same bytes, same names
+
+        with mock.patch.dict(images.FORMATS, {'webp': ('WEBP', 'webp', {'quality': 30})}):
+            call_command('generate_image_variants', '--force', stdout=StringIO())
+        after = Post.objects.get(pk=post.pk).image_variants
+        self.assertNotEqual(after['feed']['webp'], before['feed']['webp'])
+        self.assertEqual(after['feed']['jpeg'], before['feed']['jpeg'])
+        with post.image.storage.open(before['feed']['webp']) as old:
+            self.assertTrue(old.read())  # left for gc_media, not rewritten
+
+
+# ========== CONVERSATIONS ==========
+
+class ConversationTests(TestCase):
+
+    def setUp(self):
+        self.alice, self.bob, self.carol = User.objects.bulk_create([
+            User(username='alice'), User(username='bob'), User(username='carol'),
+        ])
+        self.client = APIClient()
+
+    def send(self, sender, recipient, body):
+        return Message.objects.create(sender=sender, recipient=recipient, subject='hi', body=body)
+
+    def test_send_maintains_conversation(self):
+        first = self.send(self.alice, self.bob, 'one')
+        reply = self.send(self.bob, self.alice, 'two')
+        self.send(self.bob, self.alice, 'three ' * 40)
+        self.assertEqual(first.conversation_id, reply.conversation_id)
+
+        conversation = Conversation.objects.get()
+        self.assertTrue(conversation.last_message_preview.startswith('three three'))
+        self.assertEqual(len(conversation.last_message_preview), Conversation.PREVIEW_LENGTH)
+        unread = dict(conversation.memberships.values_list('user__username', 'unread_count'))
+        self.assertEqual(unread, {'alice': 2, 'bob': 1})
+
+    def test_inbox_and_read(self):
+        self.send(self.alice, self.bob, 'old')
+        self.send(self.carol, self.bob, 'new')
+        self.client.force_authenticate(self.bob)
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/messages/inbox/')
+        results = response.json()['results']
+        self.assertEqual([r['correspondent']['username'] for r in results], ['carol', 'alice'])
+        self.assertEqual(results[0]['unread_count'], 1)
+
+        response = self.client.get(f'/api/messages/conversations/{results[0]["id"]}/')
+        self.assertEqual([m['body'] for m in response.json()['results']], ['new'])
+        self.assertEqual(self.client.get('/api/messages/inbox/').json()['results'][0]['unread_count'], 0)
+        self.assertFalse(Message.objects.filter(recipient=self.bob, sender=self.carol, is_read=False).exists())
+
+        self.client.force_authenticate(self.alice)
+        self.assertEqual(self.client.get(f'/api/messages/conversations/{results[0]["id"]}/').status_code, 404)
+
+
+    def test_html_inbox_lists_conversations(self):
+        self.send(self.alice, self.bob, 'old')
+        self.send(self.carol, self.bob, 'new')
+        self.send(self.bob, self.carol, 'reply')
+        self.client.force_login(self.bob)
+
+        response = self.client.get('/inbox/')
+        self.assertEqual(response.status_code, 200)
+        rows = [
+            (m.correspondent.username, m.unread_count, m.last_message_from_me)
+            for m in response.context['conversations']
+        ]
+        self.assertEqual(rows, [('carol', 1, True), ('alice', 1, False)])
+        self.assertContains(response, '1 unread', count=2)
+
+
+# ========== FUNDING ==========
+
+class FundingTests(TestCase):
+
+    def setUp(self):
+        self.creator = User.objects.create_user('fundraiser')
+
+    def campaign(self, title, goal='100'):
+        project = Project.objects.create(creator=self.creator, title=title, description='desc')
+        return ProjectFunding.objects.create(project=project, goal=Decimal(goal))
+
+    def support(self, funding, amount):
+        return ProjectSupporter.objects.create(funding=funding, name='fan', amount=Decimal(amount))
+
+    def test_supporters_pages_newest_first_without_repeats(self):
+        funding = self.campaign('popular')
+        supporters = [self.support(funding, '1') for _ in range(45)]
+        # Ties on created_at must be broken by id, or rows repeat / vanish at page edges
+        ProjectSupporter.objects.filter(pk__in=[s.pk for s in supporters[10:30]]).update(
+            created_at=supporters[10].created_at,
+        )
+        expected = list(
+            ProjectSupporter.objects.filter(funding=funding).order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+
+        client, seen, pages = APIClient(), [], 0
+        url = f'/api/projects/{funding.project_id}/supporters/'
+        while url:
+            body = client.get(url).json()
+            seen.extend(row['id'] for row in body['results'])
+            url, pages = body['next'], pages + 1
+        self.assertEqual(pages, 3)
+        self.assertEqual(seen, expected)
+
+    def test_leaderboard_ranks_sharded_campaigns_by_true_totals(self):
+        steady, hot = self.campaign('steady'), self.campaign('hot')
+        self.support(steady, '50')
+        hot.set_counter_shards(4)
+        for _ in range(3):
+            self.support(hot, '30')  # all in shards: hot's indexed raised is still 0
+
+        response = self.client.get('/api/projects/leaderboard/?board=top_funded')
+        results = response.json()['results']
+        self.assertEqual([p['title'] for p in results], ['hot', 'steady'])
+        self.assertEqual(Decimal(str(results[0]['funding']['raised'])), Decimal('90'))
+
+        response = self.client.get('/api/projects/leaderboard/?board=closest_to_goal')
+        self.assertEqual([p['title'] for p in response.json()['results']], ['hot', 'steady'])
+
+    def test_resharding_keeps_totals(self):
+        funding = self.campaign('reshard')
+        funding.set_counter_shards(8)
+        for _ in range(5):
+            self.support(funding, '2')
+        funding.set_counter_shards(2)
+        funding = ProjectFunding.objects.get(pk=funding.pk)
+        self.assertEqual((funding.total_raised, funding.total_supporters), (Decimal('10.00'), 5))
+        self.assertEqual(funding.shards.count(), 2)
+
+    def test_daily_rollup_of_sharded_campaign(self):
+        funding = self.campaign('daily')
+        funding.set_counter_shards(4)
+        for _ in range(8):
+            self.support(funding, '5')
+        self.assertGreater(funding.daily.count(), 1)  # spread over shard buckets
+
+        response = self.client.get(f'/api/projects/{funding.project_id}/funding/daily/')
+        points = response.json()['points']
+        self.assertEqual(len(points), 1)
+        self.assertEqual(points[0]['supporters'], 8)
+        self.assertEqual(points[0]['raised'], '40.00')  # money as a 2-dp string, like the other endpoints
+
+    def test_reconcile_fixes_drift_after_supporter_delete(self):
+        funding = self.campaign('drift')
+        self.support(funding, '30')
+        self.support(funding, '20').delete()  # counters still include the 20
+
+        self.assertEqual(funding_stats.reconcile(dry_run=True)['drifted'], [funding.pk])
+        stats = funding_stats.reconcile()
+        self.assertEqual(stats['fixed'], 1)
+        funding.refresh_from_db()
+        self.assertEqual(
+            (funding.raised, funding.supporter_count, funding.percent_funded),
+            (Decimal('30.00'), 1, Decimal('30.00')),
+        )
+        self.assertEqual(funding_stats.reconcile(dry_run=True)['drifted'], [])
+
+    def test_reconcile_sharded_campaign(self):
+        funding = self.campaign('sharded')
+        self.support(funding, '10')
+        funding.set_counter_shards(4)
+        for _ in range(4):
+            self.support(funding, '5')  # uncompacted, in shards
+        self.assertEqual(funding_stats.reconcile(dry_run=True)['drifted'], [])
+
+        self.support(funding, '5').delete()
+        self.assertEqual(funding_stats.reconcile()['drifted'], [funding.pk])
+        funding = ProjectFunding.objects.get(pk=funding.pk)
+        self.assertEqual((funding.total_raised, funding.total_supporters), (Decimal('30.00'), 5))
+        self.assertEqual(funding_stats.reconcile(dry_run=True)['drifted'], [])
+
+
+# ========== AUTOCOMPLETE ==========
+
+class AutocompleteTests(TestCase):
+
+    def setUp(self):
+        self.viewer = User.objects.create_user('viewer')
+        for index in range(5):
+            User.objects.create_user(f'ann{index}')
+        self.friend = User.objects.create_user('annz')
+        self.fan = User.objects.create_user('annx')
+        Follow.objects.create(follower=self.viewer, following=self.friend)
+        Follow.objects.create(follower=self.fan, following=self.viewer)
+
+    def test_follows_past_the_candidate_cap_are_ranked_first(self):
+        with mock.patch.object(autocomplete, 'CANDIDATE_LIMIT', 3):
+            with self.assertNumQueries(6):  # 2 candidate scans, 3 proximity, 1 user fetch
+                users = autocomplete.suggest_users('Ann', viewer=self.viewer, limit=4)
+        self.assertEqual([user.username for user in users], ['annz', 'annx', 'ann0', 'ann1'])
+        self.assertEqual(
+            [user.proximity for user in users],
+            [autocomplete.FOLLOWING, autocomplete.FOLLOWER, autocomplete.OTHER, autocomplete.OTHER],
+        )
+
+        anonymous = autocomplete.suggest_users('ann', limit=4)
+        self.assertEqual([user.username for user in anonymous], ['ann0', 'ann1', 'ann2', 'ann3'])
+
+    def test_long_names_fit_the_key_column(self):
+        user = User.objects.create_user('longname', first_name='ß' * 150, last_name='Ǆ' * 150)
+        keys = list(user.autocomplete_keys.values_list('key', flat=True))
+        self.assertTrue(keys)
+        self.assertTrue(all(len(key) <= autocomplete.KEY_LENGTH for key in keys))
+        self.assertEqual([u.username for u in autocomplete.suggest_users('ss' * 200)], ['longname'])
+
+
+# ========== PROJECT MEMBERSHIP ==========
+
+class ProjectMembershipTests(TestCase):
+
+    def setUp(self):
+        self.owner, self.ann, self.ben = (User.objects.create_user(name) for name in ('owner', 'ann', 'ben'))
+        self.project = Project.objects.create(creator=self.owner, title='Shared', description='desc')
+
+    def roles(self):
+        return dict(
+            ProjectMembership.objects.filter(project=self.project).values_list('user__username', 'role')
+        )
+
+    def test_collaborator_add_remove_clear(self):
+        self.assertEqual(self.roles(), {'owner': 'creator'})
+        self.project.collaborators.add(self.ann, self.ben)
+        self.assertEqual(self.roles(), {'owner': 'creator', 'ann': 'collaborator', 'ben': 'collaborator'})
+
+        self.project.collaborators.remove(self.ann)
+        self.assertEqual(self.roles(), {'owner': 'creator', 'ben': 'collaborator'})
+
+        self.project.collaborators.clear()
+        self.assertEqual(self.roles(), {'owner': 'creator'})
+
+    def test_changes_from_the_user_side(self):
+        other = Project.objects.create(creator=self.owner, title='Other', description='desc')
+        self.ann.collaborative_projects.add(self.project, other)
+        self.assertEqual(ProjectMembership.objects.filter(user=self.ann).count(), 2)
+
+        self.ann.collaborative_projects.remove(other)
+        self.assertEqual(self.roles(), {'owner': 'creator', 'ann': 'collaborator'})
+
+        self.ann.collaborative_projects.clear()
+        self.assertFalse(ProjectMembership.objects.filter(user=self.ann).exists())
+
+    def test_reassigning_the_owner(self):
+        self.project.collaborators.add(self.ann, self.owner)
+        self.project.creator = self.ann
+        self.project.save()
+        # The old owner stays as the collaborator they're listed as; the creator role wins for ann
+        self.assertEqual(self.roles(), {'ann': 'creator', 'owner': 'collaborator'})
+
+        self.project.creator = self.ben
+        self.project.save()
+        self.assertEqual(self.roles(), {'ben': 'creator', 'ann': 'collaborator', 'owner': 'collaborator'})
+
+
+# ========== DISCOVERY ==========
+
+class DiscoveryTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.creator = creator = User.objects.create_user('discoverer')
+        dates = {
+            'march': (date(2026, 3, 1), date(2026, 3, 31)),
+            'open ended': (date(2026, 2, 1), None),
+            'undated': (None, None),
+            'autumn': (date(2026, 9, 1), date(2026, 11, 30)),
+        }
+        for title, (start, end) in dates.items():
+            Project.objects.create(creator=creator, title=title, description='desc', start_date=start, end_date=end)
+
+    def titles(self, **params):
+        response = APIClient().get('/api/projects/discover/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return sorted(project['title'] for project in response.json()['results'])
+
+    def test_date_range_keeps_projects_without_dates(self):
+        self.assertEqual(self.titles(**{'from': '2026-03-15', 'to': '2026-04-15'}), ['march', 'open ended', 'undated'])
+        self.assertEqual(self.titles(**{'from': '2026-06-01'}), ['autumn', 'open ended', 'undated'])
+
+    def test_reversed_range_is_rejected(self):
+        response = APIClient().get('/api/projects/discover/', {'from': '2026-05-01', 'to': '2026-04-01'})
+        self.assertEqual(response.status_code, 400)
+
+    def facets(self, **params):
+        response = APIClient().get('/api/projects/discover/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        counts = {
+            name: {entry['value']: entry['count'] for entry in entries if entry['count']}
+            for name, entries in body['facets'].items()
+        }
+        return [project['title'] for project in body['results']], counts
+
+    def test_facet_counts_apply_every_other_filter(self):
+        sculpture = Manifestation.objects.create(name='Sculpture')
+        for title, status, budget, kind in [
+            ('seeking solo', 'ongoing', 'seeking', 'solo'),
+            ('seeking duo', 'paused', 'seeking', 'collaborative'),
+            ('granted', 'ongoing', 'grant', 'solo'),
+        ]:
+            project = Project.objects.create(
+                creator=self.creator, title=title, description='desc',
+                status=status, budget_type=budget, project_type=kind,
+            )
+            if budget == 'seeking':
+                project.manifestations.add(sculpture)
+
+        titles, counts = self.facets(status='ongoing', budget_type='seeking')
+        self.assertEqual(titles, ['seeking solo'])
+        self.assertEqual(counts, {
+            'status': {'ongoing': 1, 'paused': 1},       # budget_type=seeking only
+            'budget_type': {'none': 4, 'seeking': 1, 'grant': 1},  # status=ongoing only
+            'project_type': {'solo': 1},                  # both
+            'manifestation': {sculpture.pk: 1},           # both
+        })
+
+    def test_facets_are_cached_until_they_expire(self):
+        _, before = self.facets(budget_type='seeking')
+        Project.objects.create(creator=self.creator, title='late', description='desc', budget_type='seeking')
+
+        titles, cached = self.facets(budget_type='seeking')
+        self.assertEqual(titles, ['late'])  # the results themselves are never cached
+        self.assertEqual(cached, before)
+
+        expired = time.time() + discovery.FACET_TIMEOUT + 1
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=expired):
+            _, fresh = self.facets(budget_type='seeking')
+        self.assertEqual(fresh['status'], {'ongoing': 1})
+
+
+# ========== SEARCH ==========
+
+class SearchViewTests(TestCase):
+
+    def setUp(self):
+        caches['search'].clear()
+        self.user = User.objects.create_user('finder')
+        self.client = APIClient()
+
+    def get(self, **params):
+        caches['search'].clear()  # these tests are about the index, not the cache
+        response = self.client.get('/api/search/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def ids(self, body):
+        return [(result['type'], result['data']['id']) for result in body['results']]
+
+    def test_bm25_ranks_title_matches_first(self):
+        VerbalPost.objects.create(user=self.user, content='a long ramble that mentions glass once among many other words')
+        project = Project.objects.create(creator=self.user, title='Glass', description='blown')
+        VerbalPost.objects.create(user=self.user, content='glass glass')
+
+        results = self.get(q='glass')['results']
+        self.assertEqual((results[0]['type'], results[0]['data']['id']), ('project', project.pk))
+        scores = [result['score'] for result in results]
+        self.assertEqual(scores, sorted(scores))
+        self.assertEqual(len(results), 3)
+
+    def test_cursor_and_offset_pages(self):
+        for i in range(23):
+            VerbalPost.objects.create(user=self.user, content='ceramic ' * (1 + i % 4) + f'piece {i}')
+        everything = self.ids(self.get(q='ceramic', limit=50))
+        self.assertEqual(len(everything), 23)
+
+        paged, cursor = [], None
+        while True:
+            body = self.get(q='ceramic', limit=5, **({'cursor': cursor} if cursor else {}))
+            paged.extend(self.ids(body))
+            cursor = body['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(paged, everything)  # same order, no repeats, no gaps
+
+        # The same keyset walk straight against FTS, without the cache in front
+        direct, cursor = [], None
+        while True:
+            page = search.search('ceramic', limit=5, cursor=cursor)
+            direct.extend((hit.kind, hit.object_id) for hit in page.hits)
+            cursor = page.next_cursor
+            if not cursor:
+                break
+        self.assertEqual(direct, everything)
+
+        self.assertEqual(self.ids(self.get(q='ceramic', limit=5, offset=10)), everything[10:15])
+        self.assertEqual(self.client.get('/api/search/', {'q': 'ceramic', 'cursor': 'junk'}).status_code, 400)
+
+    def test_index_follows_create_edit_delete(self):
+        verbal = VerbalPost.objects.create(user=self.user, content='zephyr over the hills')
+        self.assertEqual(self.ids(self.get(q='zephyr')), [('verbalpost', verbal.pk)])
+
+        verbal.content = 'calm over the hills'
+        verbal.save()
+        self.assertEqual(self.ids(self.get(q='zephyr')), [])
+        self.assertEqual(self.ids(self.get(q='calm')), [('verbalpost', verbal.pk)])
+
+        verbal.delete()
+        self.assertEqual(self.ids(self.get(q='calm')), [])
+
+
+# ========== SEARCH CACHE ==========
+
+class SearchCacheTests(TestCase):
+
+    def setUp(self):
+        caches['search'].clear()
+        search_cache.reset_stats()
+        user = User.objects.create_user('searcher')
+        for caption in ['foo_bar', 'bar none', 'barn owl', 'basalt', 'bark bark', 'crowbar', 'snake_case_barrel']:
+            Post.objects.create(user=user, caption=caption)
+
+    def page_through(self, fetch, query, between_pages=None):
+        ids, cursor = [], None
+        while True:
+            page = fetch(query, limit=2, cursor=cursor)
+            ids.extend(hit.id for hit in page.hits)
+            if not page.next_cursor:
+                return ids
+            cursor = page.next_cursor
+            if between_pages:
+                between_pages()
+
+    def test_prefix_derived_entry_matches_the_database(self):
+        self.assertEqual(
+            sorted(self.page_through(search_cache.cached_search, 'ba')),
+            sorted(self.page_through(search.search, 'ba')),
+        )
+        cached = self.page_through(search_cache.cached_search, 'bar')
+        self.assertEqual(search_cache.get_stats()['prefix_hit'], 1)  # 'bar' was derived from 'ba'
+
+        uncached = self.page_through(search.search, 'bar')
+        self.assertEqual(len(uncached), 5)  # foo_bar and snake_case_barrel included
+        self.assertEqual(len(cached), len(set(cached)))
+        self.assertEqual(sorted(cached), sorted(uncached))
+
+    def test_cursors_survive_eviction(self):
+        # Enough documents for bm25 to weigh the prefixes; this one ranks first for 'ba', last for 'bar'
+        user = User.objects.get(username='searcher')
+        for i in range(30):
+            Post.objects.create(user=user, caption=f'filler {i}')
+        Post.objects.create(user=user, caption='bay basin basalt bar')
+        expected = sorted(self.page_through(search.search, 'bar'))
+
+        def evict_bar():
+            caches['search'].delete(search_cache._entry_key('bar'))
+
+        def evict_all():
+            caches['search'].clear()
+
+        def evict_bar_keep_ba():
+            evict_bar()
+            search_cache.cached_search('ba')
+
+        # Pages of an entry derived from 'ba' keep using the scores of 'ba'
+        for between_pages in (evict_bar, evict_all, evict_bar_keep_ba):
+            search_cache.cached_search('ba')
+            ids = self.page_through(search_cache.cached_search, 'bar', between_pages)
+            self.assertEqual(sorted(ids), expected, between_pages.__name__)
+        # Pages of an entry fetched for 'bar' are never continued from 'ba'
+        evict_all()
+        ids = self.page_through(search_cache.cached_search, 'bar', evict_bar_keep_ba)
+        self.assertEqual(sorted(ids), expected)
+
+        with self.assertRaises(ValueError):
+            forged = search_cache.encode_cursor(search.SearchHit(1, 'post', 1, 0.0), 'zzz', 'bar')
+            search_cache.cached_search('bar', cursor=forged)
+
+    def test_stats_are_not_evicted_with_results(self):
+        search_cache.cached_search('bar')
+        search_cache.cached_search('bar')
+        caches['search'].clear()
+        stats = search_cache.get_stats()
+        self.assertEqual((stats['hit'], stats['miss'], stats['requests']), (1, 1, 2))
+
+
+# ========== TAGS ==========
+
+class TagTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('tagger')
+        self.alice = User.objects.create_user('alice')
+        self.bob = User.objects.create_user('bob')
+
+    def counts(self):
+        return dict(Tag.objects.filter(post_count__gt=0).values_list('name', 'post_count'))
+
+    def tagged(self, post):
+        ct = ContentType.objects.get_for_model(post)
+        return set(PostTag.objects.filter(content_type=ct, object_id=post.pk).values_list('tag__name', flat=True))
+
+    def mentioned(self, post):
+        ct = ContentType.objects.get_for_model(post)
+        return set(Mention.objects.filter(content_type=ct, object_id=post.pk).values_list('user__username', flat=True))
+
+    def test_add_edit_delete_keep_counts_and_rows_in_step(self):
+        post = Post.objects.create(user=self.user, caption='#Art and #music')
+        verbal = VerbalPost.objects.create(user=self.user, content='more #art')
+        self.assertEqual(self.tagged(post), {'art', 'music'})
+        self.assertEqual(self.counts(), {'art': 2, 'music': 1})
+
+        post.caption = '#art #film, no more music'
+        post.save()
+        self.assertEqual(self.tagged(post), {'art', 'film'})
+        self.assertEqual(self.counts(), {'art': 2, 'film': 1})
+
+        post.delete()
+        self.assertEqual(self.tagged(post), set())
+        self.assertEqual(self.counts(), {'art': 1})
+        verbal.delete()
+        self.assertEqual(self.counts(), {})
+
+    def test_casefolded_tags_fit_the_name_column(self):
+        post = Post.objects.create(user=self.user, caption='#' + 'ß' * 50)
+        self.assertEqual(self.tagged(post), {'s' * tags.TAG_LENGTH})
+
+    def test_mentions_resolve_existing_users(self):
+        verbal = VerbalPost.objects.create(user=self.user, content='thanks @alice and @bob. @nobody')
+        self.assertEqual(self.mentioned(verbal), {'alice', 'bob'})
+
+        verbal.content = 'just @bob'
+        verbal.save()
+        self.assertEqual(self.mentioned(verbal), {'bob'})
+
+        verbal.delete()
+        self.assertEqual(self.mentioned(verbal), set())
+
+    def test_backfill_and_recount(self):
+        post = Post.objects.create(user=self.user, caption='#sky by @alice')
+        verbal = VerbalPost.objects.create(user=self.user, content='#sky #sea')
+        PostTag.objects.all().delete()
+        Mention.objects.all().delete()
+        Tag.objects.update(post_count=7)
+
+        call_command('backfill_tags', stdout=StringIO())
+        self.assertEqual((self.tagged(post), self.tagged(verbal)), ({'sky'}, {'sky', 'sea'}))
+        self.assertEqual(self.mentioned(post), {'alice'})
+        self.assertEqual(self.counts(), {'sky': 2, 'sea': 1})
+
+        Tag.objects.filter(name='sea').update(post_count=0)
+        self.assertEqual(tags.recount_tags(), 1)
+        self.assertEqual(tags.recount_tags(), 0)
+        self.assertEqual(self.counts(), {'sky': 2, 'sea': 1})
+
+
+# ========== PROJECT CALENDAR ==========
+
+class ProjectCalendarTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.creator = User.objects.create_user('planner')
+        self.project = Project.objects.create(
+            creator=self.creator, title='Tour', description='desc',
+            start_date=date(2026, 1, 1), end_date=date(2026, 12, 31),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.creator)
+
+    def calendar(self, start, end):
+        response = self.client.get(f'/api/projects/{self.project.pk}/calendar/', {'from': start, 'to': end})
+        self.assertEqual(response.status_code, 200, response.content)
+        return {entry['date']: entry['content'] for entry in response.json()['entries']}
+
+    def test_cached_months_are_invalidated_on_save_and_delete(self):
+        ProjectCalendarEntry.objects.create(project=self.project, date=date(2026, 3, 2), content='rehearsal')
+        self.assertEqual(self.calendar('2026-03-01', '2026-04-30'), {'2026-03-02': 'rehearsal'})
+        with self.assertNumQueries(1):  # the project; both months come from the cache
+            self.calendar('2026-03-01', '2026-04-30')
+
+        self.client.post(f'/api/projects/{self.project.pk}/calendar_entry/', {'date': '2026-04-10', 'content': 'opening'})
+        self.assertEqual(
+            self.calendar('2026-03-01', '2026-04-30'), {'2026-03-02': 'rehearsal', '2026-04-10': 'opening'},
+        )
+
+        self.client.post(f'/api/projects/{self.project.pk}/calendar_entry/', {'date': '2026-03-02', 'content': ''})
+        self.assertEqual(self.calendar('2026-03-01', '2026-04-30'), {'2026-04-10': 'opening'})
+
+    def test_bulk_upsert_later_items_win_and_blank_deletes(self):
+        ProjectCalendarEntry.objects.create(project=self.project, date=date(2026, 5, 1), content='old')
+        ProjectCalendarEntry.objects.create(project=self.project, date=date(2026, 5, 2), content='cancelled')
+        self.assertEqual(self.calendar('2026-05-01', '2026-05-31'), {'2026-05-01': 'old', '2026-05-02': 'cancelled'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/projects/{self.project.pk}/calendar/bulk/', {'entries': [
+                {'date': '2026-05-01', 'content': 'first draft'},
+                {'date': '2026-05-03', 'content': 'gone again'},
+                {'date': '2026-05-01', 'content': 'final'},
+                {'date': '2026-05-02', 'content': '  '},
+                {'date': '2026-05-03', 'content': ''},
+            ]}, format='json')
+        self.assertEqual(response.json(), {'saved': ['2026-05-01'], 'deleted': ['2026-05-02', '2026-05-03']})
+        # Served fresh, not from the month cached above
+        self.assertEqual(self.calendar('2026-05-01', '2026-05-31'), {'2026-05-01': 'final'})
+
+    def test_bulk_upsert_size_limit(self):
+        entries = [{'date': '2026-01-01', 'content': 'x'}] * (project_calendar.MAX_BULK_ITEMS + 1)
+        response = self.client.post(
+            f'/api/projects/{self.project.pk}/calendar/bulk/', {'entries': entries}, format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_timeline_buckets_entries_per_slot(self):
+        for day, content in [
+            (date(2026, 1, 1), 'kickoff'), (date(2026, 2, 1), 'casting'), (date(2026, 7, 1), 'premiere'),
+            (date(2026, 10, 1), ''), (date(2026, 12, 31), 'x' * 80), (date(2027, 1, 5), 'after the end'),
+        ]:
+            ProjectCalendarEntry.objects.create(project=self.project, date=day, content=content)
+
+        response = self.client.get(f'/api/projects/{self.project.pk}/timeline/', {'resolution': 4})
+        self.assertEqual(response.status_code, 200)
+        markers = response.json()['markers']
+        self.assertEqual(
+            [(m['date'], m['end_date'], m['count']) for m in markers],
+            [('2026-01-01', '2026-02-01', 2), ('2026-07-01', '2026-07-01', 1), ('2026-12-31', '2026-12-31', 1)],
+        )
+        self.assertEqual([m['pos'] for m in markers], [0.0, 181 / 364 * 100, 100.0])
+        self.assertEqual(markers[0]['label'], 'kickoff')  # the first entry of the slot
+        self.assertEqual(markers[2]['label'], 'x' * project_calendar.LABEL_LENGTH + '…')
+
+        ProjectCalendarEntry.objects.create(project=self.project, date=date(2026, 9, 1), content='tour')
+        self.assertEqual(len(project_calendar.timeline_markers(self.project, 4)), 4)
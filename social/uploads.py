@@ -0,0 +1,166 @@
+# social/uploads.py
+"""
+Resumable chunked uploads for large project photos.
+
+    POST   /api/uploads/                     {project, filename, size, caption}
+    PUT    /api/uploads/<id>/                raw bytes, Content-Range: bytes <start>-<end>/<size>
+    GET    /api/uploads/<id>/                current offset, to resume after a dropped connection
+    POST   /api/uploads/<id>/finalize/       -> ProjectPhoto
+    DELETE /api/uploads/<id>/                abort
+
+Each session has one part file in settings.CHUNKED_UPLOAD_DIR (outside
+MEDIA_ROOT, so half-written files are never served). Chunks are copied from
+the request stream straight into the part file at their offset in small
+blocks, so the file is assembled on disk as it arrives and never held in
+memory. Chunks must arrive in order: a PUT whose start isn't the current
+offset is rejected with the offset to resume from. On finalize the part
+file is handed to the media storage as a file object, which streams it into
+content-addressed storage.
+"""
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+from .models import ProjectPhoto, UploadSession
+
+MAX_UPLOAD_SIZE = 200 * 1024 * 1024
+MAX_CHUNK_SIZE = 16 * 1024 * 1024
+COPY_BLOCK = 64 * 1024
+# Open sessions untouched for this long are expired by `manage.py gc_media`
+SESSION_TTL = timedelta(hours=24)
+
+
+class OffsetMismatch(Exception):
+    """A chunk didn't start at the session's current offset."""
+
+    def __init__(self, offset):
+        super().__init__(f'Expected a chunk starting at byte {offset}')
+        self.offset = offset
+
+
+def upload_dir():
+    path = getattr(settings, 'CHUNKED_UPLOAD_DIR', os.path.join(settings.BASE_DIR, 'upload_sessions'))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def part_path(session):
+    return os.path.join(upload_dir(), f'{session.pk}.part')
+
+
+def parse_content_range(header):
+    """'bytes 0-1048575/73400320' -> (0, 1048575, 73400320); raises ValueError."""
+    try:
+        unit, spec = header.split(' ', 1)
+        byte_range, total = spec.split('/')
+        start, end = (int(v) for v in byte_range.split('-'))
+        total = int(total)
+    except (AttributeError, ValueError):
+        raise ValueError('Content-Range must look like "bytes <start>-<end>/<size>"')
+    if unit != 'bytes' or start < 0 or end < start:
+        raise ValueError('Content-Range must look like "bytes <start>-<end>/<size>"')
+    return start, end, total
+
+
+def start_session(user, project, filename, size, caption=''):
+    if not 0 < size <= MAX_UPLOAD_SIZE:
+        raise ValueError(f'size must be between 1 and {MAX_UPLOAD_SIZE} bytes')
+    session = UploadSession.objects.create(
+        user=user, project=project, filename=os.path.basename(filename)[:255], size=size, caption=caption,
+    )
+    open(part_path(session), 'wb').close()
+    return session
+
+
+def write_chunk(session, start, end, total, stream):
+    """
+    Copy bytes start..end (inclusive) from `stream` into the part file.
+    Returns the new offset. Raises OffsetMismatch or ValueError.
+    """
+    length = end - start + 1
+    if total != session.size or end >= session.size:
+        raise ValueError(f'Chunk is outside the declared size of {session.size} bytes')
+    if length > MAX_CHUNK_SIZE:
+        raise ValueError(f'Chunks are limited to {MAX_CHUNK_SIZE} bytes')
+
+    with transaction.atomic():
+        # Short lock: only to check the session, never held while reading the body
+        session = UploadSession.objects.select_for_update().get(pk=session.pk)
+        if session.status != UploadSession.STATUS_OPEN:
+            raise ValueError(f'Upload is {session.status}')
+        if start != session.received:
+            raise OffsetMismatch(session.received)
+
+    written = 0
+    with open(part_path(session), 'r+b') as part:
+        part.seek(start)
+        while written < length:
+            block = stream.read(min(COPY_BLOCK, length - written))
+            if not block:
+                break
+            part.write(block)
+            written += len(block)
+    if written != length:
+        # Short body (connection dropped). Bytes past `received` are ignored
+        # and overwritten by the retry, so the file isn't truncated: that
+        # could cut into a chunk a racing request has committed meanwhile.
+        raise ValueError(f'Expected {length} bytes, received {written}')
+
+    # Commit the offset only if no other request (a retry of the same chunk,
+    # finalize, abort) moved the session on while we were copying
+    advanced = UploadSession.objects.filter(
+        pk=session.pk, status=UploadSession.STATUS_OPEN, received=start,
+    ).update(received=start + length, updated_at=timezone.now())
+    if not advanced:
+        session.refresh_from_db(fields=['received', 'status'])
+        if session.status != UploadSession.STATUS_OPEN:
+            raise ValueError(f'Upload is {session.status}')
+        raise OffsetMismatch(session.received)
+    return start + length
+
+
+def finalize(session):
+    """Turn a fully received upload into a ProjectPhoto. Raises ValueError."""
+    with transaction.atomic():
+        # Concurrent finalize calls (double-clicked, retried) wait here; the
+        # loser sees the session complete and gets the same photo
+        session = UploadSession.objects.select_for_update().get(pk=session.pk)
+        if session.status == UploadSession.STATUS_COMPLETE:
+            return session.photo
+        if session.status != UploadSession.STATUS_OPEN:
+            raise ValueError(f'Upload is {session.status}')
+        if session.received != session.size:
+            raise ValueError(f'Only {session.received} of {session.size} bytes received')
+
+        path = part_path(session)
+        try:
+            with Image.open(path) as img:
+                img.verify()
+        except (OSError, SyntaxError, Image.DecompressionBombError):
+            raise ValueError('Upload is not a valid image')
+
+        with open(path, 'rb') as part:
+            photo = ProjectPhoto(project=session.project, caption=session.caption)
+            # ImageField.save streams the open file into storage, no read() into memory
+            photo.image.save(session.filename, File(part), save=False)
+            photo.save()
+
+        session.status = UploadSession.STATUS_COMPLETE
+        session.photo = photo
+        session.save(update_fields=['status', 'photo', 'updated_at'])
+        # Kept until the photo is committed, so a rolled back finalize can be retried
+        transaction.on_commit(lambda: os.unlink(path))
+    return photo
+
+
+def abort(session):
+    if session.status == UploadSession.STATUS_OPEN:
+        session.status = UploadSession.STATUS_ABORTED
+        session.save(update_fields=['status', 'updated_at'])
+    if os.path.exists(part_path(session)):
+        os.unlink(part_path(session))
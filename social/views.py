@@ -4,6 +4,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
+from django.core.paginator import Paginator
 from django.http import HttpResponseForbidden
 from django.contrib.contenttypes.models import ContentType
 from itertools import chain
@@ -18,10 +19,14 @@ from .forms import (
     SignupForm, PostForm, VerbalPostForm, ProjectForm,
     CustomUserCreationForm, CommentForm, MessageForm, ProfileForm, ProjectPhotoForm, ProjectStatusForm, AddCollaboratorForm, AddManifestationForm
 )
+from . import autocomplete, project_calendar
 from .models import (
-    Profile, Post, VerbalPost, Comment, Like, Project, Message, Follow, ProjectPhoto, Manifestation, ProjectCalendarEntry
+    Profile, Post, VerbalPost, Comment, Like, Project, Message, Follow, ProjectPhoto, Manifestation, ProjectCalendarEntry,
+    ConversationParticipant,
 )
 
+INBOX_PAGE_SIZE = 20
+
 # ---------- SIGNUP ----------
 def signup_view(request):
     if request.method == "POST":
@@ -216,27 +221,8 @@ def project_detail(request, pk):
         else:
             progress_percent = 100
 
-    #progress bar markers according to calendar entries
-    markers = []
-
-    if project.start_date and project.end_date and project.end_date > project.start_date:
-        total_days = (project.end_date - project.start_date).days
-
-        # Pull entries for this project (you can keep your existing "entries" query for the grid)
-        all_entries = ProjectCalendarEntry.objects.filter(
-            project=project
-        ).exclude(content="")
-
-        for e in all_entries:
-            # only place markers that fall within the timeline
-            if project.start_date <= e.date <= project.end_date:
-                offset_days = (e.date - project.start_date).days
-                pos = (offset_days / total_days) * 100  # 0..100
-                markers.append({
-                    "pos": pos,
-                    "date": e.date.strftime("%Y-%m-%d"),
-                    "label": (e.content[:60] + "…") if len(e.content) > 60 else e.content,
-                })
+    # Progress bar markers according to calendar entries (bucketed + cached)
+    markers = project_calendar.timeline_markers(project, resolution=200)
 
     # Build calendar grid (weeks is a list of weeks, each week is 7 date objects)
     cal = calendar.Calendar(firstweekday=0)  # Monday
@@ -371,13 +357,28 @@ def send_message(request, username=None, reply_to_id=None):
 # --------Inbox view -------
 @login_required
 def inbox(request):
-    messages = Message.objects.filter(recipient=request.user)
-    return render(request, 'social/inbox.html', {'messages': messages})
+    # Conversations, most recently active first, from the denormalized
+    # participant rows (one range scan of conversation_inbox_idx), like the API inbox
+    memberships = (
+        ConversationParticipant.objects
+        .filter(user=request.user, last_message_at__isnull=False)
+        .select_related('conversation', 'conversation__user_low', 'conversation__user_high')
+        .order_by('-last_message_at', '-id')
+    )
+    page = Paginator(memberships, INBOX_PAGE_SIZE).get_page(request.GET.get('page'))
+    for membership in page:
+        conversation = membership.conversation
+        membership.correspondent = (
+            conversation.user_high if conversation.user_low_id == request.user.id else conversation.user_low
+        )
+        membership.last_message_from_me = conversation.last_sender_id == request.user.id
+    return render(request, 'social/inbox.html', {'conversations': page})
 
 # ------- Outbox view ------
 @login_required
 def outbox(request):
-    messages = Message.objects.filter(sender=request.user)
+    # Per message, not per conversation: a range scan of the (sender, -created_at) index
+    messages = Message.objects.filter(sender=request.user).select_related('recipient').order_by('-created_at')
     return render(request, 'social/outbox.html', {'messages': messages})
 
 #------ FOLLOW/UNFOLLOW VIEWS ------
@@ -438,7 +439,7 @@ def compose_message(request):
     followers = []
 
     if search_query:
-        search_results = User.objects.filter(username__istartswith=search_query).exclude(id=request.user.id)
+        search_results = autocomplete.suggest_users(search_query, viewer=request.user, limit=20)
     else:
         followers = Follow.objects.filter(following=request.user)
 